@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Benchmarks the latency of save() with the writes done by the caller
+and by the writer thread of the background mode, for growing stores
+
+Usage: ./benchmarks/bench_background.py [saves] [option=value ...]
+
+The options are other FileStorage options, e.g. journal=1.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store, parse_options  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+SIZES = (1000, 10000, 100000)
+
+
+def time_saves(path, saves, **options):
+    """
+    Returns the mean and the largest seconds taken by saving
+    one changed user, and the seconds until all are on disk.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    user = next(iter(storage.all(User).values()))
+    user.save()
+    storage.wait_durable()
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(saves):
+        user.first_name = "Betty {}".format(i)
+        before = time.perf_counter()
+        user.save()
+        latencies.append(time.perf_counter() - before)
+        time.sleep(0.001)
+    storage.wait_durable()
+    elapsed = time.perf_counter() - start
+
+    storage.close()
+    storage.clear()
+    return sum(latencies) / saves, max(latencies), elapsed
+
+
+def main(saves=50, *args):
+    """
+    Times saves with and without the writer thread for each size.
+    """
+    options = parse_options(args)
+    options.setdefault("fsync", "never")
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    results = []
+
+    try:
+        for count in SIZES:
+            make_store(path, count)
+            for background in (False, True):
+                results.append((count, background, time_saves(
+                    path, int(saves), background=background, **options)))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} saves, options {}".format(saves, options))
+    print("objects  background  ms/save  max ms  total s")
+    for count, background, (mean, worst, elapsed) in results:
+        print("{:7}  {!s:10}  {:7.3f}  {:6.3f}  {:7.3f}".format(
+            count, background, mean * 1000, worst * 1000, elapsed))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Benchmarks a bulk import saving every object on its own: with a write
+per save, with a commit window, and in one batch
+
+Usage: ./benchmarks/bench_bulk.py [objects] [window_ms] [option=value ...]
+
+The options are other FileStorage options, e.g. journal=1.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import parse_options  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def save_user(i):
+    """
+    Creates and saves one user.
+    """
+    user = User()
+    user.email = "user{}@example.com".format(i)
+    user.save()
+
+
+def bulk_import(path, count, batch=False, **options):
+    """
+    Returns the seconds taken to create and save count users.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    if os.path.exists(path):
+        os.remove(path)
+
+    start = time.perf_counter()
+    if batch:
+        with storage.batch():
+            for i in range(count):
+                save_user(i)
+    else:
+        for i in range(count):
+            save_user(i)
+        storage.flush()
+    elapsed = time.perf_counter() - start
+
+    storage.clear()
+    return elapsed
+
+
+def main(count=2000, window=100, *args):
+    """
+    Times the same bulk import in each mode.
+    """
+    options = parse_options(args)
+    options.setdefault("fsync", "never")
+    count = int(count)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+
+    try:
+        results = [
+            ("every save", bulk_import(path, count, **options)),
+            ("{} ms window".format(window), bulk_import(
+                path, count, commit_window=int(window), **options)),
+            ("batch", bulk_import(path, count, batch=True, **options)),
+        ]
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} users, options {}".format(count, options))
+    for name, elapsed in results:
+        print("{:14} {:8.3f} s".format(name, elapsed))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
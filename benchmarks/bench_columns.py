@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Benchmarks aggregations over the Place columns against reading
+the attributes of every place
+
+Usage: ./benchmarks/bench_columns.py [places] [cities]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.columnar import ColumnStore  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def per_object(places):
+    """
+    Returns the mean price and the mean price by
+    city, reading the attributes of every place.
+    """
+    total, sums, counts = 0.0, {}, {}
+    for place in places:
+        price = float(place.price_by_night)
+        total += price
+        sums[place.city_id] = sums.get(place.city_id, 0.0) + price
+        counts[place.city_id] = counts.get(place.city_id, 0) + 1
+    return total / len(places), {c: sums[c] / counts[c] for c in sums}
+
+
+def main(count=200000, cities=500):
+    """
+    Creates random places and times the same aggregations both ways.
+    """
+    rand = random.Random(0)
+    city_ids = ["city-{}".format(i) for i in range(cities)]
+    places = []
+    for i in range(count):
+        place = Place()
+        place.city_id = rand.choice(city_ids)
+        place.price_by_night = rand.randrange(20, 500)
+        places.append(place)
+
+    start = time.perf_counter()
+    store = ColumnStore(["price_by_night"], ["city_id"])
+    for place in places:
+        store.add(place.id, {"price_by_night": place.price_by_night,
+                             "city_id": place.city_id})
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = per_object(places)
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = (store.mean("price_by_night"),
+             store.mean_by("price_by_night", "city_id"))
+    columns = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.count_by("city_id")
+    counting = time.perf_counter() - start
+
+    assert abs(found[0] - expected[0]) < 1e-6
+    assert found[1].keys() == expected[1].keys()
+    print("{} places, {} cities".format(count, cities))
+    print("column build: {:10.3f} ms".format(build * 1000))
+    print("per object:   {:10.3f} ms".format(scan * 1000))
+    print("columns:      {:10.3f} ms".format(columns * 1000))
+    print("count by:     {:10.3f} ms".format(counting * 1000))
+    print("speedup:      {:10.1f}x".format(scan / columns))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
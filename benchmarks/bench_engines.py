@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""
+Runs the same workload on every registered storage engine, to pick
+the fastest one for a deployment: putting objects, flushing them,
+restarting, getting them by id, scanning a class, counting, and
+saving changed objects one at a time
+
+Usage: ./benchmarks/bench_engines.py [objects] [saves]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine import registry  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+STEPS = ("put", "flush", "restart", "get", "scan", "count", "save")
+
+
+def make_user(i):
+    """
+    Returns a new user, not added to any storage.
+    """
+    now = datetime.now().isoformat()
+    return User(id=str(uuid.uuid4()), created_at=now, updated_at=now,
+                email="user{}@example.com".format(i))
+
+
+def run(name, path, count, saves):
+    """
+    Returns the seconds taken by each step on an engine.
+    """
+    times = {}
+    users = [make_user(i) for i in range(count)]
+
+    def step(name, function):
+        start = time.perf_counter()
+        function()
+        times[name] = time.perf_counter() - start
+
+    engine = registry.create(name)
+    engine.clear()
+    engine.configure(file_path=path)
+    engine.reload()
+
+    def put():
+        for user in users:
+            engine.put(user)
+
+    def restart():
+        nonlocal engine
+        engine.close()
+        engine.clear()
+        engine = registry.create(name)
+        engine.configure(file_path=path)
+        engine.reload()
+
+    def save():
+        for user in users[:saves]:
+            user.first_name = "Betty"
+            engine.put(user)
+            engine.flush()
+
+    step("put", put)
+    step("flush", engine.flush)
+    step("restart", restart)
+    step("get", lambda: [engine.get(User, u.id) for u in users])
+    step("scan", lambda: list(engine.scan(User)))
+    step("count", lambda: engine.count(User))
+    step("save", save)
+
+    engine.close()
+    engine.clear()
+    return times
+
+
+def main(count=20000, saves=20):
+    """
+    Times the workload on each engine.
+    """
+    tmp = tempfile.mkdtemp()
+    results = []
+
+    try:
+        for name in registry.names():
+            path = os.path.join(tmp, name)
+            results.append((name, run(name, path, int(count), int(saves))))
+    finally:
+        FileStorage().configure(file_path="file.json",
+                                **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, {} saves, seconds per step".format(count, saves))
+    print("engine   " + "".join("{:>9}".format(s) for s in STEPS))
+    for name, times in results:
+        print("{:8} ".format(name) +
+              "".join("{:9.3f}".format(times[s]) for s in STEPS))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
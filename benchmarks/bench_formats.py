@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Benchmarks saving and reloading a generated store in each file format
+
+Usage: ./benchmarks/bench_formats.py [objects] [option=value ...]
+
+The options are other FileStorage options, e.g. lazy=1.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store, parse_options, time_reload  # noqa
+from models import storage  # noqa: E402
+from models.engine import serializers  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+
+def time_save(path, format, **options):
+    """
+    Returns the seconds taken to write every object read
+    from the JSON file in a format, with compact().
+    """
+    storage.clear()
+    storage.configure(file_path=path, format="json", **options)
+    storage.all()
+    storage.configure(format=format)
+
+    start = time.perf_counter()
+    storage.compact()
+    elapsed = time.perf_counter() - start
+
+    storage.clear()
+    return elapsed
+
+
+def time_decode(path, serializer):
+    """
+    Returns the seconds taken to read and decode the records only.
+    """
+    start = time.perf_counter()
+    serializers.read(path, serializer)
+    return time.perf_counter() - start
+
+
+def main(count=100000, *args):
+    """
+    Times save(), reload() and decoding in each format.
+    """
+    options = parse_options(args)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    results = []
+
+    try:
+        make_store(path, int(count), **options)
+        for name, serializer in serializers.FORMATS.items():
+            file = os.path.splitext(path)[0] + (serializer.suffix or ".json")
+            save = time_save(path, name, **options)
+            loaded, reload = time_reload(path, format=name, **options)
+            decode = time_decode(file, serializer)
+            results.append((name, save, reload, decode,
+                            os.path.getsize(file)))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, options {}".format(loaded, options or "default"))
+    print("format      save s   reload s   decode s   size MB")
+    for name, save, reload, decode, size in results:
+        print("{:8} {:9.3f} {:10.3f} {:10.3f} {:9.1f}".format(
+            name, save, reload, decode, size / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
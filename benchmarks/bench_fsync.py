@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Benchmarks the latency of save() for each fsync policy
+
+Usage: ./benchmarks/bench_fsync.py [objects] [saves] [directory]
+
+The store is created in a temporary directory inside directory,
+by default the system's one, which may be in memory; give a
+directory on the disk to measure.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+POLICIES = ("always", "100", "never")
+
+
+def time_saves(path, saves, **options):
+    """
+    Returns the mean seconds taken by saving one changed user.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    user = next(iter(storage.all(User).values()))
+
+    start = time.perf_counter()
+    for i in range(saves):
+        user.first_name = "Betty {}".format(i)
+        user.save()
+    storage.sync()
+    elapsed = time.perf_counter() - start
+
+    storage.clear()
+    return elapsed / saves
+
+
+def main(count=10000, saves=200, directory=None):
+    """
+    Times saves with each fsync policy, with and without the journal.
+    """
+    tmp = tempfile.mkdtemp(dir=directory)
+    path = os.path.join(tmp, "file.json")
+    results = []
+
+    try:
+        make_store(path, int(count))
+        for journal in (False, True):
+            for policy in POLICIES:
+                results.append((journal, policy, time_saves(
+                    path, int(saves), journal=journal, fsync=policy,
+                    compact_after=int(saves) + 1)))
+                storage.compact()
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, {} saves in {}".format(count, saves, tmp))
+    print("journal  fsync      ms/save")
+    for journal, policy, elapsed in results:
+        print("{!s:8} {:8} {:10.3f}".format(journal, policy, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
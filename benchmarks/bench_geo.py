@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Benchmarks the Place grid index against checking every place
+
+Usage: ./benchmarks/bench_geo.py [places] [queries] [radius_km]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.indexes import GridIndex, haversine  # noqa: E402
+
+
+def brute_force(points, lat, lon, km):
+    """
+    Returns the (distance, id) pairs of the points
+    within km of a point, by checking every point.
+    """
+    found = []
+    for id, (plat, plon) in points.items():
+        distance = haversine(lat, lon, plat, plon)
+        if distance <= km:
+            found.append((distance, id))
+    found.sort()
+    return found
+
+
+def main(count=200000, queries=50, km=5.0):
+    """
+    Indexes random places over Europe and times radius queries.
+    """
+    rand = random.Random(0)
+    points = {str(i): (rand.uniform(36, 60), rand.uniform(-10, 30))
+              for i in range(count)}
+
+    start = time.perf_counter()
+    index = GridIndex()
+    for id, point in points.items():
+        index.add(id, point)
+    build = time.perf_counter() - start
+
+    centers = [(rand.uniform(36, 60), rand.uniform(-10, 30))
+               for i in range(queries)]
+
+    start = time.perf_counter()
+    expected = [brute_force(points, lat, lon, km) for lat, lon in centers]
+    scan = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    found = [index.within_radius(lat, lon, km) for lat, lon in centers]
+    grid = (time.perf_counter() - start) / queries
+
+    assert found == expected
+    print("{} places, {} queries, {} km radius".format(count, queries, km))
+    print("grid build:   {:10.3f} ms".format(build * 1000))
+    print("brute force:  {:10.3f} ms/query".format(scan * 1000))
+    print("grid index:   {:10.3f} ms/query".format(grid * 1000))
+    print("speedup:      {:10.1f}x".format(scan / grid))
+
+
+if __name__ == "__main__":
+    main(*[t(a) for t, a in zip((int, int, float), sys.argv[1:])])
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""
+Measures the memory held by the objects of a reloaded store
+
+Usage: ./benchmarks/bench_memory.py [objects]
+
+The store is reloaded with and without the compact option and the
+memory still allocated afterwards is reported per object.
+"""
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import compact, storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def make_store(path, count):
+    """
+    Writes count Places and Reviews, pointing to a few
+    Cities and Users, to a new store.
+    """
+    storage.clear()
+    storage.configure(file_path=path)
+    users = [User() for i in range(100)]
+
+    for i in range(count):
+        if i % 2:
+            obj = Place()
+            obj.city_id = "city-{}".format(i % 50).zfill(36)
+            obj.user_id = users[i % 100].id
+            obj.name = "Place {}".format(i)
+            obj.price_by_night = i % 300
+        else:
+            obj = Review()
+            obj.place_id = "place-{}".format(i % 5000).zfill(36)
+            obj.user_id = users[i % 100].id
+            obj.text = "Review {}".format(i)
+        obj.updated_at = obj.created_at
+        storage.new(obj)
+
+    storage.save()
+    storage.clear()
+
+
+def measure(path, **options):
+    """
+    Returns the bytes still allocated after reloading the store.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    gc.collect()
+
+    tracemalloc.start()
+    storage.reload()
+    count = len(storage.all())
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    storage.clear()
+    return count, size
+
+
+def main(count=100000):
+    """
+    Reports the memory per object with and without compact mode.
+    """
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+
+    try:
+        make_store(path, int(count))
+        loaded, plain = measure(path)
+        loaded, small = measure(path, compact=True)
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, Python {}, slots {}".format(
+        loaded, sys.version.split()[0], compact.SLOTS))
+    print("default: {:8.1f} bytes/object".format(plain / loaded))
+    print("compact: {:8.1f} bytes/object ({:.0%} less)".format(
+        small / loaded, 1 - small / plain))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
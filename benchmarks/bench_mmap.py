@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Benchmarks a cold start of the console on a generated store: reload(),
+then the count and show commands, with and without mmap mode
+
+Usage: ./benchmarks/bench_mmap.py [objects]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+MODES = (
+    ("json", {}),
+    ("json lazy", {"lazy": True}),
+    ("binary", {"format": "binary"}),
+    ("binary lazy", {"format": "binary", "lazy": True}),
+    ("binary mmap", {"format": "binary", "mmap": True}),
+)
+
+
+def cold_start(path, key, **options):
+    """
+    Returns the seconds taken by reload(), count(Place)
+    and get() of one place, from an empty storage.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **FileStorage.defaults())
+    storage.configure(**options)
+
+    start = time.perf_counter()
+    storage.reload()
+    count = storage.count("Place")
+    storage.get("Place", key)
+    elapsed = time.perf_counter() - start
+
+    storage.clear()
+    return count, elapsed
+
+
+def main(count=300000):
+    """
+    Times a cold start in each mode.
+    """
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    results = []
+
+    try:
+        make_store(path, int(count))
+        storage.reload()
+        key = next(iter(storage.all("Place"))).split(".", 1)[1]
+        storage.configure(format="binary")
+        storage.compact()
+
+        for name, options in MODES:
+            places, elapsed = cold_start(path, key, **options)
+            results.append((name, elapsed))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, {} places".format(count, places))
+    for name, elapsed in results:
+        print("{:12} {:8.3f} s".format(name, elapsed))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Benchmarks FileStorage.reload() on a generated store
+
+Usage: ./benchmarks/bench_reload.py [objects] [option=value ...]
+
+The options are FileStorage options, e.g. lazy=1 or partitioned=1.
+The reload is timed with the current timestamp parser and
+with the strptime() parser BaseModel used before.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import base_model, storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def parse_options(args):
+    """
+    Converts option=value arguments to FileStorage options.
+    """
+    options = {}
+    defaults = FileStorage.defaults()
+
+    for arg in args:
+        name, value = arg.split("=", 1)
+        default = defaults[name]
+        if isinstance(default, bool):
+            value = value.lower() in ("1", "true", "yes", "on")
+        elif default is not None:
+            value = type(default)(value)
+        options[name] = value
+
+    return options
+
+
+def make_store(path, count, **options):
+    """
+    Writes count Users, Places and Reviews to a new store.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+
+    for i in range(count):
+        if i % 3 == 0:
+            obj = User()
+            obj.email = "user{}@example.com".format(i)
+        elif i % 3 == 1:
+            obj = Place()
+            obj.name = "Place {}".format(i)
+            obj.price_by_night = i % 300
+        else:
+            obj = Review()
+            obj.text = "Review {}".format(i)
+        storage.new(obj)
+
+    storage.save()
+    storage.clear()
+
+
+def time_reload(path, **options):
+    """
+    Returns the seconds taken by reload() and all().
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+
+    start = time.perf_counter()
+    storage.reload()
+    count = len(storage.all())
+    elapsed = time.perf_counter() - start
+
+    storage.clear()
+    return count, elapsed
+
+
+def strptime(value):
+    """
+    The timestamp parser BaseModel used before parse_datetime().
+    """
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, base_model.TIME_FORMAT)
+
+
+def main(count=100000, *args):
+    """
+    Times reload() with each timestamp parser.
+    """
+    options = parse_options(args)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+
+    try:
+        make_store(path, int(count), **options)
+
+        fast = base_model.parse_datetime
+        base_model.parse_datetime = strptime
+        loaded, before = time_reload(path, **options)
+        base_model.parse_datetime = fast
+        loaded, after = time_reload(path, **options)
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, options {}".format(loaded, options or "default"))
+    print("strptime:      {:8.3f} s  {:10.0f} objects/s".format(
+        before, loaded / before))
+    print("fromisoformat: {:8.3f} s  {:10.0f} objects/s".format(
+        after, loaded / after))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Benchmarks the sharded mode of FileStorage against a single file:
+saving one changed review, a cold start getting one object,
+and a cold start reading every object
+
+Usage: ./benchmarks/bench_shards.py [objects] [saves] [option=value ...]
+
+The options are other FileStorage options, e.g. format=binary.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store, parse_options  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+SHARDS = (0, 4, 16, 64)
+
+
+def cold(path, **options):
+    """
+    Forgets the objects and points the storage at the store.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    storage.reload()
+
+
+def time_shards(path, saves, **options):
+    """
+    Returns the mean seconds taken by saving one changed review,
+    by a cold start getting one review and by a cold start
+    reading every object.
+    """
+    cold(path, **options)
+    review = next(iter(storage.all(Review).values()))
+    start = time.perf_counter()
+    for i in range(saves):
+        review.text = "Changed {}".format(i)
+        review.save()
+    save = (time.perf_counter() - start) / saves
+
+    start = time.perf_counter()
+    cold(path, **options)
+    storage.get(Review, review.id)
+    get = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cold(path, **options)
+    storage.count()
+    load = time.perf_counter() - start
+
+    storage.clear()
+    return save, get, load
+
+
+def main(count=30000, saves=20, *args):
+    """
+    Times each number of shards on the same objects.
+    """
+    options = parse_options(args)
+    options.setdefault("fsync", "never")
+    tmp = tempfile.mkdtemp()
+    results = []
+
+    try:
+        for shards in SHARDS:
+            path = os.path.join(tmp, "{}.json".format(shards))
+            make_store(path, int(count), shards=shards, **options)
+            results.append((shards, time_shards(
+                path, int(saves), shards=shards, **options)))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, {} saves, options {}".format(count, saves, options))
+    print("shards  ms/save  get one ms  load all ms")
+    for shards, (save, get, load) in results:
+        print("{:6}  {:7.2f}  {:10.2f}  {:11.2f}".format(
+            shards, save * 1000, get * 1000, load * 1000))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
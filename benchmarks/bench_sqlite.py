@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""
+Compares SQLiteStorage with FileStorage on a generated store:
+starting up, getting objects by id, listing a class, finding
+the reviews of a place and saving one changed object
+
+Usage: ./benchmarks/bench_sqlite.py [objects] [lookups]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.engine.sqlite_storage import SQLiteStorage  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def timed(function, *args):
+    """
+    Returns the result of a function and the seconds it took.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(engine, ids, place_ids):
+    """
+    Returns the seconds taken by each step on an engine,
+    started from a closed store.
+    """
+    results = {}
+    results["start"] = timed(engine.reload)[1]
+    results["get"] = timed(
+        lambda: [engine.get(User, id) for id in ids])[1] / len(ids)
+    results["list"] = timed(lambda: len(engine.all(Review)))[1]
+    results["find"] = timed(lambda: [engine.find(Review, place_id=id)
+                                     for id in place_ids])[1] / len(place_ids)
+
+    user = engine.get(User, ids[0])
+    user.first_name = "Betty"
+
+    def save():
+        engine.new(user)
+        engine.save()
+
+    results["save"] = timed(save)[1]
+    return results
+
+
+def main(count=30000, lookups=200):
+    """
+    Times each step on both engines.
+    """
+    count = int(count)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    sqlite = SQLiteStorage()
+    sqlite.configure(file_path=os.path.join(tmp, "file.db"))
+
+    try:
+        make_store(path, count)
+        storage.reload()
+        objs = storage.all()
+        places = [k.split(".", 1)[1] for k in objs if k.startswith("Place")]
+        for review, i in zip(storage.all(Review).values(), range(count)):
+            review.place_id = places[i % len(places)]
+        storage.save()
+        for obj in objs.values():
+            sqlite.new(obj)
+        sqlite.save()
+        sqlite.close()
+
+        ids = random.sample(
+            [k.split(".", 1)[1] for k in objs if k.startswith("User")],
+            int(lookups))
+        place_ids = random.sample(places, min(int(lookups), len(places)))
+        storage.clear()
+        results = [("FileStorage", run(storage, ids, place_ids))]
+        SQLiteStorage._SQLiteStorage__objects.clear()
+        results.append(("SQLiteStorage", run(sqlite, ids, place_ids)))
+    finally:
+        sqlite.close()
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, {} lookups".format(count, lookups))
+    print("engine          start s  get ms  list s  find ms  save ms")
+    for name, r in results:
+        print("{:14} {:8.3f} {:7.3f} {:7.3f} {:8.3f} {:8.2f}".format(
+            name, r["start"], r["get"] * 1000, r["list"],
+            r["find"] * 1000, r["save"] * 1000))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Benchmarks the time and peak memory of reload() and save() with
+and without the stream option
+
+Usage: ./benchmarks/bench_stream.py [objects] [option=value ...]
+
+The options are other FileStorage options, e.g. format=binary.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store, parse_options  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+
+def measure(path, **options):
+    """
+    Returns the seconds taken by reload(), the memory held by the
+    objects afterwards and the peak memory during reload(), in bytes.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+
+    start = time.perf_counter()
+    storage.reload()
+    elapsed = time.perf_counter() - start
+    storage.clear()
+
+    tracemalloc.start()
+    storage.reload()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    storage.clear()
+
+    return elapsed, held, peak
+
+
+def measure_save(path, **options):
+    """
+    Returns the seconds taken to write every object with compact(),
+    and the memory it used on top of the objects, in bytes.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    storage.all()
+
+    start = time.perf_counter()
+    storage.compact()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    held = tracemalloc.get_traced_memory()[0]
+    storage.compact()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    storage.clear()
+
+    return elapsed, peak - held
+
+
+def main(count=100000, *args):
+    """
+    Measures reload() and save() with and without the stream option.
+    """
+    options = parse_options(args)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    results = []
+    saves = []
+
+    try:
+        make_store(path, int(count), **options)
+        for stream in (False, True):
+            results.append((stream, measure(path, stream=stream, **options)))
+        for name, extra in (("False", {"stream": False}),
+                            ("True", {"stream": True}),
+                            ("True 1MB", {"stream": True,
+                                          "write_buffer": 1 << 20})):
+            saves.append((name, measure_save(path, **extra, **options)))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, options {}".format(count, options or "default"))
+    print("stream    reload s   objects MB   peak MB")
+    for stream, (elapsed, held, peak) in results:
+        print("{!s:8} {:9.3f} {:12.1f} {:9.1f}".format(
+            stream, elapsed, held / 2 ** 20, peak / 2 ** 20))
+    print("stream      save s   extra MB")
+    for name, (elapsed, extra) in saves:
+        print("{:8} {:9.3f} {:10.1f}".format(name, elapsed, extra / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
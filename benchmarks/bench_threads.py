@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""
+Benchmarks the throughput of FileStorage in thread safe mode:
+reader threads getting and finding objects while a writer thread
+changes and saves them, for a growing number of readers
+
+Usage: ./benchmarks/bench_threads.py [objects] [seconds] [option=value ...]
+
+The options are other FileStorage options, e.g. journal=1.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store, parse_options  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+READERS = (1, 2, 4, 8)
+
+
+def run(path, readers, seconds, writer=True, **options):
+    """
+    Returns the reads and the saves per second of the threads.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    storage.reload()
+    users = list(storage.all(User).values())
+    counts = []
+    stop = threading.Event()
+
+    def read():
+        n = 0
+        while not stop.is_set():
+            user = users[n % len(users)]
+            storage.get(User, user.id)
+            storage.find(User, email=user.email)
+            n += 1
+        counts.append(n)
+
+    def write():
+        n = 0
+        while not stop.is_set():
+            user = users[n % len(users)]
+            user.first_name = "Betty {}".format(n)
+            user.save()
+            n += 1
+        counts.append(-n)
+
+    threads = [threading.Thread(target=read) for i in range(readers)]
+    if writer:
+        threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    storage.clear()
+    reads = sum(n for n in counts if n > 0)
+    saves = -sum(n for n in counts if n < 0)
+    return reads / seconds, saves / seconds
+
+
+def main(count=10000, seconds=2, *args):
+    """
+    Times the reads and saves with each number of readers.
+    """
+    options = parse_options(args)
+    options.setdefault("fsync", "never")
+    options.setdefault("journal", True)
+    options.setdefault("compact_after", 1000000)
+    seconds = float(seconds)
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    results = []
+
+    try:
+        make_store(path, int(count))
+        storage.add_index(User, "email")
+        for readers in READERS:
+            results.append(("unlocked, no writer", readers, run(
+                path, readers, seconds, writer=False, **options)))
+            results.append(("thread_safe, no writer", readers, run(
+                path, readers, seconds, writer=False, thread_safe=True,
+                **options)))
+            results.append(("thread_safe", readers, run(
+                path, readers, seconds, thread_safe=True, **options)))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, options {}".format(count, options))
+    print("mode                    readers    reads/s    saves/s")
+    for mode, readers, (reads, saves) in results:
+        print("{:23} {:7} {:10.0f} {:10.0f}".format(
+            mode, readers, reads, saves))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Benchmarks a cold start reading every object of a sharded store,
+with the files read by threads and with a growing number of
+worker processes building the objects
+
+Usage: ./benchmarks/bench_workers.py [objects] [shards] [option=value ...]
+
+The options are other FileStorage options, e.g. compact=1 or
+partitioned=1 with shards=0.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_reload import make_store, parse_options  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+
+def time_load(path, repeat, **options):
+    """
+    Returns the best seconds taken by reload() and count() on a
+    cold storage, the worker processes being started once before.
+    """
+    storage.clear()
+    storage.configure(file_path=path, **options)
+    storage.reload()
+    count = storage.count()
+
+    best = float("inf")
+    for i in range(repeat):
+        storage.clear()
+        start = time.perf_counter()
+        storage.reload()
+        storage.count()
+        best = min(best, time.perf_counter() - start)
+
+    storage.close()
+    storage.clear()
+    return count, best
+
+
+def main(count=100000, shards=16, *args):
+    """
+    Times the load with threads, then with 1, 2, 4... worker processes
+    up to the number of cores.
+    """
+    options = parse_options(args)
+    options.setdefault("shards", int(shards))
+    cores = os.cpu_count() or 1
+    workers = [0] + [n for n in (1, 2, 4, 8, 16, 32) if n <= cores]
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    results = []
+
+    try:
+        make_store(path, int(count), **options)
+        for n in workers:
+            results.append((n, time_load(path, 3, workers=n, **options)))
+    finally:
+        storage.configure(file_path="file.json", **FileStorage.defaults())
+        shutil.rmtree(tmp)
+
+    print("{} objects, {} cores, options {}".format(count, cores, options))
+    print("workers  objects  load s  speedup")
+    for n, (objects, seconds) in results:
+        print("{:7}  {:7}  {:6.3f}  {:7.2f}".format(
+            n, objects, seconds, results[0][1][1] / seconds))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
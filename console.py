@@ -6,13 +6,7 @@ Defines class HBNBCommand()
 import cmd
 import readline
 from models import storage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
+from models.engine import registry
 
 
 class HBNBCommand(cmd.Cmd):
@@ -26,15 +20,7 @@ class HBNBCommand(cmd.Cmd):
     """
 
     prompt = "(hbnb) "
-    classes = {
-        "BaseModel": BaseModel,
-        "User": User,
-        "State": State,
-        "City": City,
-        "Amenity": Amenity,
-        "Place": Place,
-        "Review": Review
-    }
+    classes = registry.classes()
 
     def emptyline(self):
         """
@@ -56,7 +42,8 @@ class HBNBCommand(cmd.Cmd):
         Execute the do_EOF command.
 
         This command is called when the user enters Ctrl+D.
-        It simply prints a newline character and returns True,
+        It waits for the pending writes of the storage,
+        prints a newline character and returns True,
         indicating that the program should exit.
 
         Args:
@@ -71,12 +58,14 @@ class HBNBCommand(cmd.Cmd):
             command.do_EOF("")  # Output: prints a
             newline character and returns True
         """
+        storage.close()
         print()
         return True
 
     def do_quit(self, arg):
         """
-        Exit the command line interface program.
+        Exit the command line interface program,
+        once the pending writes of the storage are done.
 
         :param arg: The argument passed to the method.
         It is not used in this method.
@@ -84,6 +73,7 @@ class HBNBCommand(cmd.Cmd):
         :return: True, indicating that the program should exit.
         :rtype: bool
         """
+        storage.close()
         return True
 
     def help_quit(self):
@@ -193,11 +183,10 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = "{}.{}".format(args[0], args[1])
-        instances = storage.all()
+        instance = storage.get(args[0], args[1])
 
-        if key in instances:
-            print(instances[key])
+        if instance is not None:
+            print(instance)
         else:
             print("** no instance found **")
 
@@ -254,11 +243,10 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = "{}.{}".format(args[0], args[1])
-        instances = storage.all()
+        instance = storage.get(args[0], args[1])
 
-        if key in instances:
-            del instances[key]
+        if instance is not None:
+            storage.delete(instance)
             storage.save()
         else:
             print("** no instance found **")
@@ -306,13 +294,13 @@ class HBNBCommand(cmd.Cmd):
             list of all instances of the User class
         """
         args = arg.split()
-        instances = storage.all()
 
         if not args:
+            instances = storage.all()
             print([str(instance) for instance in instances.values()])
         elif args[0] in HBNBCommand.classes.keys():
-            print([str(instance) for key, instance in instances.items()
-                  if key.startswith(args[0] + ".")])
+            instances = storage.all(args[0])
+            print([str(instance) for instance in instances.values()])
         else:
             print("** class doesn't exist **")
 
@@ -358,11 +346,9 @@ class HBNBCommand(cmd.Cmd):
                 print("** class doesn't exist **")
                 return
 
-            key = "{}.{}".format(args[0], args[1])
-            instances = storage.all()
+            instance = storage.get(args[0], args[1])
 
-            if key in instances:
-                instance = instances[key]
+            if instance is not None:
                 setattr(instance, args[2], args[3])
                 instance.save()
             else:
@@ -425,9 +411,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
             return
 
-        instances = storage.all()
-        count = sum(1 for key in instances if key.startswith(args[0] + "."))
-        print(count)
+        print(storage.count(args[0]))
 
     def default(self, arg):
         """
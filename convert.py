@@ -0,0 +1,20 @@
+#!/usr/bin/python3
+"""
+Converts a storage file between the JSON and binary formats
+
+Usage: ./convert.py <source> <target> [json|binary]
+
+The format of the source is found from its contents, the target
+is written in the other format unless one is given.
+"""
+import sys
+from models.engine.serializers import convert
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: ./convert.py <source> <target> [json|binary]",
+              file=sys.stderr)
+        sys.exit(1)
+
+    print("{} records converted".format(convert(*sys.argv[1:])))
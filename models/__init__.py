@@ -4,7 +4,17 @@ Loads the objects stored in a JSON file on the disk
 """
 
 
-from models.engine.file_storage import FileStorage
+from models.engine import registry
 
-storage = FileStorage()
+storage = registry.create()
+storage.add_index("City", "state_id")
+storage.add_index("Place", "city_id")
+storage.add_index("Place", "user_id")
+storage.add_index("Review", "place_id")
+storage.add_index("Review", "user_id")
+storage.add_index("Place", "price_by_night", "sorted")
+storage.add_index("Place", "max_guest", "sorted")
+storage.add_index("Place", "number_rooms", "sorted")
+storage.add_index("Place", "number_bathrooms", "sorted")
+storage.add_index("Place", ("latitude", "longitude"), "grid")
 storage.reload()
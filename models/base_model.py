@@ -7,6 +7,32 @@ from datetime import datetime
 from models import storage
 import uuid
 
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def parse_datetime(value):
+    """
+    Converts a timestamp written by to_dict() back to a datetime.
+
+    datetime.fromisoformat() is several times faster than
+    strptime() and also reads the timestamps isoformat() writes
+    without microseconds, when they are 0. strptime() is only
+    used for what fromisoformat() does not read on older Pythons.
+
+    Args:
+        value (str): The timestamp, or an already built datetime.
+
+    Returns:
+        datetime: The timestamp as a datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, TIME_FORMAT)
+
 
 class BaseModel:
     """
@@ -36,7 +62,7 @@ class BaseModel:
             1. If kwargs is provided, iterate over each key-value pair.
             2. If the key is "created_at" or "updated_at",
             convert the corresponding value to a datetime object
-            using the specified format.
+            using parse_datetime().
             3. If the key is not "__class__", set the attribute
              of the object with the key as the attribute name
              and the value as the attribute value.
@@ -56,7 +82,7 @@ class BaseModel:
             for i, j in kwargs.items():
 
                 if i == "created_at" or i == "updated_at":
-                    j = datetime.strptime(j, "%Y-%m-%dT%H:%M:%S.%f")
+                    j = parse_datetime(j)
 
                 if i != "__class__":
                     setattr(self, i, j)
@@ -89,13 +115,16 @@ class BaseModel:
         1. The 'save' method is called on an instance of the 'BaseModel' class.
         2. The 'updated_at' attribute of the object is updated
         with the current datetime using 'datetime.now()'.
-        3. The 'save' method of the 'storage' object
+        3. The object is marked as changed with 'storage.touch',
+        unless it was deleted from storage.
+        4. The 'save' method of the 'storage' object
         is called to save the object to storage.
 
         Outputs:
         - None
         """
         self.updated_at = datetime.now()
+        storage.touch(self)
         storage.save()
 
     def to_dict(self):
@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+"""
+Module defining the compact representation of model instances
+used by FileStorage in compact mode
+
+Objects built by build() share one string for every "*_id" foreign key
+value and one datetime for equal created_at and updated_at timestamps.
+
+Before Python 3.11 they are also instances of a compact class: a
+subclass of the model class, with the same name, that keeps id,
+created_at, updated_at and the attributes declared on the model class
+in slots instead of in an instance dictionary. Other attributes, e.g.
+set by the console's update command, go to a dictionary that is only
+created for the instances that need it. Python 3.11 already stores
+instance attributes in a shared-key array, smaller than these slots.
+"""
+
+import sys
+
+SLOTS = sys.version_info < (3, 11)
+_compact_classes = {}
+
+
+class CompactModel:
+    """
+    Mixin of the compact classes.
+
+    Methods:
+        __getattr__(self, name):
+            Returns an extra attribute, or the class
+            default of an unset slot.
+
+        __setattr__(self, name, value):
+            Sets a slot, or an extra attribute.
+
+        __delattr__(self, name):
+            Deletes a slot, or an extra attribute.
+
+        attributes(self) -> dict:
+            Returns the attributes set on the instance.
+
+        __str__(self) -> str:
+            Same as BaseModel.__str__.
+
+        to_dict(self) -> dict:
+            Same as BaseModel.to_dict.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        """
+        Returns an attribute that is not in a slot, or the class
+        default of a slot that is not set, as the model class
+        attribute is hidden by the slot.
+
+        Args:
+            name (str): The name of the attribute.
+
+        Raises:
+            AttributeError: If the attribute is not set
+            and has no default.
+        """
+        if name == "_extra":
+            return None
+
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        defaults = type(self)._defaults
+        if name in defaults:
+            return defaults[name]
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """
+        Sets a slot, or adds the attribute to the extra attributes.
+
+        Args:
+            name (str): The name of the attribute.
+            value: The value of the attribute.
+        """
+        if name in type(self)._fields:
+            object.__setattr__(self, name, value)
+            return
+
+        extra = self._extra
+        if extra is None:
+            extra = {}
+            object.__setattr__(self, "_extra", extra)
+        extra[name] = value
+
+    def __delattr__(self, name):
+        """
+        Deletes a slot, or an extra attribute.
+
+        Args:
+            name (str): The name of the attribute.
+        """
+        if name in type(self)._fields:
+            object.__delattr__(self, name)
+            return
+
+        extra = self._extra
+        if extra is None or name not in extra:
+            raise AttributeError(name)
+        del extra[name]
+
+    def attributes(self) -> dict:
+        """
+        Returns the attributes set on the instance, like __dict__
+        holds them for an instance of the model class.
+
+        Returns:
+            dict: The attributes, slots first.
+        """
+        attrs = {}
+
+        for name in type(self)._fields:
+            try:
+                attrs[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+
+        if self._extra:
+            attrs.update(self._extra)
+        return attrs
+
+    def __str__(self):
+        """
+        Returns a string representation of the object.
+
+        :return: '[class_name] (object_id) {object_attributes}'.
+        :rtype: str
+        """
+        return "[{}] ({}) {}".format(type(self).__name__, self.id,
+                                     self.attributes())
+
+    def to_dict(self):
+        """
+        Converts the instance into a dictionary representation,
+        the same as the one of an instance of the model class.
+
+        Returns:
+            dict: The attributes, with '__class__' and
+            the timestamps in ISO format.
+        """
+        class_dict = {
+            "__class__": type(self).__name__
+        }
+        for i, j in self.attributes().items():
+            if i == "created_at" or i == "updated_at":
+                class_dict[i] = j.isoformat()
+            else:
+                class_dict[i] = j
+
+        return class_dict
+
+    def __reduce__(self):
+        """
+        Pickles the instance as its model class and attributes,
+        as compact classes cannot be found by name.
+        """
+        return (restore, (type(self).__bases__[1], self.attributes()))
+
+
+def compact_class(cls):
+    """
+    Returns the compact class of a model class, creating it once.
+
+    Args:
+        cls: The model class, e.g. Place.
+
+    Returns:
+        type: The compact subclass of cls.
+    """
+    compact = _compact_classes.get(cls)
+    if compact is not None:
+        return compact
+
+    defaults = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and not callable(value) and \
+                    not isinstance(value, (classmethod, staticmethod,
+                                           property)):
+                defaults[name] = value
+
+    fields = ("id", "created_at", "updated_at") + \
+        tuple(name for name in defaults
+              if name not in ("id", "created_at", "updated_at"))
+
+    compact = type(cls.__name__, (CompactModel, cls), {
+        "__slots__": fields + ("_extra",),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "_defaults": defaults,
+        "_fields": fields,
+    })
+    _compact_classes[cls] = compact
+    return compact
+
+
+def build(cls, record):
+    """
+    Creates the compact instance described by a record.
+
+    Foreign keys and other "*_id" strings are interned, so every
+    object pointing to the same City or User shares one string,
+    and updated_at shares the datetime of created_at when equal.
+    The instance is of the compact class of cls if SLOTS is True.
+
+    Args:
+        cls: The model class, e.g. Place.
+        record (dict): The object as returned by to_dict().
+
+    Returns:
+        The compact instance.
+    """
+    record = dict(record)
+
+    for name, value in record.items():
+        if name.endswith("_id") and isinstance(value, str):
+            record[name] = sys.intern(value)
+
+    obj = (compact_class(cls) if SLOTS else cls)(**record)
+
+    if record.get("updated_at") == record.get("created_at") and \
+            "created_at" in record:
+        obj.updated_at = obj.created_at
+
+    return obj
+
+
+def restore(cls, attrs):
+    """
+    Recreates a pickled compact instance.
+
+    Args:
+        cls: The model class.
+        attrs (dict): The attributes of the instance.
+
+    Returns:
+        The compact instance.
+    """
+    obj = object.__new__(compact_class(cls))
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    return obj
@@ -0,0 +1,257 @@
+#!/usr/bin/python3
+"""
+Module that defines ColumnStore, a column by column copy of the
+objects of one class used by FileStorage for aggregations
+"""
+
+from array import array
+from math import fsum
+from operator import itemgetter
+
+
+class ColumnStore:
+    """
+    Holds the numeric attributes and the "*_id" foreign keys of the
+    objects of one class as columns: numbers in float arrays and
+    foreign keys dictionary encoded, as an array of codes into the
+    list of their distinct values.
+
+    Aggregations then run over arrays instead
+    of reading an attribute of every object.
+
+    Attributes:
+        ids (list): The id of the object of each row.
+        numbers (dict): The float array of each numeric attribute;
+        values that are not numbers are NaN.
+        codes (dict): The code array of each foreign key attribute.
+        values (dict): The distinct values of each foreign key
+        attribute, indexed by code.
+        __rows (dict): The array of the rows holding each code
+        of each foreign key attribute, for the group by methods.
+
+    Methods:
+        add(self, id, attrs) -> None:
+            Appends the row of an object.
+
+        column(self, name) -> list:
+            Returns the values of an attribute, row by row.
+
+        sum(self, name) -> float:
+            Returns the sum of a numeric attribute.
+
+        mean(self, name) -> float:
+            Returns the mean of a numeric attribute.
+
+        min(self, name) -> float:
+            Returns the smallest value of a numeric attribute.
+
+        max(self, name) -> float:
+            Returns the largest value of a numeric attribute.
+
+        count_by(self, by) -> dict:
+            Returns the number of rows for each foreign key value.
+
+        sum_by(self, name, by) -> dict:
+            Returns the sum of a numeric attribute
+            for each foreign key value.
+
+        mean_by(self, name, by) -> dict:
+            Returns the mean of a numeric attribute
+            for each foreign key value.
+    """
+
+    def __init__(self, numbers=(), keys=()):
+        """
+        Initializes empty columns.
+
+        Args:
+            numbers: The names of the numeric attributes.
+            keys: The names of the foreign key attributes.
+        """
+        self.ids = []
+        self.numbers = {name: array("d") for name in numbers}
+        self.codes = {name: array("l") for name in keys}
+        self.values = {name: [] for name in keys}
+        self.__lookup = {name: {} for name in keys}
+        self.__rows = {name: [] for name in keys}
+        self.__invalid = {name: 0 for name in numbers}
+
+    def __len__(self):
+        """
+        Returns the number of rows.
+        """
+        return len(self.ids)
+
+    def add(self, id, attrs) -> None:
+        """
+        Appends the row of an object.
+
+        Args:
+            id (str): The id of the object.
+            attrs (dict): The value of each column attribute.
+        """
+        self.ids.append(id)
+
+        for name, column in self.numbers.items():
+            try:
+                value = float(attrs.get(name))
+            except (TypeError, ValueError):
+                value = float("nan")
+            if value != value:
+                self.__invalid[name] += 1
+            column.append(value)
+
+        row = len(self.ids) - 1
+        for name, column in self.codes.items():
+            value = attrs.get(name)
+            lookup = self.__lookup[name]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.values[name])
+                self.values[name].append(value)
+                self.__rows[name].append(array("l"))
+            column.append(code)
+            self.__rows[name][code].append(row)
+
+    def column(self, name) -> list:
+        """
+        Returns the values of an attribute, row by row.
+
+        Args:
+            name (str): The name of a column attribute, or "id".
+
+        Returns:
+            The float array of a numeric attribute, otherwise a list.
+
+        Raises:
+            KeyError: If the attribute is not a column.
+        """
+        if name == "id":
+            return self.ids
+        if name in self.numbers:
+            return self.numbers[name]
+
+        values = self.values[name]
+        return [values[code] for code in self.codes[name]]
+
+    def __valid(self, name):
+        """
+        Returns the values of a numeric column that are not NaN.
+        """
+        column = self.numbers[name]
+        if not self.__invalid[name]:
+            return column
+        return array("d", (v for v in column if v == v))
+
+    def sum(self, name) -> float:
+        """
+        Returns the sum of a numeric attribute, NaN excluded.
+
+        Args:
+            name (str): The name of a numeric attribute.
+
+        Returns:
+            float: The sum.
+        """
+        return fsum(self.__valid(name))
+
+    def mean(self, name) -> float:
+        """
+        Returns the mean of a numeric attribute, NaN excluded.
+
+        Args:
+            name (str): The name of a numeric attribute.
+
+        Returns:
+            float: The mean, or None when there is no value.
+        """
+        column = self.__valid(name)
+        return fsum(column) / len(column) if column else None
+
+    def min(self, name) -> float:
+        """
+        Returns the smallest value of a numeric attribute.
+
+        Args:
+            name (str): The name of a numeric attribute.
+
+        Returns:
+            float: The smallest value, or None when there is no value.
+        """
+        return min(self.__valid(name), default=None)
+
+    def max(self, name) -> float:
+        """
+        Returns the largest value of a numeric attribute.
+
+        Args:
+            name (str): The name of a numeric attribute.
+
+        Returns:
+            float: The largest value, or None when there is no value.
+        """
+        return max(self.__valid(name), default=None)
+
+    def __groups(self, name, by):
+        """
+        Yields the values of a numeric column that are not NaN,
+        for each code of a foreign key column, in code order.
+        """
+        column = self.numbers[name]
+        invalid = self.__invalid[name]
+
+        for rows in self.__rows[by]:
+            if len(rows) == 1:
+                group = (column[rows[0]],)
+            else:
+                group = itemgetter(*rows)(column)
+            if invalid:
+                group = [v for v in group if v == v]
+            yield group
+
+    def count_by(self, by) -> dict:
+        """
+        Returns the number of rows for each value of a foreign key.
+
+        Args:
+            by (str): The name of a foreign key attribute.
+
+        Returns:
+            dict: The number of rows by foreign key value.
+        """
+        values = self.values[by]
+        return {values[code]: len(rows)
+                for code, rows in enumerate(self.__rows[by])}
+
+    def sum_by(self, name, by) -> dict:
+        """
+        Returns the sum of a numeric attribute, NaN excluded,
+        for each value of a foreign key.
+
+        Args:
+            name (str): The name of a numeric attribute.
+            by (str): The name of a foreign key attribute.
+
+        Returns:
+            dict: The sums by foreign key value.
+        """
+        values = self.values[by]
+        return {values[code]: fsum(group)
+                for code, group in enumerate(self.__groups(name, by))}
+
+    def mean_by(self, name, by) -> dict:
+        """
+        Returns the mean of a numeric attribute, NaN excluded,
+        for each value of a foreign key.
+
+        Args:
+            name (str): The name of a numeric attribute.
+            by (str): The name of a foreign key attribute.
+
+        Returns:
+            dict: The means by foreign key value, None for
+            the values without any number.
+        """
+        values = self.values[by]
+        return {values[code]: fsum(group) / len(group) if group else None
+                for code, group in enumerate(self.__groups(name, by))}
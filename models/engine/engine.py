@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+"""
+Module that defines class Engine, the interface
+every storage engine implements
+"""
+
+from abc import ABC, abstractmethod
+from models.engine import registry
+
+
+class Engine(ABC):
+    """
+    The interface of the storage engines, selected at startup
+    by models.engine.registry.
+
+    An engine keeps model objects by class name and id. put() and
+    delete() change them in memory, flush() makes the changes
+    durable, and reload() reads them back. The older names of the
+    same operations, new(), all() and save(), are kept for the
+    models and the console.
+
+    put(), touch(), scan(), find() and flush() are written here on
+    top of new(), get(), all() and save(), and add_index() does
+    nothing; the other methods are abstract, the engine's own.
+
+    Attributes:
+        name (str): The name of the engine in the registry.
+        persistent (bool): True if flushed objects are
+        read back by reload() after a restart.
+
+    Methods:
+        configure(self, **options) -> None:
+            Changes the options of the engine.
+
+        get(self, cls, id) -> BaseModel:
+            Returns the object of a class with the given id.
+
+        put(self, obj) -> None:
+            Adds or replaces an object.
+
+        touch(self, obj) -> None:
+            Marks an object still stored as changed.
+
+        delete(self, obj) -> None:
+            Removes an object.
+
+        scan(self, cls=None):
+            Iterates over the objects, or the objects of a class.
+
+        count(self, cls=None) -> int:
+            Returns the number of objects, or of objects of a class.
+
+        find(self, cls, **attrs) -> dict:
+            Returns the objects of a class with the given attributes.
+
+        add_index(self, cls, attr, kind="hash") -> None:
+            Declares an index used by find().
+
+        flush(self) -> None:
+            Writes the changes.
+
+        reload(self) -> None:
+            Reads the objects written.
+
+        clear(self) -> None:
+            Forgets the objects in memory.
+
+        close(self) -> None:
+            Writes what is pending and releases the engine.
+
+        _name(cls) -> str:
+            Returns the name of a class, or the class name given.
+
+        _classes() -> dict:
+            Returns the model classes stored.
+    """
+
+    name = None
+    persistent = True
+
+    @abstractmethod
+    def configure(self, **options) -> None:
+        """
+        Changes the options of the engine.
+
+        Args:
+            **options: The options, see the engine.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, cls, id):
+        """
+        Returns the object of a class with the given id.
+
+        Args:
+            cls: The class, or the class name, of the object.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if there is none.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def new(self, obj) -> None:
+        """
+        Adds an object, or marks it as changed.
+
+        Args:
+            obj: The object.
+        """
+        raise NotImplementedError
+
+    def put(self, obj) -> None:
+        """
+        Adds or replaces an object, written on the next flush().
+
+        Args:
+            obj: The object.
+        """
+        self.new(obj)
+
+    def touch(self, obj) -> None:
+        """
+        Marks an object as changed, so the next flush() writes it,
+        if an object with its key is still stored. A deleted object
+        is not added back.
+
+        Args:
+            obj: The object.
+        """
+        if self.get(obj.__class__, obj.id) is not None:
+            self.new(obj)
+
+    @abstractmethod
+    def delete(self, obj=None) -> None:
+        """
+        Removes an object, on disk on the next flush().
+
+        Args:
+            obj: The object, nothing is done if it is None.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def all(self, cls=None) -> dict:
+        """
+        Returns the objects, or the objects of a class, by key.
+
+        Args:
+            cls: A class, or class name.
+
+        Returns:
+            dict: The objects by "<class name>.<id>" key.
+        """
+        raise NotImplementedError
+
+    def scan(self, cls=None):
+        """
+        Iterates over the objects, or the objects of a class.
+
+        Args:
+            cls: A class, or class name.
+
+        Returns:
+            An iterator of the objects.
+        """
+        return iter(list(self.all(cls).values()))
+
+    @abstractmethod
+    def count(self, cls=None) -> int:
+        """
+        Returns the number of objects, or of objects of a class.
+
+        Args:
+            cls: A class, or class name.
+
+        Returns:
+            int: The number of objects.
+        """
+        raise NotImplementedError
+
+    def find(self, cls, **attrs) -> dict:
+        """
+        Returns the objects of a class with the given attribute
+        values. This default checks every object of the class,
+        engines with indexes look the values up instead.
+
+        Example Usage:
+            storage.find(City, state_id=state.id)
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            **attrs: The attribute values to match.
+
+        Returns:
+            dict: The matching objects by key, like all(cls).
+        """
+        return {key: obj for key, obj in self.all(cls).items()
+                if all(getattr(obj, a, None) == v for a, v in attrs.items())}
+
+    def add_index(self, cls, attr, kind="hash") -> None:
+        """
+        Declares an index of the objects of a class by an attribute,
+        so find() can look its values up. This default does nothing,
+        find() then checks every object of the class.
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            attr (str): The name of the attribute, or a tuple
+            of names for a grid index.
+            kind (str): "hash", "sorted" or "grid".
+        """
+
+    @abstractmethod
+    def save(self) -> None:
+        """
+        Writes the changes made since the last save.
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """
+        Writes the changes made since the last flush at once.
+        """
+        self.save()
+
+    @abstractmethod
+    def reload(self) -> None:
+        """
+        Reads the objects written.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Forgets the objects in memory, changed or not,
+        without touching the ones written.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Writes what is pending and releases the engine.
+        """
+
+    @staticmethod
+    def _name(cls) -> str:
+        """
+        Returns the name of a class, or the class name given.
+        """
+        return cls if isinstance(cls, str) else cls.__name__
+
+    @staticmethod
+    def _classes() -> dict:
+        """
+        Returns the model classes stored.
+
+        Returns:
+            dict: The model classes by name.
+        """
+        return registry.classes()
@@ -5,80 +5,1006 @@ It Serializes instances to a JSON file
 and deserializes JSON file to instances
 """
 
+import atexit
 import json
-from datetime import datetime
+import multiprocessing
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from models.engine import indexes as index_kinds
+from models.engine import layouts
+from models.engine import loaders
+from models.engine import serializers
+from models.engine import writers
+from models.engine.columnar import ColumnStore
+from models.engine.engine import Engine
+from models.engine.locks import RWLock
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
-class FileStorage:
+def env_options(prefix="HBNB_FS_"):
+    """
+    Collects FileStorage options from environment variables.
+
+    Every option known to FileStorage can be set with an
+    environment variable named after it, e.g. HBNB_FS_JOURNAL=1
+    or HBNB_FS_COMPACT_AFTER=5000. Values are converted to the
+    type of the option's default value.
+
+    Args:
+        prefix (str): The prefix of the environment variables.
+
+    Returns:
+        dict: The options found in the environment.
+    """
+    options = {}
+
+    for name, default in FileStorage.defaults().items():
+        value = os.getenv(prefix + name.upper())
+        if value is None:
+            continue
+        if isinstance(default, bool):
+            value = value.lower() in ("1", "true", "yes", "on")
+        elif default is not None:
+            value = type(default)(value)
+        options[name] = value
+
+    return options
+
+
+class FileStorage(Engine):
     """
     Class to perform serialization and deserialization to JSON files.
 
+    The objects are written to one JSON file, or, in partitioned
+    mode, to one JSON file per class, or, in sharded mode, to a
+    number of JSON files chosen by a hash of the key of each object.
+    Each of these files is called a segment and is read and written
+    on its own.
+
+    FileStorage holds the objects, their indexes and the locks, and
+    leaves the rest to collaborators: the layout of the segments to
+    models.engine.layouts, the reading of the files to
+    models.engine.loaders and their writing to models.engine.writers.
+    They are built again by configure() when their options change.
+
     Attributes:
         __file_path (str): The path to the JSON file
         where the objects are stored.
         __objects (dict): A dictionary that stores the objects.
+        __options (dict): The storage options, see configure().
+        __dirty (dict): The keys changed since the last save, mapped
+        to their object, or to None when the object was deleted.
+        __journal_count (int): The number of records
+        in the journal since the last compaction.
+        __written_at (float): The time of the last write, for the
+        commit window.
+        __batches (int): The number of batch() blocks being run.
+        __layout (SingleFile): The layout of the segments.
+        __loader (Loader): Reads the segment files.
+        __writer (Writer): Writes the segment and journal files.
+        __durability (Durability): The fsync policy of the writes.
+        __thread (WriterThread): The thread writing the files
+        in background mode.
+        __lock (RWLock): The lock of the thread safe mode.
+        __lock_file (file): In shared mode, the lock file
+        while this process holds the lock.
+        __stamps (dict): In shared mode, the modification time, size
+        and inode of each file when this process last read or wrote it.
+        __cache (dict): The encoded JSON of the objects that
+        did not change since they were last written.
+        __raw (dict): In lazy mode, the records read from the JSON
+        file that were not turned into model instances yet. In mmap
+        mode, the (Snapshot, position) of the records instead.
+        __loaded (set): The segments read since the last reload().
+        __by_class (dict): The ids of the objects of each class name,
+        mapped to the object, or to None while it is not built.
+        __indexes (dict): The secondary indexes of each class name,
+        by attribute name.
+        __unindexed (set): The class names whose objects were read
+        from disk, built or not, but not added to their indexes yet,
+        which is done the first time one of the indexes is used.
+        __columns (dict): The ColumnStore of each class name, dropped
+        when an object of the class is added, changed or removed.
 
     Methods:
-        all(self) -> dict:
+        all(self, cls=None) -> dict:
             Returns a dictionary of objects
             stored in the __objects attribute.
 
+        get(self, cls, id) -> BaseModel:
+            Returns the object of a class with the given id.
+
+        count(self, cls=None) -> int:
+            Returns the number of objects, or of objects of a class.
+
+        add_index(self, cls, attr, kind="hash") -> None:
+            Indexes the objects of a class by an attribute.
+
+        find(self, cls, **attrs) -> dict:
+            Returns the objects of a class with the given attributes.
+
+        search(self, cls, order_by=None, limit=None,
+               reverse=False, **ranges) -> list:
+            Returns the objects of a class with attribute
+            values in the given ranges.
+
+        within_radius(self, cls, lat, lon, km) -> list:
+            Returns the objects of a class near a point.
+
+        within_box(self, cls, south, west, north, east) -> list:
+            Returns the objects of a class in a box.
+
+        columns(self, cls) -> ColumnStore:
+            Returns the numeric and foreign key
+            attributes of a class as columns.
+
         new(self, obj) -> None:
             Adds a new object to the __objects dictionary attribute.
 
+        touch(self, obj) -> None:
+            Marks an object still in storage as changed.
+
+        delete(self, obj) -> None:
+            Removes an object from the __objects dictionary attribute.
+
+        clear(self) -> None:
+            Removes every object from memory, not from the file.
+
         save(self) -> None:
             Serializes the objects stored in the __objects
             dictionary attribute into a JSON file.
 
+        batch(self):
+            Returns a context manager writing
+            all the saves of a block at once.
+
+        flush(self) -> None:
+            Writes the objects changed since the last save.
+
         reload(self) -> None:
             Reloads and deserializes objects from
             a JSON file into the __objects dictionary attribute.
+
+        compact(self) -> None:
+            Folds the journal back into the JSON file.
+
+        reshard(self, partitioned=False, shards=0) -> None:
+            Moves every object to the files of another layout.
+
+        sync(self) -> None:
+            Waits for the files written without fsync to be on disk.
+
+        refresh(self) -> None:
+            Reads again the files written by other processes.
+
+        wait_durable(self) -> None:
+            Waits for everything saved so far to be on disk.
+
+        close(self) -> None:
+            Writes the pending changes and stops the writer thread.
     """
 
     __file_path = "file.json"
     __objects = {}
+    __options = {
+        "journal": False,
+        "compact_after": 1000,
+        "incremental": False,
+        "lazy": False,
+        "partitioned": False,
+        "shards": 0,
+        "workers": 0,
+        "compact": False,
+        "format": "json",
+        "mmap": False,
+        "stream": False,
+        "write_buffer": 0,
+        "fsync": "always",
+        "commit_window": 0,
+        "background": False,
+        "thread_safe": False,
+        "shared": False,
+    }
+    __defaults = dict(__options)
+    __dirty = {}
+    __journal_count = 0
+    __cache = {}
+    __raw = {}
+    __loaded = set()
+    __by_class = {}
+    __indexes = {}
+    __unindexed = set()
+    __columns = {}
+    __written_at = float("-inf")
+    __batches = 0
+    __exit_hook = False
+    __layout = layouts.SingleFile(__file_path, serializers.FORMATS["json"],
+                                  __objects, __raw, __by_class)
+    __loader = loaders.Loader()
+    __durability = writers.Durability()
+    __thread = writers.WriterThread()
+    __writer = writers.Writer(__layout, __objects, __raw, __dirty, __cache,
+                              __durability)
+    __lock = None
+    __lock_file = None
+    __stamps = {}
+
+    def __reads(method):
+        """
+        Decorates a method reading the storage to hold the lock to
+        read in thread safe mode, or to write while reading may
+        still load, build or index objects.
+        """
+        @wraps(method)
+        def reading(self, *args, **kwargs):
+            lock = self.__lock
+            if lock is None:
+                return method(self, *args, **kwargs)
+
+            lock.acquire_read()
+            try:
+                if self.__settled():
+                    return method(self, *args, **kwargs)
+            finally:
+                lock.release_read()
+
+            with lock.write():
+                return method(self, *args, **kwargs)
+
+        return reading
+
+    def __writes(method):
+        """
+        Decorates a method changing the storage
+        to hold the lock to write in thread safe mode.
+        """
+        @wraps(method)
+        def writing(self, *args, **kwargs):
+            lock = self.__lock
+            if lock is None:
+                return method(self, *args, **kwargs)
+
+            with lock.write():
+                return method(self, *args, **kwargs)
+
+        return writing
+
+    @classmethod
+    def defaults(cls) -> dict:
+        """
+        Returns the default value of every storage option.
+
+        Returns:
+            dict: A copy of the default options.
+        """
+        return dict(cls.__defaults)
+
+    @__writes
+    def configure(self, **options) -> None:
+        """
+        Changes the storage options.
+
+        Options:
+            file_path (str): The path of the JSON file.
+            journal (bool): Append changes to a journal file
+            on save instead of rewriting the whole JSON file.
+            compact_after (int): The number of journal records
+            after which the journal is folded back into the JSON file.
+            incremental (bool): Keep the encoded JSON of every
+            object and only encode the changed ones on save.
+            lazy (bool): Keep the records read by reload() as they
+            are and only build the model instances when needed.
+            partitioned (bool): Store each class in its own file,
+            e.g. file.User.json, read the first time it is needed.
+            Changing it, or shards, only changes the files read and
+            written: reshard() moves the objects already stored.
+            shards (int): Store the objects in this number of files,
+            e.g. file.0.json to file.15.json, the file of an object
+            chosen by the CRC-32 of its key. A save only rewrites the
+            files holding changed objects, get() only reads the file
+            of the object, and the files needed at once are read by
+            a pool of threads. 0 for a single file. Not combined
+            with partitioned.
+            workers (int): In partitioned and sharded modes, the
+            number of worker processes reading the files needed at
+            once and building their objects, which are then sent back
+            and added to the storage, so a full load uses that many
+            cores. 0 to read the files with threads in this process.
+            Not used in lazy, stream and mmap modes, nor by reload(),
+            which reads with threads as it runs while the models are
+            imported. The workers are forked, so this needs the fork
+            start method, which Windows does not have.
+            compact (bool): Build the objects read from disk
+            with models.compact.build() to use less memory.
+            format (str): The format of the storage files, "json"
+            or "binary" for the snapshots of BinarySerializer,
+            written next to the JSON file with a .bin extension.
+            mmap (bool): With the binary format, map the snapshots
+            in memory and only decode a record when it is needed,
+            finding it through the index of the snapshot.
+            stream (bool): Read and write the storage files record
+            by record, adding each object before reading the next one
+            and encoding each object after writing the previous one,
+            instead of holding the whole file in memory.
+            write_buffer (int): The size in bytes of the write buffer
+            in stream mode, 0 for the default of the io module.
+            fsync (str): When saves wait for the files to be on disk:
+            "always", "never", or a number of milliseconds to only
+            wait once in that time. Files are always written to a
+            temporary file renamed over the old one, so a crash
+            while saving never leaves a half written file.
+            commit_window (int): A number of milliseconds after a
+            write during which save() leaves the changes in memory,
+            so they are written together by the first save() after
+            the window, by flush(), or when the program exits.
+            background (bool): Write the files in a thread. save()
+            only encodes the changed objects and queues the write,
+            so it takes the same time whatever the size of the
+            store, and wait_durable() waits for the queued writes.
+            thread_safe (bool): Guard the storage with a readers-writer
+            lock, so threads can use it at once: reads run together
+            once every object is loaded and built, changes and saves
+            one at a time. all() then returns a copy of the objects.
+            The attributes of an object are not guarded.
+            shared (bool): Share the files with other processes.
+            Saves hold a lock on a .lock file next to the JSON file,
+            and first read again the files other processes wrote
+            since this one last read them: the objects changed in
+            this process since its last save are kept, the others
+            are taken from disk, so changes to different objects
+            are merged and the last save of an object wins. Writes
+            are not done in the background in this mode. Needs fcntl,
+            so it is not available on Windows.
+
+        Args:
+            **options: The options to change.
+
+        Raises:
+            ValueError: If an option, a format or an fsync policy
+            is unknown, if partitioned and shards are both set, or
+            if the platform lacks what shared or workers need.
+        """
+        self.__settle()
+
+        moved = "file_path" in options
+        if moved:
+            FileStorage.__file_path = options.pop("file_path")
+            FileStorage.__journal_count = 0
+            self.__loaded.clear()
+
+        for name in options:
+            if name not in FileStorage.__options:
+                raise ValueError("unknown storage option: {}".format(name))
+
+        if options.get("format", self.__options["format"]) != \
+                self.__options["format"]:
+            if options["format"] not in serializers.FORMATS:
+                raise ValueError("unknown storage format: {}".format(
+                    options["format"]))
+            self.__cache.clear()
+
+        if "fsync" in options:
+            policy = options["fsync"] = str(options["fsync"])
+            if policy not in ("always", "never"):
+                try:
+                    float(policy)
+                except ValueError:
+                    raise ValueError("unknown fsync policy: {}".format(
+                        policy)) from None
+
+        shards = options.get("shards", self.__options["shards"])
+        if shards < 0:
+            raise ValueError("shards must not be negative")
+        if options.get("workers", 0) < 0:
+            raise ValueError("workers must not be negative")
+        if shards and options.get("partitioned",
+                                  self.__options["partitioned"]):
+            raise ValueError("partitioned and sharded storage exclude "
+                             "each other")
+
+        if options.get("shared") and fcntl is None:
+            raise ValueError("shared storage needs fcntl file locks")
+        if options.get("workers") and loaders.START_METHOD not in \
+                multiprocessing.get_all_start_methods():
+            raise ValueError("worker processes need the {} start "
+                             "method".format(loaders.START_METHOD))
+
+        changed = {name for name, value in options.items()
+                   if value != self.__options[name]}
+        FileStorage.__options.update(options)
 
-    def all(self) -> dict:
+        if changed & {"format", "partitioned", "shards"}:
+            self.__loaded.clear()
+        if moved or changed & {"format", "partitioned", "shards"}:
+            self.__new_layout()
+        if changed & {"format", "compact", "lazy", "stream", "mmap",
+                      "workers"}:
+            self.__loader.close()
+            self.__new_loader()
+        self.__new_writer()
+
+        if not self.__options["thread_safe"]:
+            FileStorage.__lock = None
+        elif self.__lock is None:
+            FileStorage.__lock = RWLock()
+
+        if (self.__options["commit_window"] or self.__options["background"]) \
+                and not self.__exit_hook:
+            atexit.register(self.close)
+            FileStorage.__exit_hook = True
+
+    def options(self) -> dict:
+        """
+        Returns the current storage options.
+
+        Returns:
+            dict: A copy of the current options.
+        """
+        return dict(self.__options)
+
+    @__reads
+    def all(self, cls=None) -> dict:
         """
         Returns a dictionary of objects stored in
         the __objects attribute of the FileStorage class.
 
+        The returned dictionary must not be changed,
+        objects are added and removed with new() and delete().
+
+        Args:
+            cls: A class, or class name, to only return
+            the objects of that class. In partitioned mode
+            only the file of that class is read.
+
         Returns:
             dict: A dictionary containing the objects
-            stored in the FileStorage instance.
+            stored in the FileStorage instance, a copy
+            in thread safe mode.
+        """
+        if cls is None:
+            self.__ensure_segments(self.__layout.segments())
+            if self.__raw:
+                for key in list(self.__raw):
+                    self.__materialize(key)
+            if self.__lock is not None:
+                return dict(self.__objects)
+            return self.__objects
+
+        cls = self._name(cls)
+
+        self.__ensure_class(cls)
+        objs = {}
+
+        for id, obj in self.__by_class.get(cls, {}).items():
+            key = cls + "." + id
+            objs[key] = obj if obj is not None else self.__materialize(key)
+
+        return objs
+
+    @__reads
+    def count(self, cls=None) -> int:
+        """
+        Returns the number of objects in storage.
+
+        No object is built in lazy mode, and in partitioned
+        mode only the file of the class is read.
+
+        Args:
+            cls: A class, or class name, to only count
+            the objects of that class.
+
+        Returns:
+            int: The number of objects.
+        """
+        if cls is None:
+            self.__ensure_segments(self.__layout.segments())
+            return len(self.__objects) + len(self.__raw)
+
+        cls = self._name(cls)
+
+        self.__ensure_class(cls)
+        return len(self.__by_class.get(cls, ()))
+
+    @__writes
+    def add_index(self, cls, attr, kind="hash") -> None:
+        """
+        Indexes the objects of a class by an attribute, so find()
+        can get them by value without looking at every object.
+
+        A "sorted" index also serves the ranges
+        and the ordering of search(), and a "grid" index on
+        a (latitude, longitude) pair of attributes serves
+        within_radius() and within_box().
+
+        The index is kept up to date by new(), delete() and
+        reload(). An attribute changed without saving the
+        object is only indexed again on the next new() or save().
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            attr (str): The name of the attribute, e.g. "state_id",
+            or the (latitude, longitude) attribute names for "grid".
+            kind (str): "hash", "sorted" for numeric attributes,
+            or "grid" for positions.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the kind of index is unknown.
+        """
+        cls = self._name(cls)
+
+        if kind not in index_kinds.KINDS:
+            raise ValueError("unknown index kind: {}".format(kind))
+
+        indexes = self.__indexes.setdefault(cls, {})
+        if attr in indexes:
+            return
+
+        indexes[attr] = index_kinds.KINDS[kind](attr)
+        if cls not in self.__unindexed:
+            for id, obj in self.__by_class.get(cls, {}).items():
+                self.__index(cls, id, obj, self.__record(cls, id, obj))
+
+    @__reads
+    def find(self, cls, **attrs) -> dict:
+        """
+        Returns the objects of a class with the given attribute values.
+
+        Indexed attributes are looked up in their index and
+        only the objects found there are checked against the
+        other attributes. Without any indexed attribute every
+        object of the class is checked.
+
+        Example Usage:
+            storage.find(City, state_id=state.id)
+            storage.find("Review", place_id=place.id, user_id=user.id)
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            **attrs: The attribute values to match.
+
+        Returns:
+            dict: The matching objects by key, like all(cls).
         """
-        return self.__objects
+        cls = self._name(cls)
+
+        self.__ensure_class(cls)
+        self.__ensure_indexed(cls)
+        members = self.__by_class.get(cls, {})
+        indexes = self.__indexes.get(cls, {})
+
+        found = [indexes[a].lookup(v) for a, v in attrs.items()
+                 if a in indexes]
+        if found:
+            found.sort(key=len)
+            ids = found[0].intersection(*found[1:])
+        else:
+            ids = members
+
+        rest = [(a, v) for a, v in attrs.items() if a not in indexes]
+        objs = {}
+
+        for id in ids:
+            key = cls + "." + id
+            obj = members[id]
+            if obj is None:
+                obj = self.__materialize(key)
+            if all(getattr(obj, a, None) == v for a, v in rest):
+                objs[key] = obj
+
+        return objs
 
+    @__reads
+    def get(self, cls, id):
+        """
+        Returns the object of a class with the given id.
+
+        Unlike all(), this only builds the requested
+        object when the storage is in lazy mode.
+
+        Args:
+            cls: The class, or the class name, of the object.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it is not in storage.
+        """
+        cls = self._name(cls)
+
+        key = "{}.{}".format(cls, id)
+        self.__ensure_loaded(self.__layout.segment_of(key))
+        obj = self.__objects.get(key)
+
+        if obj is None and key in self.__raw:
+            obj = self.__materialize(key)
+
+        return obj
+
+    @__writes
     def new(self, obj) -> None:
         """
         Adds a new object to the __objects dictionary attribute.
 
+        The object is also marked as changed, so
+        the next save() persists it.
+
         Args:
             obj: The object to be added to the __objects dictionary.
 
         Returns:
             None
         """
-        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        cls = obj.__class__.__name__
+        key = "{}.{}".format(cls, obj.id)
         self.__objects[key] = obj
+        self.__raw.pop(key, None)
+        self.__by_class.setdefault(cls, {})[obj.id] = obj
+        self.__layout.add(key)
+        self.__index(cls, obj.id, obj)
+        self.__columns.pop(cls, None)
+        self.__dirty[key] = obj
+
+    @__writes
+    def touch(self, obj) -> None:
+        """
+        Marks an object as changed, so the next save() writes it,
+        unless it is no longer in storage: a deleted object
+        is not added back.
+
+        Args:
+            obj: The object.
+
+        Returns:
+            None
+        """
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        self.__ensure_loaded(self.__layout.segment_of(key))
+        if key in self.__objects or key in self.__raw:
+            self.new(obj)
+
+    @__writes
+    def delete(self, obj=None) -> None:
+        """
+        Removes an object from the __objects dictionary attribute.
+
+        Args:
+            obj: The object to be removed. Nothing is done if
+            it is None or if it is not in storage.
+
+        Returns:
+            None
+        """
+        if obj is None:
+            return
+
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if self.__discard(key):
+            self.__dirty[key] = None
+
+    @__writes
+    def clear(self) -> None:
+        """
+        Removes every object from memory, without touching the file.
+
+        The objects are read from the file again
+        the next time they are needed.
+
+        Returns:
+            None
+        """
+        self.__settle()
+        self.__objects.clear()
+        self.__raw.clear()
+        self.__by_class.clear()
+        self.__unindexed.clear()
+        for indexes in self.__indexes.values():
+            for index in indexes.values():
+                index.clear()
+        self.__dirty.clear()
+        self.__cache.clear()
+        self.__columns.clear()
+        self.__loaded.clear()
+        self.__layout.clear()
+        self.__writer.reset()
 
+    @__writes
     def save(self) -> None:
         """
         Serializes the objects stored in the __objects
         dictionary attribute into a JSON file.
 
+        Inside a batch() block, or within the commit window
+        of the last write, the changes are only written later,
+        together with the next ones.
+
+        Returns:
+            None
+        """
+        if self.__batches:
+            return
+
+        window = self.__options["commit_window"]
+        if window and (time.monotonic() - self.__written_at) * 1000 < window:
+            return
+
+        self.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Returns a context manager that writes the changes saved
+        in its block at once, when the outermost block ends.
+
+        Example Usage:
+            with storage.batch():
+                for name in names:
+                    user = User()
+                    user.first_name = name
+                    user.save()
+
+        Yields:
+            FileStorage: The storage.
+        """
+        with self.__locked():
+            FileStorage.__batches += 1
+        try:
+            yield self
+        finally:
+            with self.__locked():
+                FileStorage.__batches -= 1
+                if not self.__batches:
+                    self.flush()
+
+    @__writes
+    def close(self) -> None:
+        """
+        Writes the changes left in memory by the commit window,
+        waits for every write to be on disk and stops the
+        writer thread of background mode.
+
+        Called when the program exits, and by the console on quit.
+        The worker processes of the workers option are stopped too.
+
+        Returns:
+            None
+
+        Raises:
+            OSError: If a write of the writer thread failed.
+        """
+        self.__loader.close()
+
+        if self.__dirty and self.__options["commit_window"]:
+            self.flush()
+
+        try:
+            self.wait_durable()
+        finally:
+            self.__thread.stop()
+
+    @__writes
+    def wait_durable(self) -> None:
+        """
+        Waits for everything saved so far to be on disk: for the
+        writer thread to write the queued saves in background mode,
+        then for the files not synced by the fsync policy.
+
+        Returns:
+            None
+
+        Raises:
+            OSError: If a write of the writer thread failed
+            since the last call.
+        """
+        self.__settle()
+        self.__thread.check()
+        self.sync()
+
+    def __locked(self):
+        """
+        Returns a context manager holding the lock
+        to write in thread safe mode.
+        """
+        if self.__lock is None:
+            return nullcontext()
+        return self.__lock.write()
+
+    def __settled(self) -> bool:
+        """
+        Tells if reading the storage can no longer change it,
+        every segment being read and every object built and indexed.
+
+        Returns:
+            bool: True if the objects can be read by many threads.
+        """
+        return not self.__raw and not self.__unindexed and \
+            self.__loaded.issuperset(self.__layout.segments())
+
+    def __background(self) -> bool:
+        """
+        Tells if the files are written by the writer thread,
+        in background mode but not in shared mode.
+
+        Returns:
+            bool: True if writes are queued.
+        """
+        return self.__options["background"] and not self.__options["shared"]
+
+    def __settle(self) -> None:
+        """
+        Waits for the writer thread to write the queued saves.
+
+        The writer thread never asks for the lock of the thread
+        safe mode, so this can wait while holding it.
+        """
+        self.__thread.settle()
+
+    @__writes
+    def flush(self) -> None:
+        """
+        Writes the objects changed since the last save.
+
+        In journal mode only the changed objects are appended
+        to the journal file, and the journal is compacted once it
+        holds compact_after records. Otherwise the segments holding
+        changed objects are rewritten, and in incremental mode only
+        the changed objects are encoded again.
+
+        Unlike save(), this writes at once, inside
+        a batch() block or the commit window too.
+
+        In shared mode, the files written by other processes
+        are read again first, while holding the lock.
+
+        Returns:
+            None
+        """
+        with self.__interlocked(exclusive=True):
+            self.__flush()
+
+    def __flush(self) -> None:
+        """
+        Writes the objects changed since the last save, see flush().
+        """
+        FileStorage.__written_at = time.monotonic()
+        self.__refresh()
+
+        if not self.__options["journal"]:
+            segments = {self.__layout.segment_of(k) for k in self.__dirty}
+            if not segments:
+                segments = self.__layout.segments()
+            self.__write(segments)
+            return
+
+        if not self.__dirty:
+            return
+
+        lines = []
+        for k, v in self.__dirty.items():
+            self.__cache.pop(k, None)
+            if v is None:
+                record = {"op": "delete", "key": k}
+            else:
+                record = {"op": "put", "key": k, "obj": v.to_dict()}
+            lines.append(json.dumps(record) + "\n")
+        self.__writer.append(self.__journal_path(), lines)
+        self.__stamped(self.__journal_path())
+
+        FileStorage.__journal_count += len(self.__dirty)
+        self.__dirty.clear()
+
+        if self.__journal_count >= self.__options["compact_after"]:
+            self.compact()
+
+    @__writes
+    def compact(self) -> None:
+        """
+        Writes every object to the JSON file and removes the journal.
+
+        The journal is only removed after the JSON file is written,
+        so a crash in between replays changes that are already in
+        the file, which is harmless.
+
+        Returns:
+            None
+        """
+        with self.__interlocked(exclusive=True):
+            self.__refresh()
+            self.__write(self.__layout.segments())
+
+    @__writes
+    def reshard(self, partitioned=False, shards=0) -> None:
+        """
+        Moves every object to the files of another layout: one file
+        per class, a number of shards, or the single JSON file, and
+        sets the partitioned and shards options to match.
+
+        Every file of the current layout is read first, then every
+        object is written to the files of the new one, and the files
+        of the old layout the new one does not use are removed once
+        the new files are written.
+
+        Example Usage:
+            storage.reshard(shards=16)
+
+        Args:
+            partitioned (bool): Store each class in its own file.
+            shards (int): The number of shards, 0 for none.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If shards is negative, or if partitioned
+            and shards are both set.
+        """
+        with self.__interlocked(exclusive=True):
+            self.__refresh()
+            old = self.__layout
+            self.__ensure_segments(old.segments())
+            self.configure(partitioned=partitioned, shards=shards)
+
+            new = self.__layout
+            self.__loaded.update(new.segments())
+            self.__write(new.segments())
+
+            used = {new.path(segment) for segment in new.segments()}
+            for segment in old.segments():
+                path = old.path(segment)
+                if path not in used:
+                    self.__writer.remove(path)
+                    self.__stamped(path)
+
+    def sync(self) -> None:
+        """
+        Waits for the files written without waiting for
+        them to be on disk, by the fsync policy, to be on disk.
+
+        Only the lock of the fsync policy is held, not the lock
+        of the thread safe mode, as the writer thread syncs too.
+
         Returns:
             None
         """
-        serial_objects = {}
+        self.__durability.sync()
+
+    def __write(self, segments) -> None:
+        """
+        Rewrites the given segments and removes the journal.
+
+        A segment that was not read yet is read first,
+        so the objects it holds on disk are kept.
+
+        In background mode only the objects changed since the last
+        write of a segment are encoded here, and the writer thread
+        merges them into the objects it last wrote.
+
+        Args:
+            segments: The segments to write.
+        """
+        self.__ensure_segments(segments)
 
-        for k, v in self.__objects.items():
-            serial_objects[k] = v.to_dict()
+        writer = self.__writer
+        writer.begin()
+        for segment in segments:
+            writer.write(segment)
+            self.__stamped(self.__layout.path(segment))
+        writer.finish()
 
-        with open(self.__file_path, mode='w', encoding="utf-8") as f:
-            json.dump(serial_objects, f)
+        writer.remove(self.__journal_path())
+        self.__stamped(self.__journal_path())
 
+        FileStorage.__journal_count = 0
+        self.__dirty.clear()
+
+    @__writes
     def reload(self):
         """
         Deserializes objects from a JSON file and stores
@@ -88,46 +1014,770 @@ class FileStorage:
         - None
 
         Flow:
-        1. Imports the necessary classes from the model files.
-        2. Tries to open the JSON file specified by the
-        __file_path attribute in read mode.
+        1. Forgets which segments were read. In partitioned and
+        sharded modes without a journal, each file is then read the
+        first time one of its objects is needed, otherwise all of
+        them are read now, with threads rather than the worker
+        processes: this runs while models/__init__.py is imported,
+        and the pool of processes would wait for that import.
+        2. Tries to open the JSON file of each segment in read mode.
         3. If the file exists, loads the contents of the
-        file into the obj_dict dictionary.
-        4. Iterates over each key-value pair in obj_dict.
+        file into a dictionary, or in stream mode reads
+        the key-value pairs one at a time.
+        4. Iterates over each key-value pair.
         5. For each key-value pair, creates an instance of
         the corresponding class using the classes dictionary.
+        In lazy mode, the record is kept in __raw instead.
         6. Initializes the instance with the values from the
         dictionary using the **v syntax.
         7. Adds the instance to the __objects dictionary
-        with the key as the object ID.
+        with the key as the object ID, unless the object was
+        changed in memory since the last save.
         8. If the file does not exist, does nothing.
+        9. Replays the journal file, if there is one,
+        on top of the loaded objects.
 
         Outputs:
         - None
         """
-        from models.base_model import BaseModel
-        from models.user import User
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.place import Place
-        from models.review import Review
-
-        classes = {
-            "BaseModel": BaseModel,
-            "User": User,
-            "State": State,
-            "City": City,
-            "Amenity": Amenity,
-            "Place": Place,
-            "Review": Review
-        }
+        self.__settle()
+        self.__loaded.clear()
+        self.__writer.reset()
+
+        if self.__layout.on_demand and not self.__options["journal"]:
+            return
+
+        with self.__interlocked(exclusive=False):
+            self.__ensure_segments(self.__layout.segments(),
+                                   processes=False)
+            self.__replay()
+
+    @__writes
+    def refresh(self) -> None:
+        """
+        Reads again the files written by other processes since this
+        one last read or wrote them. Only the changed segments are
+        read, and the objects changed in this process since its
+        last save are kept.
+
+        Saves do this on their own in shared mode.
+
+        Returns:
+            None
+        """
+        with self.__interlocked(exclusive=False):
+            self.__refresh()
+
+    def __refresh(self) -> None:
+        """
+        Reads again the segments, and replays again the journal,
+        changed on disk since they were read or written, in shared
+        mode. The objects of a changed segment that are not dirty
+        are removed first, so the ones deleted on disk are gone.
+        """
+        if not self.__options["shared"]:
+            return
+
+        stamps = self.__stamps
+        changed = [segment for segment in self.__loaded
+                   if self.__stamp(self.__layout.path(segment)) !=
+                   stamps.get(self.__layout.path(segment))]
+        journal = self.__journal_path()
+        if not changed and (not self.__options["journal"] or
+                            self.__stamp(journal) == stamps.get(journal)):
+            return
+
+        for segment in changed:
+            for key in self.__layout.members(segment):
+                if key not in self.__dirty:
+                    self.__discard(key)
+            self.__loaded.discard(segment)
+            self.__ensure_loaded(segment)
+
+        self.__replay()
+
+    @contextmanager
+    def __interlocked(self, exclusive):
+        """
+        Returns a context manager holding the lock file in shared
+        mode, unless this process already holds it.
+
+        Args:
+            exclusive (bool): True to write, False to read.
+        """
+        if not self.__options["shared"] or self.__lock_file is not None:
+            yield
+            return
+
+        f = open(self.__file_path + ".lock", "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            FileStorage.__lock_file = f
+            try:
+                yield
+            finally:
+                FileStorage.__lock_file = None
+                fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            f.close()
+
+    def __stamp(self, path):
+        """
+        Returns what tells a version of a file from the next one.
+
+        Args:
+            path (str): The path of the file.
 
+        Returns:
+            tuple: The modification time, size and inode
+            of the file, or None if there is no file.
+        """
         try:
-            with open(self.__file_path, "r", encoding="utf-8") as f:
-                obj_dict = json.load(f)
-            for k, v in obj_dict.items():
-                obj = classes[v["__class__"]](**v)
-                self.__objects[k] = obj
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def __stamped(self, path) -> None:
+        """
+        Records the version of a file read or written
+        by this process, in shared mode. The writes are not
+        queued in that mode, so a file is written once the
+        writer returns.
+
+        Args:
+            path (str): The path of the file.
+        """
+        if self.__options["shared"]:
+            self.__stamps[path] = self.__stamp(path)
+
+    def __ensure_loaded(self, segment) -> None:
+        """
+        Reads a segment file, unless it was read since the last reload().
+
+        Args:
+            segment: The segment to read.
+        """
+        if segment in self.__loaded:
+            return
+
+        with self.__interlocked(exclusive=False):
+            self.__stamped(self.__layout.path(segment))
+            self.__read(segment)
+
+    def __ensure_segments(self, segments, processes=True) -> None:
+        """
+        Reads the segment files not read since the last reload().
+
+        When there are several of them, in partitioned and sharded
+        modes, the loader reads them at once, with threads or with
+        worker processes, and their contents are then added in the
+        order of the segments.
+
+        Args:
+            segments: The segments to read.
+            processes (bool): Whether the loader may use
+            worker processes.
+        """
+        missing = [s for s in segments if s not in self.__loaded]
+        if len(missing) < 2 or not self.__loader.parallel:
+            for segment in missing:
+                self.__ensure_loaded(segment)
+            return
+
+        paths = [self.__layout.path(segment) for segment in missing]
+
+        with self.__interlocked(exclusive=False):
+            for path in paths:
+                self.__stamped(path)
+            contents = self.__loader.read_all(paths, processes)
+
+            for segment, content in zip(missing, contents):
+                self.__loaded.add(segment)
+                self.__add(segment, content)
+
+    def __ensure_class(self, cls) -> None:
+        """
+        Reads the segment files that may hold objects of a class:
+        the file of the class in partitioned mode, every shard
+        in sharded mode, or the single JSON file.
+
+        Args:
+            cls (str): The class name.
+        """
+        self.__ensure_segments(self.__layout.segments_of(cls))
+
+    def __read(self, segment) -> None:
+        """
+        Reads a segment file, see __ensure_loaded().
+
+        Args:
+            segment: The segment to read.
+        """
+        self.__loaded.add(segment)
+        self.__add(segment, self.__loader.read(self.__layout.path(segment)))
+
+    def __add(self, segment, content) -> None:
+        """
+        Adds the content of a segment file read by the loader to
+        the storage: records are added one by one by __load(), a
+        mapped snapshot by __map() and built objects by __adopt().
+
+        Args:
+            segment: The segment of the file.
+            content: The content of the file, see Loader.
+        """
+        kind = self.__loader.content
+        if kind == "snapshot":
+            if content is not None:
+                self.__map(segment, content)
+        elif kind == "objects":
+            self.__adopt(segment, content)
+        else:
+            for k, v in content:
+                if k not in self.__dirty:
+                    self.__load(k, v)
+
+    def __map(self, segment, snapshot) -> None:
+        """
+        Adds the records of a mapped snapshot to the storage,
+        like __load() does in lazy mode, without decoding them.
+        They are only indexed when an index of their class is used.
+
+        Args:
+            segment: The segment of the snapshot.
+            snapshot (Snapshot): The mapped snapshot.
+        """
+        raw, by_class, dirty = self.__raw, self.__by_class, self.__dirty
+        add = self.__layout.add
+        stale = self.__objects or self.__cache
+        classes = set()
+        last = None
+
+        for key, pos in zip(*snapshot.index()):
+            if key in dirty:
+                continue
+            cls, id = key.split(".", 1)
+            if cls != last:
+                classes.add(cls)
+                members = by_class.setdefault(cls, {})
+                last = cls
+            members[id] = None
+            raw[key] = (snapshot, pos)
+            add(key, segment)
+            if stale:
+                self.__objects.pop(key, None)
+                self.__cache.pop(key, None)
+
+        for cls in classes:
+            self.__columns.pop(cls, None)
+            if cls in self.__indexes:
+                self.__unindexed.add(cls)
+
+    def __adopt(self, segment, objs) -> None:
+        """
+        Adds the objects of a segment built by a worker process
+        to the storage, like __load() does, so adding them takes
+        little more than receiving them.
+
+        Args:
+            segment: The segment of the objects.
+            objs (list): The (key, object) pairs.
+        """
+        objects, by_class, dirty = self.__objects, self.__by_class, \
+            self.__dirty
+        add = self.__layout.add
+        stale = self.__raw or self.__cache
+        classes = set()
+        last = None
+
+        for key, obj in objs:
+            if key in dirty:
+                continue
+            cls, id = key.split(".", 1)
+            if cls != last:
+                classes.add(cls)
+                members = by_class.setdefault(cls, {})
+                last = cls
+            members[id] = obj
+            objects[key] = obj
+            add(key, segment)
+            if stale:
+                self.__raw.pop(key, None)
+                self.__cache.pop(key, None)
+
+        for cls in classes:
+            self.__columns.pop(cls, None)
+            if cls in self.__indexes:
+                self.__unindexed.add(cls)
+
+    def __serializer(self):
+        """
+        Returns the serializer of the storage files.
+
+        Returns:
+            The serializer of the format option.
+        """
+        return serializers.FORMATS[self.__options["format"]]
+
+    def __new_layout(self) -> None:
+        """
+        Sets the layout of the segments for the current options,
+        sorting the objects in memory into their shards.
+        """
+        FileStorage.__layout = layouts.create(
+            self.__file_path, self.__serializer(), self.__objects,
+            self.__raw, self.__by_class, self.__options["partitioned"],
+            self.__options["shards"])
+
+    def __new_loader(self) -> None:
+        """
+        Sets the loader of the segment files for the current options.
+        """
+        options = self.__options
+        FileStorage.__loader = loaders.create(
+            options["format"], options["compact"], options["lazy"],
+            options["stream"], options["mmap"], options["workers"])
+
+    def __new_writer(self) -> None:
+        """
+        Sets the writer of the files and the fsync
+        policy for the current options.
+        """
+        options = self.__options
+        self.__durability.policy = options["fsync"]
+        FileStorage.__writer = writers.create(
+            self.__layout, self.__objects, self.__raw, self.__dirty,
+            self.__cache, self.__durability, self.__thread,
+            options["incremental"], options["stream"], self.__background(),
+            options["write_buffer"])
+
+    def __load(self, key, record) -> None:
+        """
+        Adds a record read from disk to the storage, kept as it is
+        in lazy mode. The object is only indexed when an index of
+        its class is used.
+
+        Args:
+            key (str): The key of the object.
+            record (dict): The object as returned by to_dict().
+        """
+        self.__cache.pop(key, None)
+        cls, id = key.split(".", 1)
+        self.__columns.pop(cls, None)
+        self.__layout.add(key)
+
+        if self.__loader.lazy:
+            self.__objects.pop(key, None)
+            self.__raw[key] = record
+            self.__by_class.setdefault(cls, {})[id] = None
+        else:
+            self.__raw.pop(key, None)
+            obj = self.__loader.build(record)
+            self.__objects[key] = obj
+            self.__by_class.setdefault(cls, {})[id] = obj
+        if cls in self.__indexes:
+            self.__unindexed.add(cls)
+
+    @__reads
+    def search(self, cls, order_by=None, limit=None, reverse=False,
+               **ranges) -> list:
+        """
+        Returns the objects of a class with numeric attribute
+        values in the given ranges, optionally sorted.
+
+        Each range is a (low, high) pair, both included, where
+        None means unbounded. Ranges on attributes with a "sorted"
+        index are read from the index; when order_by has a sorted
+        index, objects are read from it in order and the search
+        stops after limit matches.
+
+        Example Usage:
+            storage.search(Place, price_by_night=(None, 100),
+                           max_guest=(4, None),
+                           order_by="price_by_night", limit=10)
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            order_by (str): The attribute to sort by, if any.
+            limit (int): The maximum number of objects returned.
+            reverse (bool): Sort the highest values first.
+            **ranges: The (low, high) range of each attribute.
+
+        Returns:
+            list: The matching objects.
+        """
+        cls = self._name(cls)
+
+        self.__ensure_class(cls)
+        self.__ensure_indexed(cls)
+        members = self.__by_class.get(cls, {})
+        indexes = {a: i for a, i in self.__indexes.get(cls, {}).items()
+                   if isinstance(i, index_kinds.SortedIndex)}
+        checks = dict(ranges)
+
+        if order_by in indexes:
+            low, high = checks.pop(order_by, (None, None))
+            ids = indexes[order_by].range(low, high, reverse)
+            order_by = None
+        else:
+            found = [set(indexes[a].range(*checks.pop(a)))
+                     for a in list(checks) if a in indexes]
+            if found:
+                found.sort(key=len)
+                ids = found[0].intersection(*found[1:])
+            else:
+                ids = members
+
+        objs = []
+        for id in ids:
+            obj = members[id]
+            if obj is None:
+                obj = self.__materialize(cls + "." + id)
+            if all(self.__in_range(getattr(obj, a, None), r)
+                   for a, r in checks.items()):
+                objs.append(obj)
+                if order_by is None and limit is not None and \
+                        len(objs) >= limit:
+                    break
+
+        if order_by is not None:
+            objs = [o for o in objs
+                    if self.__in_range(getattr(o, order_by, None),
+                                       (None, None))]
+            objs.sort(key=lambda o: float(getattr(o, order_by)),
+                      reverse=reverse)
+
+        return objs if limit is None else objs[:limit]
+
+    @__reads
+    def within_radius(self, cls, lat, lon, km) -> list:
+        """
+        Returns the objects of a class within a distance of a point.
+
+        The candidates are read from the "grid" index of the class,
+        or every object of the class is checked when it has none.
+
+        Example Usage:
+            storage.within_radius(Place, 48.8566, 2.3522, 5)
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            km (float): The distance, in kilometers.
+
+        Returns:
+            list: The objects, nearest first.
+        """
+        cls, index = self.__grid(cls)
+        if index is None:
+            index = self.__scan_grid(cls)
+
+        return [self.__member(cls, id)
+                for _, id in index.within_radius(lat, lon, km)]
+
+    @__reads
+    def within_box(self, cls, south, west, north, east) -> list:
+        """
+        Returns the objects of a class in a latitude/longitude box.
+
+        The candidates are read from the "grid" index of the class,
+        or every object of the class is checked when it has none.
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            south (float): The lowest latitude.
+            west (float): The western longitude, greater than
+            east when the box crosses the 180th meridian.
+            north (float): The highest latitude.
+            east (float): The eastern longitude.
+
+        Returns:
+            list: The objects.
+        """
+        cls, index = self.__grid(cls)
+        if index is None:
+            index = self.__scan_grid(cls)
+
+        return [self.__member(cls, id)
+                for id in index.within_box(south, west, north, east)]
+
+    @__writes
+    def columns(self, cls) -> ColumnStore:
+        """
+        Returns the numeric attributes and the "*_id" foreign keys
+        of the objects of a class as columns, for aggregations.
+
+        The columns are those declared on the model class, read
+        without building the objects in lazy mode. They are built
+        on the first call and reused until an object of the class
+        is added, saved or removed. Like for the indexes, an
+        attribute changed without saving the object is not seen.
+
+        Example Usage:
+            places = storage.columns(Place)
+            places.mean("price_by_night")
+            places.count_by("city_id")
+            places.mean_by("price_by_night", "city_id")
+
+        Args:
+            cls: The class, or the class name, of the objects.
+
+        Returns:
+            ColumnStore: The columns, to be treated as read only.
+        """
+        cls = self._name(cls)
+
+        self.__ensure_class(cls)
+        store = self.__columns.get(cls)
+        if store is not None:
+            return store
+
+        model = self._classes().get(cls)
+        numbers, keys = [], []
+        for name in dir(model):
+            value = getattr(model, name)
+            if name.startswith("_") or isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                numbers.append(name)
+            elif name.endswith("_id") and isinstance(value, str):
+                keys.append(name)
+
+        store = ColumnStore(numbers, keys)
+        for id, obj in self.__by_class.get(cls, {}).items():
+            record = self.__record(cls, id, obj)
+            store.add(id, {a: self.__value(cls, obj, record, a)
+                           for a in numbers + keys})
+
+        self.__columns[cls] = store
+        return store
+
+    def __grid(self, cls) -> tuple:
+        """
+        Returns the "grid" index of a class.
+
+        Args:
+            cls: The class, or the class name.
+
+        Returns:
+            tuple: The class name and its grid index, or None.
+        """
+        cls = self._name(cls)
+
+        self.__ensure_class(cls)
+        self.__ensure_indexed(cls)
+        for index in self.__indexes.get(cls, {}).values():
+            if isinstance(index, index_kinds.GridIndex):
+                return cls, index
+
+        return cls, None
+
+    def __scan_grid(self, cls):
+        """
+        Builds a throwaway grid of the latitude and longitude
+        of every object of a class without a "grid" index.
+
+        Args:
+            cls (str): The class name.
+
+        Returns:
+            GridIndex: The grid.
+        """
+        index = index_kinds.GridIndex(cell=180)
+        for id, obj in self.__by_class.get(cls, {}).items():
+            record = self.__record(cls, id, obj)
+            index.add(id, (self.__value(cls, obj, record, "latitude"),
+                           self.__value(cls, obj, record, "longitude")))
+        return index
+
+    def __member(self, cls, id):
+        """
+        Returns an object of a class, building it if needed.
+
+        Args:
+            cls (str): The class name.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object.
+        """
+        obj = self.__by_class[cls][id]
+        if obj is None:
+            obj = self.__materialize(cls + "." + id)
+        return obj
+
+    @staticmethod
+    def __in_range(value, bounds) -> bool:
+        """
+        Tells if a value is a number within a range.
+
+        Args:
+            value: The value, a number or a string holding one.
+            bounds (tuple): The (low, high) range, both included,
+            where None means unbounded.
+
+        Returns:
+            bool: True if the value is within the range.
+        """
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+
+        low, high = bounds
+        return value == value and \
+            (low is None or value >= low) and \
+            (high is None or value <= high)
+
+    def __index(self, cls, id, obj, record=None) -> None:
+        """
+        Adds an object to the secondary indexes of its class.
+
+        Args:
+            cls (str): The class name of the object.
+            id (str): The id of the object.
+            obj: The object, or None if it is not built.
+            record (dict): The record of the object when it
+            is not built.
+        """
+        indexes = self.__indexes.get(cls)
+        if not indexes:
+            return
+
+        for attr, index in indexes.items():
+            if isinstance(attr, tuple):
+                value = tuple(self.__value(cls, obj, record, a)
+                              for a in attr)
+            else:
+                value = self.__value(cls, obj, record, attr)
+            index.add(id, value)
+
+    def __value(self, cls, obj, record, attr):
+        """
+        Returns the value of an attribute of an object, built or not.
+
+        Args:
+            cls (str): The class name of the object.
+            obj: The object, or None if it is not built.
+            record (dict): The record of the object when it
+            is not built.
+            attr (str): The name of the attribute.
+
+        Returns:
+            The value, the class default or None.
+        """
+        if obj is not None:
+            return getattr(obj, attr, None)
+        if attr in record:
+            return record[attr]
+        return getattr(self._classes().get(cls), attr, None)
+
+    def __discard(self, key) -> bool:
+        """
+        Removes an object, built or not, from memory.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            bool: True if the object was in memory.
+        """
+        self.__cache.pop(key, None)
+        cls, id = key.split(".", 1)
+        self.__columns.pop(cls, None)
+        found = self.__by_class.get(cls, {}).pop(id, 0) != 0
+        for index in self.__indexes.get(cls, {}).values():
+            index.remove(id)
+        self.__objects.pop(key, None)
+        self.__raw.pop(key, None)
+        self.__layout.discard(key)
+
+        return found
+
+    def __record(self, cls, id, obj):
+        """
+        Returns the record of an object that is not built.
+
+        Args:
+            cls (str): The class name of the object.
+            id (str): The id of the object.
+            obj: The object, or None if it is not built.
+
+        Returns:
+            dict: The record, or None if the object is built.
+        """
+        if obj is not None:
+            return None
+        return loaders.unpack(self.__raw[cls + "." + id])
+
+    def __ensure_indexed(self, cls) -> None:
+        """
+        Adds the objects of a class read from disk, built or not,
+        to the indexes of the class, once.
+
+        Args:
+            cls (str): The class name.
+        """
+        if cls not in self.__unindexed:
+            return
+
+        self.__unindexed.discard(cls)
+        for id, obj in self.__by_class.get(cls, {}).items():
+            self.__index(cls, id, obj, self.__record(cls, id, obj))
+
+    def __materialize(self, key):
+        """
+        Turns a record kept by lazy mode into a model instance.
+
+        Args:
+            key (str): The key of the record in __raw.
+
+        Returns:
+            BaseModel: The new instance, now in __objects.
+        """
+        obj = self.__loader.build(loaders.unpack(self.__raw[key]))
+        del self.__raw[key]
+        self.__objects[key] = obj
+        self.__by_class[key.split(".", 1)[0]][obj.id] = obj
+        return obj
+
+    def __replay(self) -> None:
+        """
+        Applies the records of the journal file to __objects.
+
+        A partially written last line, left by a crash
+        in the middle of an append, is ignored, and so are
+        the records of the objects changed since the last save.
+        """
+        count = 0
+        self.__stamped(self.__journal_path())
+
+        try:
+            with open(self.__journal_path(), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    count += 1
+                    if record["key"] in self.__dirty:
+                        continue
+                    if record["op"] == "put":
+                        self.__load(record["key"], record["obj"])
+                    else:
+                        self.__discard(record["key"])
         except FileNotFoundError:
             pass
+
+        FileStorage.__journal_count = count
+
+    def __journal_path(self) -> str:
+        """
+        Returns the path of the journal file.
+
+        Returns:
+            str: The JSON file path followed by '.journal'.
+        """
+        return self.__file_path + ".journal"
@@ -0,0 +1,496 @@
+#!/usr/bin/python3
+"""
+Module that defines the secondary indexes used by FileStorage
+to find objects by attribute value without scanning every object
+"""
+
+import threading
+from bisect import bisect_left
+from math import asin, cos, floor, radians, sin, sqrt
+
+# Sorts after any id, so (value, MAX_ID) follows every (value, id) entry
+MAX_ID = chr(0x10FFFF)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(lat1, lon1, lat2, lon2) -> float:
+    """
+    Returns the great-circle distance between two points.
+
+    Args:
+        lat1 (float): The latitude of the first point, in degrees.
+        lon1 (float): The longitude of the first point, in degrees.
+        lat2 (float): The latitude of the second point, in degrees.
+        lon2 (float): The longitude of the second point, in degrees.
+
+    Returns:
+        float: The distance in kilometers.
+    """
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+class HashIndex:
+    """
+    Maps the values of one attribute to the ids of the objects
+    holding them, e.g. City.state_id to the ids of its cities.
+
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        __ids (dict): The ids of the objects for each value.
+        __values (dict): The indexed value of each object id.
+
+    Methods:
+        add(self, id, value) -> None:
+            Indexes an object, replacing its previous value.
+
+        remove(self, id) -> None:
+            Removes an object from the index.
+
+        lookup(self, value) -> set:
+            Returns the ids of the objects with the given value.
+
+        clear(self) -> None:
+            Removes every object from the index.
+    """
+
+    def __init__(self, attr):
+        """
+        Initializes an empty index.
+
+        Args:
+            attr (str): The name of the indexed attribute.
+        """
+        self.attr = attr
+        self.__ids = {}
+        self.__values = {}
+
+    def __len__(self):
+        """
+        Returns the number of indexed objects.
+        """
+        return len(self.__values)
+
+    def add(self, id, value) -> None:
+        """
+        Indexes an object, replacing its previous value.
+
+        Values that cannot be hashed, like lists,
+        are not indexed.
+
+        Args:
+            id (str): The id of the object.
+            value: The value of the attribute.
+        """
+        self.remove(id)
+
+        try:
+            self.__ids.setdefault(value, set()).add(id)
+        except TypeError:
+            return
+
+        self.__values[id] = value
+
+    def remove(self, id) -> None:
+        """
+        Removes an object from the index.
+
+        Args:
+            id (str): The id of the object.
+        """
+        if id not in self.__values:
+            return
+
+        value = self.__values.pop(id)
+        ids = self.__ids[value]
+        ids.discard(id)
+        if not ids:
+            del self.__ids[value]
+
+    def lookup(self, value) -> set:
+        """
+        Returns the ids of the objects with the given value.
+
+        Args:
+            value: The value of the attribute.
+
+        Returns:
+            set: The ids, to be treated as read only.
+        """
+        try:
+            return self.__ids.get(value, set())
+        except TypeError:
+            return set()
+
+    def clear(self) -> None:
+        """
+        Removes every object from the index.
+        """
+        self.__ids.clear()
+        self.__values.clear()
+
+
+class SortedIndex:
+    """
+    Keeps the ids of objects sorted by the numeric value of one
+    attribute, e.g. Place.price_by_night, for range queries and
+    ordered iteration.
+
+    Values are compared as floats, so the strings
+    set by the console's update command are indexed too.
+
+    The objects added are only sorted into the index by the next
+    query or removal, all at once, so indexing every object read
+    by reload() costs one sort rather than one insertion each.
+    Queries may run in several threads at once in the thread safe
+    mode of FileStorage, so the sort holds a lock.
+
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        __entries (list): The (value, id) pairs, sorted.
+        __added (list): The (value, id) pairs added since
+        the entries were last sorted.
+        __lock (Lock): Guards the sort.
+        __values (dict): The indexed value of each object id.
+
+    Methods:
+        add(self, id, value) -> None:
+            Indexes an object, replacing its previous value.
+
+        remove(self, id) -> None:
+            Removes an object from the index.
+
+        lookup(self, value) -> set:
+            Returns the ids of the objects with the given value.
+
+        range(self, low=None, high=None, reverse=False):
+            Yields the ids of the objects with a value
+            between low and high, in order.
+
+        value(self, id) -> float:
+            Returns the indexed value of an object.
+
+        clear(self) -> None:
+            Removes every object from the index.
+    """
+
+    def __init__(self, attr):
+        """
+        Initializes an empty index.
+
+        Args:
+            attr (str): The name of the indexed attribute.
+        """
+        self.attr = attr
+        self.__entries = []
+        self.__added = []
+        self.__lock = threading.Lock()
+        self.__values = {}
+
+    def __len__(self):
+        """
+        Returns the number of indexed objects.
+        """
+        return len(self.__values)
+
+    def add(self, id, value) -> None:
+        """
+        Indexes an object, replacing its previous value.
+
+        Values that are not numbers, and cannot
+        be read as one, are not indexed. Neither is NaN.
+
+        Args:
+            id (str): The id of the object.
+            value: The value of the attribute.
+        """
+        self.remove(id)
+
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        if value != value:
+            return
+
+        self.__added.append((value, id))
+        self.__values[id] = value
+
+    def remove(self, id) -> None:
+        """
+        Removes an object from the index.
+
+        Args:
+            id (str): The id of the object.
+        """
+        if id not in self.__values:
+            return
+
+        self.__sort()
+        value = self.__values.pop(id)
+        del self.__entries[bisect_left(self.__entries, (value, id))]
+
+    def __sort(self) -> None:
+        """
+        Sorts the objects added since the last call into the entries.
+        """
+        if not self.__added:
+            return
+
+        with self.__lock:
+            if self.__added:
+                self.__entries.extend(self.__added)
+                self.__added.clear()
+                self.__entries.sort()
+
+    def lookup(self, value) -> set:
+        """
+        Returns the ids of the objects with the given value.
+
+        Args:
+            value: The value of the attribute.
+
+        Returns:
+            set: The ids.
+        """
+        try:
+            return set(self.range(value, value))
+        except (TypeError, ValueError):
+            return set()
+
+    def range(self, low=None, high=None, reverse=False):
+        """
+        Yields the ids of the objects with a value
+        between low and high, both included, in order.
+
+        Args:
+            low: The lowest value, or None for no lower bound.
+            high: The highest value, or None for no upper bound.
+            reverse (bool): Yield the highest values first.
+
+        Yields:
+            str: The ids of the objects.
+        """
+        self.__sort()
+        entries = self.__entries
+        start = 0 if low is None else \
+            bisect_left(entries, (float(low), ""))
+        stop = len(entries) if high is None else \
+            bisect_left(entries, (float(high), MAX_ID))
+
+        if reverse:
+            for i in range(stop - 1, start - 1, -1):
+                yield entries[i][1]
+        else:
+            for i in range(start, stop):
+                yield entries[i][1]
+
+    def value(self, id):
+        """
+        Returns the indexed value of an object.
+
+        Args:
+            id (str): The id of the object.
+
+        Returns:
+            float: The value, or None if the object is not indexed.
+        """
+        return self.__values.get(id)
+
+    def clear(self) -> None:
+        """
+        Removes every object from the index.
+        """
+        self.__entries.clear()
+        self.__added.clear()
+        self.__values.clear()
+
+
+class GridIndex:
+    """
+    Places the ids of objects in the cells of a latitude/longitude
+    grid, e.g. by Place.latitude and Place.longitude, so the objects
+    in an area are found by only looking at the cells covering it.
+
+    Attributes:
+        attr (tuple): The names of the latitude
+        and longitude attributes.
+        cell (float): The size of a cell, in degrees.
+        __cells (dict): The ids of the objects in each cell.
+        __points (dict): The (latitude, longitude) of each object id.
+
+    Methods:
+        add(self, id, value) -> None:
+            Indexes an object, replacing its previous position.
+
+        remove(self, id) -> None:
+            Removes an object from the index.
+
+        within_box(self, south, west, north, east) -> list:
+            Returns the ids of the objects in a box.
+
+        within_radius(self, lat, lon, km) -> list:
+            Returns the distance and id of the objects
+            near a point, nearest first.
+
+        clear(self) -> None:
+            Removes every object from the index.
+    """
+
+    def __init__(self, attr=("latitude", "longitude"), cell=0.1):
+        """
+        Initializes an empty index.
+
+        Args:
+            attr (tuple): The names of the latitude
+            and longitude attributes.
+            cell (float): The size of a cell, in degrees.
+        """
+        self.attr = attr
+        self.cell = cell
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """
+        Returns the number of indexed objects.
+        """
+        return len(self.__points)
+
+    def __cell_of(self, lat, lon) -> tuple:
+        """
+        Returns the cell holding a point.
+        """
+        return (floor(lat / self.cell), floor(lon / self.cell))
+
+    def add(self, id, value) -> None:
+        """
+        Indexes an object, replacing its previous position.
+
+        Positions that are not numbers, or not a valid
+        latitude and longitude, are not indexed.
+
+        Args:
+            id (str): The id of the object.
+            value (tuple): The (latitude, longitude) of the object.
+        """
+        self.remove(id)
+
+        try:
+            lat, lon = float(value[0]), float(value[1])
+        except (TypeError, ValueError, IndexError):
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return
+
+        self.__cells.setdefault(self.__cell_of(lat, lon), set()).add(id)
+        self.__points[id] = (lat, lon)
+
+    def remove(self, id) -> None:
+        """
+        Removes an object from the index.
+
+        Args:
+            id (str): The id of the object.
+        """
+        if id not in self.__points:
+            return
+
+        cell = self.__cell_of(*self.__points.pop(id))
+        ids = self.__cells[cell]
+        ids.discard(id)
+        if not ids:
+            del self.__cells[cell]
+
+    def within_box(self, south, west, north, east) -> list:
+        """
+        Returns the ids of the objects in a box, edges included.
+
+        A box with west greater than east crosses
+        the 180th meridian.
+
+        Args:
+            south (float): The lowest latitude.
+            west (float): The western longitude.
+            north (float): The highest latitude.
+            east (float): The eastern longitude.
+
+        Returns:
+            list: The ids of the objects.
+        """
+        if west > east:
+            return self.within_box(south, west, north, 180) + \
+                self.within_box(south, -180, north, east)
+
+        points = self.__points
+        rows = floor(north / self.cell) - floor(south / self.cell) + 1
+        cols = floor(east / self.cell) - floor(west / self.cell) + 1
+
+        if rows <= 0 or cols <= 0:
+            return []
+
+        if rows * cols >= len(self.__cells):
+            candidates = points
+        else:
+            candidates = []
+            (row, col) = self.__cell_of(south, west)
+            for i in range(row, row + rows):
+                for j in range(col, col + cols):
+                    candidates.extend(self.__cells.get((i, j), ()))
+
+        return [id for id in candidates
+                if south <= points[id][0] <= north and
+                west <= points[id][1] <= east]
+
+    def within_radius(self, lat, lon, km) -> list:
+        """
+        Returns the objects within a distance of a point.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            km (float): The distance, in kilometers.
+
+        Returns:
+            list: The (distance, id) pairs, nearest first.
+        """
+        dlat = km / (EARTH_RADIUS_KM * radians(1))
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        shrink = min(cos(radians(south)), cos(radians(north)))
+
+        if north >= 90 or south <= -90 or \
+                km >= shrink * EARTH_RADIUS_KM * radians(180):
+            west, east = -180.0, 180.0
+        else:
+            dlon = dlat / shrink
+            west, east = lon - dlon, lon + dlon
+            if west < -180:
+                west += 360
+            if east > 180:
+                east -= 360
+
+        points = self.__points
+        found = []
+        for id in self.within_box(south, west, north, east):
+            distance = haversine(lat, lon, *points[id])
+            if distance <= km:
+                found.append((distance, id))
+
+        found.sort()
+        return found
+
+    def clear(self) -> None:
+        """
+        Removes every object from the index.
+        """
+        self.__cells.clear()
+        self.__points.clear()
+
+
+KINDS = {
+    "hash": HashIndex,
+    "sorted": SortedIndex,
+    "grid": GridIndex,
+}
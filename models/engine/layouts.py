@@ -0,0 +1,340 @@
+#!/usr/bin/python3
+"""
+Module that defines the layouts of the files of FileStorage: a single
+file, one file per class, or a number of files chosen by a hash of
+the key of each object. Each of these files is called a segment.
+"""
+
+import os
+import zlib
+from models.engine import registry
+
+
+class SingleFile:
+    """
+    The layout of a storage holding every object in one file,
+    the only segment, named None.
+
+    The layouts do not own the objects: they are given the
+    dictionaries of the storage and only look at them, to tell
+    which objects each segment holds.
+
+    Attributes:
+        file_path (str): The path of the storage file.
+        serializer: The format of the files.
+        on_demand (bool): Whether the segments are only read the
+        first time one of their objects is needed, rather than
+        all of them by reload().
+        _objects (dict): The objects built, by key.
+        _raw (dict): The records not built yet, by key.
+        _by_class (dict): The ids of the objects of each class name.
+
+    Methods:
+        segments(self) -> list:
+            Returns every segment.
+
+        segment_of(self, key):
+            Returns the segment of an object.
+
+        segments_of(self, cls) -> list:
+            Returns the segments that may hold objects of a class.
+
+        path(self, segment) -> str:
+            Returns the path of the file of a segment.
+
+        members(self, segment) -> list:
+            Returns the keys of the objects of a segment.
+
+        add(self, key, segment=None) -> None:
+            Records that an object is in storage.
+
+        discard(self, key) -> None:
+            Records that an object left the storage.
+
+        clear(self) -> None:
+            Forgets every object.
+    """
+
+    on_demand = False
+
+    def __init__(self, file_path, serializer, objects, raw, by_class):
+        """
+        Initializes the layout.
+
+        Args:
+            file_path (str): The path of the storage file.
+            serializer: The format of the files.
+            objects (dict): The objects built, by key.
+            raw (dict): The records not built yet, by key.
+            by_class (dict): The ids of the objects of each class name.
+        """
+        self.file_path = file_path
+        self.serializer = serializer
+        self._objects = objects
+        self._raw = raw
+        self._by_class = by_class
+
+    def segments(self) -> list:
+        """
+        Returns every segment of the storage.
+
+        Returns:
+            list: [None] for the single file.
+        """
+        return [None]
+
+    def segment_of(self, key):
+        """
+        Returns the segment an object belongs to.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            None for the single file.
+        """
+        return None
+
+    def segments_of(self, cls) -> list:
+        """
+        Returns the segments that may hold objects of a class.
+
+        Args:
+            cls (str): The class name.
+
+        Returns:
+            list: The segments.
+        """
+        return [self.segment_of(cls)]
+
+    def path(self, segment) -> str:
+        """
+        Returns the path of a segment file.
+
+        Args:
+            segment: The segment.
+
+        Returns:
+            str: file_path for the single file, otherwise file_path
+            with the segment before the extension. The extension
+            is the one of the format if it has one.
+        """
+        root, ext = os.path.splitext(self.file_path)
+        ext = self.serializer.suffix or ext
+
+        if segment is None:
+            return root + ext
+        return "{}.{}{}".format(root, segment, ext)
+
+    def members(self, segment) -> list:
+        """
+        Returns the keys of the objects in a segment.
+
+        Args:
+            segment: The segment.
+
+        Returns:
+            list: The keys, built or not.
+        """
+        return list(self._objects) + list(self._raw)
+
+    def add(self, key, segment=None) -> None:
+        """
+        Records that an object is in storage, which the
+        single file and the class files do not need.
+
+        Args:
+            key (str): The key of the object.
+            segment: The segment of the object, if known.
+        """
+
+    def discard(self, key) -> None:
+        """
+        Records that an object left the storage.
+
+        Args:
+            key (str): The key of the object.
+        """
+
+    def clear(self) -> None:
+        """
+        Forgets every object.
+        """
+
+
+class Partitioned(SingleFile):
+    """
+    The layout of a storage holding the objects of each class in
+    its own file, e.g. file.User.json, the segment being the class
+    name. The files are read the first time they are needed.
+    """
+
+    on_demand = True
+
+    def segments(self) -> list:
+        """
+        Returns every segment of the storage.
+
+        Returns:
+            list: The class names.
+        """
+        return list(registry.classes())
+
+    def segment_of(self, key):
+        """
+        Returns the segment an object belongs to.
+
+        Args:
+            key (str): The key of the object, or a class name.
+
+        Returns:
+            str: The class name.
+        """
+        return key.split(".", 1)[0]
+
+    def members(self, segment) -> list:
+        """
+        Returns the keys of the objects of a class.
+
+        Args:
+            segment (str): The class name.
+
+        Returns:
+            list: The keys, built or not.
+        """
+        return [segment + "." + id for id in self._by_class.get(segment, ())]
+
+
+class Sharded(SingleFile):
+    """
+    The layout of a storage holding the objects in a number of files,
+    e.g. file.0.json to file.15.json, the file of an object chosen by
+    the CRC-32 of its key. The segment is the shard number. The files
+    are read the first time they are needed.
+
+    Attributes:
+        shards (int): The number of shards.
+        keys (dict): The keys of the objects of each
+        shard number, built or not.
+    """
+
+    on_demand = True
+
+    def __init__(self, file_path, serializer, objects, raw, by_class,
+                 shards):
+        """
+        Initializes the layout, sorting the objects
+        already in storage into their shards.
+
+        Args:
+            file_path (str): The path of the storage file.
+            serializer: The format of the files.
+            objects (dict): The objects built, by key.
+            raw (dict): The records not built yet, by key.
+            by_class (dict): The ids of the objects of each class name.
+            shards (int): The number of shards.
+        """
+        super().__init__(file_path, serializer, objects, raw, by_class)
+        self.shards = shards
+        self.keys = {shard: {} for shard in range(shards)}
+        for key in list(objects) + list(raw):
+            self.add(key)
+
+    def segments(self) -> list:
+        """
+        Returns every segment of the storage.
+
+        Returns:
+            list: The shard numbers.
+        """
+        return list(range(self.shards))
+
+    def segment_of(self, key):
+        """
+        Returns the segment an object belongs to.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            int: The shard number.
+        """
+        return zlib.crc32(key.encode()) % self.shards
+
+    def segments_of(self, cls) -> list:
+        """
+        Returns every shard, as any of them may hold objects of a class.
+
+        Args:
+            cls (str): The class name.
+
+        Returns:
+            list: The shard numbers.
+        """
+        return self.segments()
+
+    def members(self, segment) -> list:
+        """
+        Returns the keys of the objects of a shard.
+
+        Args:
+            segment (int): The shard number.
+
+        Returns:
+            list: The keys, built or not.
+        """
+        return list(self.keys[segment])
+
+    def add(self, key, segment=None) -> None:
+        """
+        Adds an object to its shard.
+
+        Args:
+            key (str): The key of the object.
+            segment (int): The shard of the object, if known.
+        """
+        if segment is None:
+            segment = self.segment_of(key)
+        self.keys[segment][key] = None
+
+    def discard(self, key) -> None:
+        """
+        Removes an object from its shard.
+
+        Args:
+            key (str): The key of the object.
+        """
+        self.keys[self.segment_of(key)].pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Forgets every object.
+        """
+        for keys in self.keys.values():
+            keys.clear()
+
+
+def create(file_path, serializer, objects, raw, by_class,
+           partitioned=False, shards=0):
+    """
+    Returns the layout of the given storage options.
+
+    Args:
+        file_path (str): The path of the storage file.
+        serializer: The format of the files.
+        objects (dict): The objects built, by key.
+        raw (dict): The records not built yet, by key.
+        by_class (dict): The ids of the objects of each class name.
+        partitioned (bool): One file per class.
+        shards (int): The number of shards, 0 for a single file.
+
+    Returns:
+        SingleFile: The layout.
+    """
+    if partitioned:
+        return Partitioned(file_path, serializer, objects, raw, by_class)
+    if shards:
+        return Sharded(file_path, serializer, objects, raw, by_class,
+                       shards)
+
+    return SingleFile(file_path, serializer, objects, raw, by_class)
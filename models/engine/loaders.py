@@ -0,0 +1,352 @@
+#!/usr/bin/python3
+"""
+Module that defines how FileStorage reads its segment files: whole
+and several at once with threads, record by record, mapped in
+memory, or with worker processes building the objects
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from models import compact
+from models.engine import registry
+from models.engine import serializers
+
+# The number of threads reading the files of a partitioned
+# or sharded storage at once
+READERS = 8
+
+# The start method of the worker processes: forked, they have the
+# models imported already and never import them again, which would
+# build and load a storage of their own
+START_METHOD = "fork"
+
+
+def _read_segment(path, serializer) -> dict:
+    """
+    Reads the records of a segment file, for the pool
+    of threads reading several segments at once.
+
+    Args:
+        path (str): The path of the file.
+        serializer: The format of the file.
+
+    Returns:
+        dict: The records by key, empty if there is no file.
+    """
+    try:
+        return serializers.read(path, serializer)
+    except FileNotFoundError:
+        return {}
+
+
+def _build(record, compacted=False):
+    """
+    Creates the model instance described by a record.
+
+    Args:
+        record (dict): The object as returned by to_dict().
+        compacted (bool): Build it with models.compact.build().
+
+    Returns:
+        BaseModel: The new instance.
+    """
+    cls = registry.classes()[record["__class__"]]
+    if compacted:
+        return compact.build(cls, record)
+    return cls(**record)
+
+
+def _build_segment(path, format, compacted) -> list:
+    """
+    Reads a segment file and builds its objects, in a worker
+    process of the pool reading several segments at once.
+
+    The objects are sent back pickled, compact ones
+    through CompactModel.__reduce__().
+
+    Args:
+        path (str): The path of the file.
+        format (str): The format of the file.
+        compacted (bool): Build the objects with models.compact.build().
+
+    Returns:
+        list: The (key, object) pairs, empty if there is no file.
+    """
+    records = _read_segment(path, serializers.FORMATS[format])
+    return [(key, _build(record, compacted))
+            for key, record in records.items()]
+
+
+def unpack(entry) -> dict:
+    """
+    Returns a record kept by lazy or mmap mode,
+    decoding it from its snapshot in mmap mode.
+
+    Args:
+        entry: The record, or the (Snapshot, position) of the record.
+
+    Returns:
+        dict: The record.
+    """
+    if isinstance(entry, tuple):
+        snapshot, pos = entry
+        return snapshot.record(pos)
+    return entry
+
+
+class Loader:
+    """
+    Reads each segment file whole, the files needed at once
+    being read and decoded by a pool of threads.
+
+    What read() and read_all() return for each file is told by
+    content: "records", the (key, record) pairs to add one by one,
+    "snapshot", a mapped Snapshot or None, or "objects", the
+    (key, object) pairs of objects already built.
+
+    Attributes:
+        format (str): The format of the files.
+        serializer: The serializer of the format.
+        compacted (bool): Build the objects with models.compact.build().
+        lazy (bool): Keep the records as they are and
+        only build the objects when needed.
+        content (str): What the files are read as.
+        parallel (bool): Whether read_all() reads several files at once.
+
+    Methods:
+        read(self, path):
+            Returns the content of a segment file.
+
+        read_all(self, paths, processes=True) -> list:
+            Returns the content of several segment files.
+
+        build(self, record) -> BaseModel:
+            Creates the model instance described by a record.
+
+        close(self) -> None:
+            Stops what the loader started.
+    """
+
+    content = "records"
+    parallel = True
+
+    def __init__(self, format="json", compacted=False, lazy=False):
+        """
+        Initializes the loader.
+
+        Args:
+            format (str): The format of the files.
+            compacted (bool): Build the objects with
+            models.compact.build().
+            lazy (bool): Only build the objects when needed.
+        """
+        self.format = format
+        self.serializer = serializers.FORMATS[format]
+        self.compacted = compacted
+        self.lazy = lazy
+
+    def read(self, path):
+        """
+        Reads a segment file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            The (key, record) pairs, none if there is no file.
+        """
+        return _read_segment(path, self.serializer).items()
+
+    def read_all(self, paths, processes=True) -> list:
+        """
+        Reads several segment files at once, with a pool of threads.
+
+        Args:
+            paths (list): The paths of the files.
+            processes (bool): Whether worker processes may be used,
+            which this loader never does.
+
+        Returns:
+            list: The content of each file, in the order of the paths.
+        """
+        with ThreadPoolExecutor(min(len(paths), READERS)) as pool:
+            return [records.items() for records in pool.map(
+                _read_segment, paths, [self.serializer] * len(paths))]
+
+    def build(self, record):
+        """
+        Creates the model instance described by a record.
+
+        Args:
+            record (dict): The object as returned by to_dict().
+
+        Returns:
+            BaseModel: The new instance.
+        """
+        return _build(record, self.compacted)
+
+    def close(self) -> None:
+        """
+        Stops what the loader started, nothing for threads.
+        """
+
+
+class StreamLoader(Loader):
+    """
+    Reads the segment files record by record, each object being
+    added before the next record is read, so a whole file is never
+    held in memory. The files are read one at a time.
+    """
+
+    parallel = False
+
+    def read(self, path):
+        """
+        Starts reading a segment file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            The (key, record) pairs, read as they are iterated,
+            none if there is no file.
+        """
+        try:
+            return serializers.stream(path, self.serializer)
+        except FileNotFoundError:
+            return ()
+
+
+class MappedLoader(Loader):
+    """
+    Maps binary snapshots in memory, a record only being decoded
+    when it is needed, found through the index of the snapshot.
+    """
+
+    content = "snapshot"
+    parallel = False
+
+    def read(self, path):
+        """
+        Maps a snapshot file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            Snapshot: The mapped snapshot, or None if there is no file.
+        """
+        try:
+            return serializers.Snapshot(path, self.serializer)
+        except FileNotFoundError:
+            return None
+
+
+class WorkerLoader(Loader):
+    """
+    Reads the segment files needed at once and builds their objects
+    in worker processes, which send them back built, so a full load
+    uses that many cores. The workers are forked, see START_METHOD.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        pool (ProcessPoolExecutor): The worker processes,
+        started by the first read_all().
+    """
+
+    content = "objects"
+
+    def __init__(self, format="json", compacted=False, workers=1):
+        """
+        Initializes the loader, without starting the workers.
+
+        Args:
+            format (str): The format of the files.
+            compacted (bool): Build the objects with
+            models.compact.build().
+            workers (int): The number of worker processes.
+        """
+        super().__init__(format, compacted)
+        self.workers = workers
+        self.pool = None
+
+    def read(self, path):
+        """
+        Reads a segment file and builds its objects in this process.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            list: The (key, object) pairs, empty if there is no file.
+        """
+        return _build_segment(path, self.format, self.compacted)
+
+    def read_all(self, paths, processes=True) -> list:
+        """
+        Reads several segment files and builds their
+        objects at once, in the worker processes.
+
+        Without them, the files are read by a pool of threads and
+        their objects built in the calling thread. The pool of
+        processes must not be used while the models package is
+        imported, as sending it the work imports
+        models.engine.loaders, which waits for that import to end.
+
+        Args:
+            paths (list): The paths of the files.
+            processes (bool): Whether the worker processes may be used.
+
+        Returns:
+            list: The (key, object) pairs of each file,
+            in the order of the paths.
+        """
+        if not processes:
+            return [[(key, self.build(record)) for key, record in records]
+                    for records in super().read_all(paths)]
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                self.workers, multiprocessing.get_context(START_METHOD))
+        return list(self.pool.map(_build_segment, paths,
+                                  [self.format] * len(paths),
+                                  [self.compacted] * len(paths)))
+
+    def close(self) -> None:
+        """
+        Stops the worker processes, if they were started.
+        """
+        pool = self.pool
+        if pool is not None:
+            self.pool = None
+            pool.shutdown()
+
+
+def create(format="json", compacted=False, lazy=False, stream=False,
+           mmap=False, workers=0):
+    """
+    Returns the loader of the given storage options.
+
+    Mapping binary snapshots comes first, then reading
+    record by record, then the worker processes, which
+    are not used in lazy mode.
+
+    Args:
+        format (str): The format of the files.
+        compacted (bool): Build the objects with models.compact.build().
+        lazy (bool): Only build the objects when needed.
+        stream (bool): Read the files record by record.
+        mmap (bool): Map binary snapshots in memory.
+        workers (int): The number of worker processes, 0 for none.
+
+    Returns:
+        Loader: The loader.
+    """
+    if mmap and serializers.FORMATS[format].binary:
+        return MappedLoader(format, compacted, lazy)
+    if stream:
+        return StreamLoader(format, compacted, lazy)
+    if workers and not lazy:
+        return WorkerLoader(format, compacted, workers)
+
+    return Loader(format, compacted, lazy)
@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+"""
+Module that defines RWLock, the readers-writer lock used by
+FileStorage in thread safe mode
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class RWLock:
+    """
+    A lock held either by any number of reader threads at once,
+    or by a single writer thread.
+
+    A thread waiting to write is served before the threads asking
+    to read after it, and the threads waiting to read when a writer
+    releases the lock are served before the next writer, so neither
+    side can starve the other. Both sides are reentrant: a thread
+    holding the lock to read can read again, and a thread holding it
+    to write can read or write again. A reader cannot become a writer without
+    releasing the lock first.
+
+    Attributes:
+        __cond (Condition): Guards the counters below.
+        __readers (int): The number of read holds of all threads.
+        __writer (int): The identifier of the writer thread, if any.
+        __depth (int): The number of holds of the writer thread.
+        __waiting (int): The number of threads waiting to write.
+        __queued (int): The number of threads waiting to read.
+        __admitted (int): The number of readers let in by the last
+        writer that did not take the lock yet.
+        __local (local): The number of read holds of each thread.
+
+    Methods:
+        acquire_read(self) -> None:
+            Waits until the lock can be held to read.
+
+        release_read(self) -> None:
+            Releases a read hold.
+
+        acquire_write(self) -> None:
+            Waits until the lock can be held to write.
+
+        release_write(self) -> None:
+            Releases a write hold.
+
+        read(self):
+            Returns a context manager holding the lock to read.
+
+        write(self):
+            Returns a context manager holding the lock to write.
+    """
+
+    def __init__(self):
+        """
+        Initializes a released lock.
+        """
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__depth = 0
+        self.__waiting = 0
+        self.__queued = 0
+        self.__admitted = 0
+        self.__local = threading.local()
+
+    def acquire_read(self) -> None:
+        """
+        Waits until no thread writes or waits to write, or until
+        the last writer let the thread in, unless the calling thread
+        already holds the lock.
+        """
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+
+            held = getattr(self.__local, "reads", 0)
+            if not held:
+                self.__queued += 1
+                try:
+                    while self.__writer is not None or \
+                            (self.__waiting and not self.__admitted):
+                        self.__cond.wait()
+                except BaseException:
+                    self.__queued -= 1
+                    self.__admitted = min(self.__admitted, self.__queued)
+                    self.__cond.notify_all()
+                    raise
+                self.__queued -= 1
+                if self.__admitted:
+                    self.__admitted -= 1
+            self.__readers += 1
+            self.__local.reads = held + 1
+
+    def release_read(self) -> None:
+        """
+        Releases a read hold, waking up the writers
+        once the last reader is gone.
+        """
+        with self.__cond:
+            if self.__writer == threading.get_ident():
+                self.__depth -= 1
+                return
+
+            self.__readers -= 1
+            self.__local.reads -= 1
+            if not self.__readers:
+                self.__cond.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Waits until no other thread holds the lock.
+
+        Raises:
+            RuntimeError: If the calling thread holds the lock to read.
+        """
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+
+            if getattr(self.__local, "reads", 0):
+                raise RuntimeError("cannot write while holding a read lock")
+
+            self.__waiting += 1
+            try:
+                while self.__writer is not None or self.__readers or \
+                        self.__admitted:
+                    self.__cond.wait()
+            except BaseException:
+                self.__waiting -= 1
+                self.__cond.notify_all()
+                raise
+            self.__waiting -= 1
+            self.__writer = me
+            self.__depth = 1
+
+    def release_write(self) -> None:
+        """
+        Releases a write hold, waking up the waiting
+        threads once the last one is gone.
+        """
+        with self.__cond:
+            self.__depth -= 1
+            if not self.__depth:
+                self.__writer = None
+                self.__admitted = self.__queued
+                self.__cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        """
+        Returns a context manager holding the lock to read.
+        """
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """
+        Returns a context manager holding the lock to write.
+        """
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
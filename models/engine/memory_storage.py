@@ -0,0 +1,274 @@
+#!/usr/bin/python3
+"""
+Module that defines class MemoryStorage
+It keeps instances in memory only, optionally
+writing a snapshot of them when the program exits
+"""
+
+import atexit
+from models.engine import indexes as index_kinds
+from models.engine import serializers
+from models.engine.engine import Engine
+
+
+class MemoryStorage(Engine):
+    """
+    Class keeping the objects in memory, with the same all(), get(),
+    count(), find(), new(), delete(), save() and reload() methods
+    as FileStorage, for the tests and the short-lived jobs that do
+    not need their objects once they end.
+
+    save() writes nothing. With a snapshot path, close() writes the
+    objects to it in the JSON format of file.json, and is called when
+    the program exits; reload() reads them back, so a snapshot can
+    also be opened by FileStorage, and a file.json by MemoryStorage.
+    Without a snapshot path the engine never touches the disk.
+
+    Attributes:
+        __file_path (str): The path of the snapshot, or None.
+        __objects (dict): The objects by key.
+        __by_class (dict): The objects of each class name, by id.
+        __changed (bool): True if new() or delete() were called
+        since the snapshot was written or read.
+        __hooked (bool): True once close() is called at exit.
+
+    Methods:
+        configure(self, **options) -> None:
+            Changes the path of the snapshot.
+
+        all(self, cls=None) -> dict:
+            Returns the objects, or the objects of a class.
+
+        get(self, cls, id) -> BaseModel:
+            Returns the object of a class with the given id.
+
+        count(self, cls=None) -> int:
+            Returns the number of objects, or of objects of a class.
+
+        find(self, cls, **attrs) -> dict:
+            Returns the objects of a class with the given attributes.
+
+        add_index(self, cls, attr, kind="hash") -> None:
+            Accepts the indexes of FileStorage.
+
+        new(self, obj) -> None:
+            Adds an object to the storage.
+
+        delete(self, obj) -> None:
+            Removes an object from the storage.
+
+        save(self) -> None:
+            Does nothing, the objects stay in memory.
+
+        reload(self) -> None:
+            Reads the snapshot, if any.
+
+        clear(self) -> None:
+            Forgets the objects.
+
+        close(self) -> None:
+            Writes the snapshot, if any.
+    """
+
+    __file_path = None
+    __objects = {}
+    __by_class = {}
+    __changed = False
+    __hooked = False
+
+    @property
+    def persistent(self) -> bool:
+        """
+        True if the objects are written to a snapshot on close().
+        """
+        return self.__file_path is not None
+
+    def configure(self, file_path=None, **options) -> None:
+        """
+        Changes the storage options.
+
+        Options:
+            file_path (str): The path of the snapshot written on
+            close() and read by reload(), "" for none.
+
+        FileStorage options are accepted and ignored, so the
+        same environment can select either storage.
+
+        Args:
+            file_path (str): The path of the snapshot.
+            **options: Other options, ignored.
+        """
+        if file_path is None:
+            return
+
+        MemoryStorage.__file_path = file_path or None
+        if file_path and not self.__hooked:
+            atexit.register(self.close)
+            MemoryStorage.__hooked = True
+
+    def all(self, cls=None) -> dict:
+        """
+        Returns the objects stored.
+
+        The returned dictionary must not be changed,
+        objects are added and removed with new() and delete().
+
+        Args:
+            cls: A class, or class name, to only return
+            the objects of that class.
+
+        Returns:
+            dict: The objects by key.
+        """
+        if cls is None:
+            return self.__objects
+
+        name = self._name(cls)
+        return {name + "." + id: obj
+                for id, obj in self.__by_class.get(name, {}).items()}
+
+    def get(self, cls, id):
+        """
+        Returns the object of a class with the given id.
+
+        Args:
+            cls: The class, or the class name, of the object.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it is not in storage.
+        """
+        return self.__by_class.get(self._name(cls), {}).get(id)
+
+    def count(self, cls=None) -> int:
+        """
+        Returns the number of objects in storage.
+
+        Args:
+            cls: A class, or class name, to only count
+            the objects of that class.
+
+        Returns:
+            int: The number of objects.
+        """
+        if cls is None:
+            return len(self.__objects)
+        return len(self.__by_class.get(self._name(cls), ()))
+
+    def find(self, cls, **attrs) -> dict:
+        """
+        Returns the objects of a class with the given attribute
+        values, checking every object of the class.
+
+        Example Usage:
+            storage.find(City, state_id=state.id)
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            **attrs: The attribute values to match.
+
+        Returns:
+            dict: The matching objects by key, like all(cls).
+        """
+        name = self._name(cls)
+        return {name + "." + id: obj
+                for id, obj in self.__by_class.get(name, {}).items()
+                if all(getattr(obj, a, None) == v for a, v in attrs.items())}
+
+    def add_index(self, cls, attr, kind="hash") -> None:
+        """
+        Accepts the indexes of FileStorage, so the models can
+        declare them whatever the storage. find() checks every
+        object of the class, which is fast enough in memory.
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            attr (str): The name of the attribute, or a tuple
+            of names for a grid index.
+            kind (str): "hash", "sorted" or "grid".
+
+        Raises:
+            ValueError: If the kind of index is unknown.
+        """
+        if kind not in index_kinds.KINDS:
+            raise ValueError("unknown index kind: {}".format(kind))
+
+    def new(self, obj) -> None:
+        """
+        Adds an object to the storage.
+
+        Args:
+            obj: The object.
+        """
+        name = obj.__class__.__name__
+        self.__objects[name + "." + obj.id] = obj
+        self.__by_class.setdefault(name, {})[obj.id] = obj
+        MemoryStorage.__changed = True
+
+    def delete(self, obj=None) -> None:
+        """
+        Removes an object from the storage.
+
+        Args:
+            obj: The object to be removed. Nothing is done if
+            it is None.
+        """
+        if obj is None:
+            return
+
+        name = obj.__class__.__name__
+        if self.__objects.pop(name + "." + obj.id, None) is not None:
+            del self.__by_class[name][obj.id]
+            MemoryStorage.__changed = True
+
+    def save(self) -> None:
+        """
+        Does nothing: the objects are already in memory,
+        and the snapshot is written by close().
+        """
+
+    def reload(self) -> None:
+        """
+        Reads the objects of the snapshot, if any,
+        keeping the ones already in memory.
+        """
+        if self.__file_path is None:
+            return
+
+        serializer = serializers.FORMATS["json"]
+        try:
+            records = serializers.read(self.__file_path, serializer)
+        except FileNotFoundError:
+            return
+
+        classes = self._classes()
+        changed = self.__changed
+        for key, record in records.items():
+            if key not in self.__objects:
+                self.new(classes[record["__class__"]](**record))
+        MemoryStorage.__changed = changed
+
+    def clear(self) -> None:
+        """
+        Forgets every object, without touching the snapshot.
+        """
+        self.__objects.clear()
+        self.__by_class.clear()
+        MemoryStorage.__changed = False
+
+    def close(self) -> None:
+        """
+        Writes the objects to the snapshot, if any, unless none
+        was added or deleted since it was written or read.
+
+        Called when the program exits, and by the console on quit.
+        """
+        if self.__file_path is None or not self.__changed:
+            return
+
+        serializer = serializers.FORMATS["json"]
+        records = {key: serializer.record(obj)
+                   for key, obj in self.__objects.items()}
+        serializers.write(self.__file_path, serializer,
+                          serializer.dumps(records))
+        MemoryStorage.__changed = False
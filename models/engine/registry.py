@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""
+Module that defines the registry of the storage engines, from
+which models/__init__.py creates the storage, and the table of
+the model classes the engines and the console share
+"""
+
+import os
+
+ENGINES = {}
+_classes = None
+
+
+def register(name, factory) -> None:
+    """
+    Adds an engine to the registry.
+
+    Args:
+        name (str): The name selecting the engine,
+        e.g. with HBNB_TYPE_STORAGE.
+        factory: A function taking no argument and returning
+        the engine, configured from the environment.
+    """
+    ENGINES[name] = factory
+
+
+def names() -> list:
+    """
+    Returns the names of the registered engines.
+
+    Returns:
+        list: The names, in registration order.
+    """
+    return list(ENGINES)
+
+
+def create(name=None):
+    """
+    Creates a registered engine.
+
+    Args:
+        name (str): The name of the engine, by default the
+        HBNB_TYPE_STORAGE environment variable, or "file".
+
+    Returns:
+        Engine: The engine.
+
+    Raises:
+        ValueError: If no engine has that name.
+    """
+    if name is None:
+        name = os.getenv("HBNB_TYPE_STORAGE", "file")
+
+    try:
+        factory = ENGINES[name]
+    except KeyError:
+        raise ValueError("unknown storage engine: {} (one of {})".format(
+            name, ", ".join(ENGINES))) from None
+
+    engine = factory()
+    engine.name = name
+    return engine
+
+
+def classes() -> dict:
+    """
+    Returns the model classes the engines store, by name.
+
+    The models are imported the first time, as they
+    import the storage themselves.
+
+    Returns:
+        dict: The model classes by name.
+    """
+    global _classes
+    if _classes is not None:
+        return _classes
+
+    from models.base_model import BaseModel
+    from models.user import User
+    from models.state import State
+    from models.city import City
+    from models.amenity import Amenity
+    from models.place import Place
+    from models.review import Review
+
+    _classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review
+    }
+    return _classes
+
+
+def _file():
+    """
+    Returns a FileStorage configured from the HBNB_FS_* variables.
+    """
+    from models.engine.file_storage import FileStorage, env_options
+    storage = FileStorage()
+    storage.configure(**env_options())
+    return storage
+
+
+def _sqlite():
+    """
+    Returns a SQLiteStorage using the database in HBNB_SQLITE_FILE.
+    """
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+    storage.configure(file_path=os.getenv("HBNB_SQLITE_FILE", "file.db"))
+    return storage
+
+
+def _memory():
+    """
+    Returns a MemoryStorage writing its snapshot to HBNB_MEMORY_SNAPSHOT
+    on exit, or never touching the disk if it is not set.
+    """
+    from models.engine.memory_storage import MemoryStorage
+    storage = MemoryStorage()
+    storage.configure(file_path=os.getenv("HBNB_MEMORY_SNAPSHOT", ""))
+    return storage
+
+
+register("file", _file)
+register("sqlite", _sqlite)
+register("memory", _memory)
@@ -0,0 +1,831 @@
+#!/usr/bin/python3
+"""
+Module that defines the file formats FileStorage can write its
+objects in, and a converter between them
+"""
+
+import io
+import json
+import marshal
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from models.compact import CompactModel
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _default(value):
+    """
+    Encodes the datetimes of records read from a binary snapshot.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError("{} is not JSON serializable".format(type(value)))
+
+
+class JSONSerializer:
+    """
+    The JSON format of file.json: one object mapping
+    each key to the dictionary returned by to_dict().
+
+    Attributes:
+        name (str): The name of the format.
+        suffix (str): The file extension of the format,
+        or None to keep the one of the storage file path.
+        binary (bool): Whether the files are binary.
+
+    Methods:
+        record(self, obj) -> dict:
+            Returns the record of an object.
+
+        fragment(self, key, record) -> str:
+            Encodes one record.
+
+        join(self, keys, fragments) -> str:
+            Returns the file contents holding the encoded records.
+
+        dumps(self, records) -> str:
+            Encodes every record.
+
+        loads(self, data) -> dict:
+            Decodes the records of a file.
+
+        dump(self, f, keys, fragments) -> None:
+            Writes the encoded records to a file one by one.
+
+        records(self, f, size=CHUNK):
+            Yields the records of a file one by one.
+    """
+
+    name = "json"
+    suffix = None
+    binary = False
+    CHUNK = 1 << 16
+
+    def record(self, obj) -> dict:
+        """
+        Returns the record of an object.
+
+        Args:
+            obj: The object.
+
+        Returns:
+            dict: The dictionary returned by to_dict().
+        """
+        return obj.to_dict()
+
+    def fragment(self, key, record) -> str:
+        """
+        Encodes one record.
+
+        Args:
+            key (str): The key of the object.
+            record (dict): The object as returned by to_dict().
+
+        Returns:
+            str: The '"key": {...}' JSON text of the record.
+        """
+        return json.dumps(key) + ": " + json.dumps(record, default=_default)
+
+    def join(self, keys, fragments) -> str:
+        """
+        Returns the file contents holding the encoded records,
+        the same text dumps() returns for them.
+
+        Args:
+            keys (list): The keys of the records.
+            fragments (list): The records encoded by fragment().
+
+        Returns:
+            str: The JSON text.
+        """
+        return "{" + ", ".join(fragments) + "}"
+
+    def dumps(self, records) -> str:
+        """
+        Encodes every record.
+
+        Args:
+            records (dict): The records by key.
+
+        Returns:
+            str: The JSON text.
+        """
+        return json.dumps(records, default=_default)
+
+    def loads(self, data) -> dict:
+        """
+        Decodes the records of a file.
+
+        Args:
+            data (str): The JSON text.
+
+        Returns:
+            dict: The records by key.
+        """
+        return json.loads(data)
+
+    def dump(self, f, keys, fragments) -> None:
+        """
+        Writes the encoded records to a file one by one, the
+        same text join() returns for them.
+
+        Args:
+            f: The file, opened in text mode.
+            keys (list): The keys of the records.
+            fragments: The records encoded by fragment().
+        """
+        f.write("{")
+        separator = ""
+        for fragment in fragments:
+            f.write(separator)
+            f.write(fragment)
+            separator = ", "
+        f.write("}")
+
+    def records(self, f, size=CHUNK):
+        """
+        Yields the records of a file one by one, reading it in
+        chunks, so the file is never held in memory as a whole.
+
+        Each key and record is parsed with JSONDecoder.raw_decode()
+        from the text read so far, reading the next chunk when the
+        text ends in the middle of one.
+
+        Args:
+            f: The file, opened in text mode.
+            size (int): The number of characters read at a time.
+
+        Yields:
+            tuple: The key and the record.
+
+        Raises:
+            ValueError: If the file is not a JSON object.
+        """
+        decode = json.JSONDecoder().raw_decode
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            """
+            Reads the next chunk, at least as long as the text
+            still to parse, so a long record is read in few steps.
+            """
+            nonlocal buf, pos, eof
+            chunk = f.read(max(size, len(buf) - pos))
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+        def char():
+            """
+            Skips whitespace and returns the next character,
+            or "" at the end of the file.
+            """
+            nonlocal pos
+            while True:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos < len(buf) or eof:
+                    return buf[pos:pos + 1]
+                fill()
+
+        def value():
+            """
+            Parses the next JSON value, which must end
+            before the end of the text read so far.
+            """
+            nonlocal pos
+            while True:
+                try:
+                    result, end = decode(buf, pos)
+                    if end < len(buf) or eof:
+                        pos = end
+                        return result
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        def expect(token):
+            """
+            Skips the next character, which must be token.
+            """
+            nonlocal pos
+            found = char()
+            if found != token:
+                raise ValueError("expected {!r} at {!r}".format(
+                    token, found))
+            pos += 1
+
+        expect("{")
+        if char() == "}":
+            return
+
+        while True:
+            char()
+            key = value()
+            if not isinstance(key, str):
+                raise ValueError("expected a key, found {!r}".format(key))
+            expect(":")
+            char()
+            yield key, value()
+
+            if char() == "}":
+                return
+            expect(",")
+
+
+class BinarySerializer:
+    """
+    A binary snapshot format, smaller and faster to write than JSON,
+    whose records can be found and decoded one by one.
+
+    A snapshot starts with MAGIC, followed by one entry per object:
+    the length of the record as 4 bytes, little endian, then the
+    record, a (key, fields) tuple encoded with marshal (version 4,
+    read by every Python 3 release since 3.4). Fields keep their
+    type, and created_at and updated_at are stored as the 10 bytes
+    of their date and time, see STAMP: year (2 bytes), month, day,
+    hour, minute, second and microsecond (3 bytes), big endian.
+    Only naive datetimes are stored this way, without their fold.
+
+    The records are followed by an index record, with None as key,
+    holding the keys of the records and their positions as 8 bytes
+    each, little endian. The snapshot ends with INDEX and the
+    position of the index record as 8 bytes, little endian, so a
+    reader can find any record without reading the others.
+
+    Attributes:
+        name (str): The name of the format.
+        suffix (str): The file extension of the format.
+        binary (bool): Whether the files are binary.
+
+    Methods:
+        record(self, obj) -> dict:
+            Returns the record of an object, timestamps included
+            as datetime objects.
+
+        fragment(self, key, record) -> bytes:
+            Encodes one record, with its length.
+
+        join(self, keys, fragments) -> bytes:
+            Returns the snapshot holding the encoded records.
+
+        dumps(self, records) -> bytes:
+            Encodes every record.
+
+        dump(self, f, keys, fragments) -> None:
+            Writes the encoded records to a file one by one.
+
+        loads(self, data) -> dict:
+            Decodes the records of a snapshot.
+
+        entries(self, data):
+            Yields the position and length of every record.
+
+        index(self, data) -> tuple:
+            Returns the keys and positions of the records.
+
+        decode(self, data) -> tuple:
+            Decodes one record.
+
+        records(self, f):
+            Yields the records of a file one by one.
+    """
+
+    name = "binary"
+    suffix = ".bin"
+    binary = True
+    MAGIC = b"HBNBSNAP\x01"
+    TIMESTAMPS = ("created_at", "updated_at")
+    INDEX = b"HIDX"
+    STAMP = struct.Struct(">HBBBBBBH")
+    LENGTH = struct.Struct("<I")
+    POSITION = struct.Struct("<Q")
+
+    def record(self, obj) -> dict:
+        """
+        Returns the record of an object: the attributes to_dict()
+        returns, but with the timestamps left as datetime objects,
+        which fragment() encodes without going through ISO strings.
+
+        Args:
+            obj: The object.
+
+        Returns:
+            dict: The record.
+        """
+        record = {"__class__": type(obj).__name__}
+        record.update(obj.attributes() if isinstance(obj, CompactModel)
+                      else obj.__dict__)
+        return record
+
+    def fragment(self, key, record) -> bytes:
+        """
+        Encodes one record, with its length.
+
+        Args:
+            key (str): The key of the object.
+            record (dict): The object as returned by to_dict().
+
+        Returns:
+            bytes: The length and the record.
+        """
+        fields = dict(record)
+
+        for name in self.TIMESTAMPS:
+            value = fields.get(name)
+            if isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value)
+                except ValueError:
+                    continue
+            if isinstance(value, datetime) and value.tzinfo is None:
+                fields[name] = self.STAMP.pack(
+                    value.year, value.month, value.day, value.hour,
+                    value.minute, value.second, value.microsecond >> 16,
+                    value.microsecond & 0xFFFF)
+
+        data = marshal.dumps((key, fields), 4)
+        return self.LENGTH.pack(len(data)) + data
+
+    def join(self, keys, fragments) -> bytes:
+        """
+        Returns the snapshot holding the encoded records,
+        followed by their index.
+
+        Args:
+            keys (list): The keys of the records.
+            fragments (list): The records encoded by fragment().
+
+        Returns:
+            bytes: The snapshot.
+        """
+        f = io.BytesIO()
+        self.dump(f, keys, fragments)
+        return f.getvalue()
+
+    def dump(self, f, keys, fragments) -> None:
+        """
+        Writes the encoded records to a file one by one,
+        followed by their index, the same bytes join() returns.
+
+        Args:
+            f: The file, opened in binary mode.
+            keys (list): The keys of the records.
+            fragments: The records encoded by fragment().
+        """
+        positions = array("Q")
+        pos = len(self.MAGIC)
+        f.write(self.MAGIC)
+
+        for fragment in fragments:
+            positions.append(pos)
+            f.write(fragment)
+            pos += len(fragment)
+
+        if sys.byteorder != "little":
+            positions.byteswap()
+        index = marshal.dumps((None, (list(keys), positions.tobytes())), 4)
+        f.write(self.LENGTH.pack(len(index)))
+        f.write(index)
+        f.write(self.INDEX)
+        f.write(self.POSITION.pack(pos))
+
+    def dumps(self, records) -> bytes:
+        """
+        Encodes every record.
+
+        Args:
+            records (dict): The records by key.
+
+        Returns:
+            bytes: The snapshot.
+        """
+        return self.join(list(records), [self.fragment(k, v)
+                                         for k, v in records.items()])
+
+    def entries(self, data):
+        """
+        Yields the position and length of every record of a snapshot.
+        A last record cut short, by a crash while writing, is ignored.
+
+        Args:
+            data: The snapshot, as bytes or any buffer.
+
+        Yields:
+            tuple: The (position, length) of each record,
+            the index record included.
+
+        Raises:
+            ValueError: If the data is not a snapshot.
+        """
+        size = len(self.MAGIC)
+        if bytes(data[:size]) != self.MAGIC:
+            raise ValueError("not a binary snapshot")
+
+        pos, end = size, len(data)
+        unpack = self.LENGTH.unpack_from
+        while pos + 4 <= end:
+            (length,) = unpack(data, pos)
+            pos += 4
+            if pos + length > end:
+                return
+            yield pos, length
+            pos += length
+
+    def records(self, f):
+        """
+        Yields the records of a snapshot one by one, reading
+        them from the file in turn. A last record cut short,
+        by a crash while writing, is ignored.
+
+        Args:
+            f: The file, opened in binary mode.
+
+        Yields:
+            tuple: The key and the record.
+
+        Raises:
+            ValueError: If the file is not a snapshot.
+        """
+        if f.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("not a binary snapshot")
+
+        while True:
+            head = f.read(4)
+            if len(head) < 4:
+                return
+            (length,) = self.LENGTH.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            key, fields = self.decode(data)
+            if key is None:
+                return
+            yield key, fields
+
+    def index(self, data) -> tuple:
+        """
+        Returns the keys and positions of the records of a snapshot,
+        from its index, or by decoding every record when it has none.
+
+        Args:
+            data: The snapshot, as bytes or any buffer.
+
+        Returns:
+            tuple: The list of keys and the array of their positions.
+
+        Raises:
+            ValueError: If the data is not a snapshot.
+        """
+        end = len(data) - len(self.INDEX) - self.POSITION.size
+        if end > 0 and data[end:end + len(self.INDEX)] == self.INDEX:
+            (pos,) = self.POSITION.unpack_from(data, end + len(self.INDEX))
+            (length,) = self.LENGTH.unpack_from(data, pos)
+            key, (keys, positions) = marshal.loads(
+                data[pos + 4:pos + 4 + length])
+            offsets = array("Q")
+            offsets.frombytes(positions)
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            return keys, offsets
+
+        keys, offsets = [], array("Q")
+        for pos, length in self.entries(data):
+            key = self.decode(data[pos:pos + length])[0]
+            if key is not None:
+                keys.append(key)
+                offsets.append(pos - 4)
+        return keys, offsets
+
+    def decode(self, data) -> tuple:
+        """
+        Decodes one record.
+
+        Args:
+            data: The encoded record, without its length.
+
+        Returns:
+            tuple: The key and the record, with
+            the timestamps as datetime objects.
+        """
+        key, fields = marshal.loads(data)
+        if key is None:
+            return key, fields
+
+        for name in self.TIMESTAMPS:
+            value = fields.get(name)
+            if isinstance(value, bytes):
+                year, month, day, hour, minute, second, high, low = \
+                    self.STAMP.unpack(value)
+                fields[name] = datetime(year, month, day, hour, minute,
+                                        second, high << 16 | low)
+
+        return key, fields
+
+    def loads(self, data) -> dict:
+        """
+        Decodes the records of a snapshot.
+
+        Args:
+            data (bytes): The snapshot.
+
+        Returns:
+            dict: The records by key.
+        """
+        records = {}
+        decode = self.decode
+        view = memoryview(data)
+        for pos, length in self.entries(view):
+            key, fields = decode(view[pos:pos + length])
+            if key is not None:
+                records[key] = fields
+        return records
+
+
+class Snapshot:
+    """
+    A binary snapshot mapped in memory, whose records
+    are decoded one by one, when they are needed.
+
+    Attributes:
+        path (str): The path of the snapshot.
+        __map: The memory map of the file.
+
+    Methods:
+        index(self) -> tuple:
+            Returns the keys and positions of the records.
+
+        record(self, pos) -> dict:
+            Decodes the record at a position.
+
+        close(self) -> None:
+            Unmaps the file.
+    """
+
+    def __init__(self, path, serializer=None):
+        """
+        Maps a snapshot file in memory.
+
+        Args:
+            path (str): The path of the snapshot.
+            serializer (BinarySerializer): The format of the snapshot.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        self.path = path
+        self.serializer = serializer or FORMATS["binary"]
+
+        with open(path, "rb") as f:
+            try:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self.__map = b""
+
+    def index(self) -> tuple:
+        """
+        Returns the keys and positions of the records.
+
+        Returns:
+            tuple: The list of keys and the array of their positions.
+        """
+        if not self.__map:
+            return [], array("Q")
+        return self.serializer.index(self.__map)
+
+    def record(self, pos) -> dict:
+        """
+        Decodes the record at a position, read from the mapped
+        file without copying the other records.
+
+        Args:
+            pos (int): The position of the record, from index().
+
+        Returns:
+            dict: The record.
+        """
+        (length,) = self.serializer.LENGTH.unpack_from(self.__map, pos)
+        with memoryview(self.__map) as view:
+            return self.serializer.decode(view[pos + 4:pos + 4 + length])[1]
+
+    def close(self) -> None:
+        """
+        Unmaps the file.
+        """
+        if self.__map:
+            self.__map.close()
+
+
+FORMATS = {
+    "json": JSONSerializer(),
+    "binary": BinarySerializer(),
+}
+
+
+def read(path, serializer) -> dict:
+    """
+    Reads the records of a storage file.
+
+    Args:
+        path (str): The path of the file.
+        serializer: The format of the file.
+
+    Returns:
+        dict: The records by key.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if serializer.binary:
+        with open(path, "rb") as f:
+            return serializer.loads(f.read())
+
+    with open(path, "r", encoding="utf-8") as f:
+        return serializer.loads(f.read())
+
+
+def stream(path, serializer):
+    """
+    Returns the records of a storage file, read one by one
+    while they are iterated over.
+
+    Args:
+        path (str): The path of the file.
+        serializer: The format of the file.
+
+    Returns:
+        generator: The (key, record) pairs.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if serializer.binary:
+        f = open(path, "rb")
+    else:
+        f = open(path, "r", encoding="utf-8")
+
+    def records():
+        with f:
+            yield from serializer.records(f)
+
+    return records()
+
+
+def dump(path, serializer, keys, fragments, fsync=False,
+         buffering=0) -> None:
+    """
+    Writes encoded records to a storage file one by one,
+    replacing the file atomically, see write().
+
+    Args:
+        path (str): The path of the file.
+        serializer: The format of the file.
+        keys (list): The keys of the records.
+        fragments: The records encoded by the serializer's fragment().
+        fsync (bool): Wait for the file to be on disk.
+        buffering (int): The size of the write buffer,
+        0 for the default one.
+    """
+    with _replacing(path, serializer, fsync, buffering or -1) as f:
+        serializer.dump(f, keys, fragments)
+
+
+def write(path, serializer, data, fsync=False) -> None:
+    """
+    Writes the encoded records to a storage file.
+
+    The records are written to a temporary file renamed over the
+    storage file once complete, so a crash while writing leaves the
+    previous file as it was, and a Snapshot mapping the previous
+    file can still read it.
+
+    Args:
+        path (str): The path of the file.
+        serializer: The format of the file.
+        data: The encoded records.
+        fsync (bool): Wait for the file, and its new name,
+        to be on disk before returning.
+    """
+    with _replacing(path, serializer, fsync) as f:
+        f.write(data)
+
+
+@contextmanager
+def _replacing(path, serializer, fsync, buffering=-1):
+    """
+    Opens a temporary file next to a storage file, and renames
+    it over the storage file when the block ends, or removes
+    it if the block raises an exception.
+    """
+    target = path + ".tmp"
+
+    if serializer.binary:
+        f = open(target, "wb", buffering=buffering)
+    else:
+        f = open(target, "w", encoding="utf-8", buffering=buffering)
+
+    try:
+        with f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        os.remove(target)
+        raise
+
+    os.replace(target, path)
+    if fsync:
+        sync_directory(path)
+
+
+def sync(path) -> None:
+    """
+    Waits for a file written earlier without fsync to be on disk.
+
+    Args:
+        path (str): The path of the file. Nothing
+        is done if it does not exist anymore.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    sync_directory(path)
+
+
+def sync_directory(path) -> None:
+    """
+    Waits for the entries of the directory of a file, e.g.
+    the name of a file just renamed, to be on disk. Nothing is
+    done on systems where directories cannot be synced.
+
+    Args:
+        path (str): The path of the file.
+    """
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def detect(path):
+    """
+    Returns the format of a storage file from its first bytes.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        The serializer of the file.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(BinarySerializer.MAGIC))
+
+    for serializer in FORMATS.values():
+        if serializer.binary and head == serializer.MAGIC:
+            return serializer
+    return FORMATS["json"]
+
+
+def convert(source, target, format=None) -> int:
+    """
+    Converts a storage file to another format, e.g. file.json
+    to a binary snapshot and back. The format of the source
+    is found from its contents.
+
+    Args:
+        source (str): The path of the file to convert.
+        target (str): The path of the converted file.
+        format (str): The format of the target, by default binary
+        for a JSON source and JSON for a binary source.
+
+    Returns:
+        int: The number of converted records.
+    """
+    serializer = detect(source)
+    records = read(source, serializer)
+
+    if format is None:
+        format = "json" if serializer.binary else "binary"
+    serializer = FORMATS[format]
+
+    write(target, serializer, serializer.dumps(records))
+    return len(records)
@@ -0,0 +1,528 @@
+#!/usr/bin/python3
+"""
+Module that defines class SQLiteStorage
+It stores instances in a SQLite database, one table per class
+"""
+
+import json
+import sqlite3
+from models.engine.engine import Engine
+
+# The columns every table starts with
+BASE_COLUMNS = ("id", "created_at", "updated_at")
+# The types of the values stored in the attribute columns
+SCALARS = (str, int, float)
+
+
+class SQLiteStorage(Engine):
+    """
+    Class storing the objects in a SQLite database, with the same
+    all(), get(), count(), find(), new(), delete(), save() and
+    reload() methods as FileStorage.
+
+    Each model class has its own table, with a column for each
+    attribute the class declares, e.g. Place.city_id, and an
+    "attributes" column holding as JSON the other attributes and
+    the values that are not strings or numbers, e.g. lists. The
+    "*_id" foreign key columns are indexed, so lookups by id and by
+    foreign key are index searches, and listing a class only reads
+    its table. The database is in WAL mode, so readers do not wait
+    for a save.
+
+    Like in FileStorage, new() and delete() mark the objects as
+    changed and save() writes them, here in one transaction. Each
+    object read is kept, so reading it again returns the same
+    instance, with its changes not saved yet.
+
+    Attributes:
+        __file_path (str): The path to the database file.
+        __conn (Connection): The connection to the database.
+        __objects (dict): The objects read or added, by key.
+        __dirty (dict): The keys changed since the last save, mapped
+        to their object, or to None when the object was deleted.
+        __tables (dict): The column names of each class name.
+        __statements (dict): The SQL statements of each class name,
+        built once per table and kept prepared by sqlite3.
+
+    Methods:
+        configure(self, **options) -> None:
+            Changes the path of the database.
+
+        all(self, cls=None) -> dict:
+            Returns the objects, or the objects of a class.
+
+        get(self, cls, id) -> BaseModel:
+            Returns the object of a class with the given id.
+
+        count(self, cls=None) -> int:
+            Returns the number of objects, or of objects of a class.
+
+        find(self, cls, **attrs) -> dict:
+            Returns the objects of a class with the given attributes.
+
+        add_index(self, cls, attr, kind="hash") -> None:
+            Indexes the table of a class by an attribute.
+
+        new(self, obj) -> None:
+            Adds an object to the storage.
+
+        delete(self, obj) -> None:
+            Removes an object from the storage.
+
+        save(self) -> None:
+            Writes the objects changed since the last save.
+
+        reload(self) -> None:
+            Opens the database and forgets the objects read.
+
+        clear(self) -> None:
+            Forgets the objects in memory.
+
+        close(self) -> None:
+            Closes the database.
+    """
+
+    __file_path = "file.db"
+    __conn = None
+    __objects = {}
+    __dirty = {}
+    __tables = {}
+    __statements = {}
+
+    def configure(self, file_path=None, **options) -> None:
+        """
+        Changes the storage options.
+
+        Options:
+            file_path (str): The path of the database file.
+
+        FileStorage options are accepted and ignored, so the
+        same environment can select either storage.
+
+        Args:
+            file_path (str): The path of the database file.
+            **options: Other options, ignored.
+        """
+        if file_path is not None and file_path != self.__file_path:
+            self.close()
+            SQLiteStorage.__file_path = file_path
+
+    def all(self, cls=None) -> dict:
+        """
+        Returns the objects stored, with the ones
+        added and deleted since the last save.
+
+        Args:
+            cls: A class, or class name, to only return
+            the objects of that class.
+
+        Returns:
+            dict: The objects by key.
+        """
+        names = list(self._classes()) if cls is None else [self._name(cls)]
+        objs = {}
+
+        for name in names:
+            if name not in self._classes():
+                continue
+            rows = self.__connection().execute(self.__sql(name, "all"))
+            for row in rows:
+                key = name + "." + row[0]
+                objs[key] = self.__object(name, key, row)
+            for key, obj in self.__dirty.items():
+                if key.startswith(name + "."):
+                    if obj is None:
+                        objs.pop(key, None)
+                    else:
+                        objs[key] = obj
+
+        return objs
+
+    def get(self, cls, id):
+        """
+        Returns the object of a class with the given id.
+
+        Args:
+            cls: The class, or the class name, of the object.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object, or None if it is not in storage.
+        """
+        name = self._name(cls)
+        key = "{}.{}".format(name, id)
+
+        if key in self.__dirty:
+            return self.__dirty[key]
+        if key in self.__objects:
+            return self.__objects[key]
+        if name not in self._classes():
+            return None
+
+        row = self.__connection().execute(
+            self.__sql(name, "get"), (id,)).fetchone()
+        return None if row is None else self.__object(name, key, row)
+
+    def count(self, cls=None) -> int:
+        """
+        Returns the number of objects in storage, without
+        building any of them.
+
+        Args:
+            cls: A class, or class name, to only count
+            the objects of that class.
+
+        Returns:
+            int: The number of objects.
+        """
+        names = list(self._classes()) if cls is None else [self._name(cls)]
+        count = 0
+
+        for name in names:
+            if name not in self._classes():
+                continue
+            conn = self.__connection()
+            count += conn.execute(self.__sql(name, "count")).fetchone()[0]
+            changed = {key.split(".", 1)[1]: obj
+                       for key, obj in self.__dirty.items()
+                       if key.startswith(name + ".")}
+            if changed:
+                stored = self.__stored(name, list(changed))
+                count += sum(1 for id, obj in changed.items()
+                             if obj is not None and id not in stored)
+                count -= sum(1 for id, obj in changed.items()
+                             if obj is None and id in stored)
+
+        return count
+
+    def find(self, cls, **attrs) -> dict:
+        """
+        Returns the objects of a class with the given attribute values.
+
+        The string and number attributes that are columns of the
+        table are looked up by the database, the others are checked
+        on the objects it returns. An attribute never set is
+        stored as NULL and matches the default of its class.
+
+        Example Usage:
+            storage.find(City, state_id=state.id)
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            **attrs: The attribute values to match.
+
+        Returns:
+            dict: The matching objects by key.
+        """
+        name = self._name(cls)
+        if name not in self._classes():
+            return {}
+
+        model = self._classes()[name]
+        columns = self.__table(name)
+        where = []
+        params = []
+        for a, value in attrs.items():
+            if a == "attributes" or a not in columns or \
+                    type(value) not in SCALARS:
+                continue
+            if getattr(model, a, None) == value:
+                where.append('("{0}" IS ? OR "{0}" IS NULL)'.format(a))
+            else:
+                where.append('"{}" IS ?'.format(a))
+            params.append(value)
+        sql = self.__sql(name, "all")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+
+        objs = {}
+        rows = self.__connection().execute(sql, params)
+        for row in rows:
+            key = name + "." + row[0]
+            if key not in self.__dirty:
+                objs[key] = self.__object(name, key, row)
+        for key, obj in self.__dirty.items():
+            if obj is not None and key.startswith(name + "."):
+                objs[key] = obj
+
+        return {key: obj for key, obj in objs.items()
+                if all(getattr(obj, a, None) == v for a, v in attrs.items())}
+
+    def add_index(self, cls, attr, kind="hash") -> None:
+        """
+        Indexes the table of a class by an attribute column.
+
+        The kinds of FileStorage are accepted, SQLite indexes
+        serving both equality and range lookups.
+
+        Args:
+            cls: The class, or the class name, of the objects.
+            attr (str): The name of the attribute, or a tuple
+            of names for a grid index.
+            kind (str): The kind of index, not used.
+        """
+        name = self._name(cls)
+        attrs = attr if isinstance(attr, tuple) else (attr,)
+        if name not in self._classes() or \
+                not all(a in self.__table(name) for a in attrs):
+            return
+
+        self.__connection().execute(
+            'CREATE INDEX IF NOT EXISTS "{}_{}" ON "{}" ({})'.format(
+                name, "_".join(attrs), name,
+                ", ".join('"{}"'.format(a) for a in attrs)))
+
+    def new(self, obj) -> None:
+        """
+        Adds an object to the storage and marks it
+        as changed, so the next save() writes it.
+
+        Args:
+            obj: The object.
+        """
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        self.__objects[key] = obj
+        self.__dirty[key] = obj
+
+    def delete(self, obj=None) -> None:
+        """
+        Removes an object from the storage on the next save().
+
+        Args:
+            obj: The object to be removed. Nothing is done if
+            it is None.
+        """
+        if obj is None:
+            return
+
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        self.__objects.pop(key, None)
+        self.__dirty[key] = None
+
+    def save(self) -> None:
+        """
+        Writes the objects changed since the last save,
+        in one transaction.
+        """
+        if not self.__dirty:
+            return
+
+        puts = {}
+        deletes = {}
+        for key, obj in self.__dirty.items():
+            name, id = key.split(".", 1)
+            if obj is None:
+                deletes.setdefault(name, []).append((id,))
+            else:
+                puts.setdefault(name, []).append(self.__row(name, obj))
+
+        conn = self.__connection()
+        with conn:
+            for name, rows in deletes.items():
+                conn.executemany(self.__sql(name, "delete"), rows)
+            for name, rows in puts.items():
+                conn.executemany(self.__sql(name, "insert"), rows)
+
+        self.__dirty.clear()
+
+    def reload(self) -> None:
+        """
+        Opens the database, creating the missing tables, and
+        forgets the objects read, except the ones changed since
+        the last save.
+        """
+        self.__connection()
+        self.__objects.clear()
+        self.__objects.update({k: v for k, v in self.__dirty.items()
+                               if v is not None})
+
+    def clear(self) -> None:
+        """
+        Forgets the objects in memory, changed or not,
+        without touching the database.
+        """
+        self.__objects.clear()
+        self.__dirty.clear()
+
+    def close(self) -> None:
+        """
+        Closes the database, which is opened again when needed.
+        The changes not saved are kept in memory.
+        """
+        if self.__conn is not None:
+            self.__conn.close()
+            SQLiteStorage.__conn = None
+            self.__tables.clear()
+            self.__statements.clear()
+
+    def __connection(self):
+        """
+        Returns the connection to the database, opening it
+        and creating the tables the first time.
+
+        Returns:
+            Connection: The connection.
+        """
+        if self.__conn is not None:
+            return self.__conn
+
+        conn = sqlite3.connect(self.__file_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        SQLiteStorage.__conn = conn
+        with conn:
+            for name in self._classes():
+                self.__create(name)
+        return conn
+
+    def __create(self, name) -> None:
+        """
+        Creates the table of a class, or adds the columns
+        of the attributes it declares since it was created.
+
+        The attribute columns have no type, so SQLite
+        stores their values as they are.
+
+        Args:
+            name (str): The name of the class.
+        """
+        model = self._classes()[name]
+        columns = list(BASE_COLUMNS)
+        for cls in reversed(model.__mro__):
+            for attr, value in vars(cls).items():
+                if not attr.startswith("_") and not callable(value) and \
+                        attr not in columns:
+                    columns.append(attr)
+        columns.append("attributes")
+
+        conn = self.__conn
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY, '
+            'created_at TEXT, updated_at TEXT, {})'.format(
+                name, ", ".join('"{}"'.format(c) for c in columns[3:])))
+
+        existing = [row[1] for row in conn.execute(
+            'PRAGMA table_info("{}")'.format(name))]
+        for column in columns:
+            if column not in existing:
+                conn.execute('ALTER TABLE "{}" ADD COLUMN "{}"'.format(
+                    name, column))
+                existing.append(column)
+
+        for column in existing:
+            if column.endswith("_id"):
+                conn.execute(
+                    'CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                    'ON "{0}" ("{1}")'.format(name, column))
+
+        self.__tables[name] = existing
+        self.__statements[name] = {
+            "all": 'SELECT * FROM "{}"'.format(name),
+            "get": 'SELECT * FROM "{}" WHERE id = ?'.format(name),
+            "count": 'SELECT COUNT(*) FROM "{}"'.format(name),
+            "delete": 'DELETE FROM "{}" WHERE id = ?'.format(name),
+            "insert": 'INSERT OR REPLACE INTO "{}" VALUES ({})'.format(
+                name, ", ".join("?" * len(existing))),
+        }
+
+    def __table(self, name) -> list:
+        """
+        Returns the columns of the table of a class, in order.
+
+        Args:
+            name (str): The name of the class.
+
+        Returns:
+            list: The column names.
+        """
+        self.__connection()
+        return self.__tables[name]
+
+    def __sql(self, name, kind) -> str:
+        """
+        Returns a SQL statement on the table of a class.
+
+        Args:
+            name (str): The name of the class.
+            kind (str): "all", "get", "count", "delete" or "insert".
+
+        Returns:
+            str: The statement.
+        """
+        self.__connection()
+        return self.__statements[name][kind]
+
+    def __row(self, name, obj) -> list:
+        """
+        Returns the values of the columns of an object.
+
+        Args:
+            name (str): The name of the class.
+            obj: The object.
+
+        Returns:
+            list: The column values, in table order.
+        """
+        record = obj.to_dict()
+        del record["__class__"]
+        columns = self.__table(name)
+
+        row = []
+        for column in columns:
+            value = record.get(column)
+            if type(value) in SCALARS:
+                del record[column]
+                row.append(value)
+            else:
+                row.append(None)
+        row[columns.index("attributes")] = \
+            json.dumps(record) if record else None
+        return row
+
+    def __object(self, name, key, row):
+        """
+        Returns the object of a row, the one already read if any.
+
+        Args:
+            name (str): The name of the class.
+            key (str): The key of the object.
+            row (tuple): The row.
+
+        Returns:
+            BaseModel: The object.
+        """
+        obj = self.__objects.get(key)
+        if obj is not None:
+            return obj
+
+        model = self._classes()[name]
+        record = {}
+        for column, value in zip(self.__table(name), row):
+            if value is None:
+                continue
+            if column == "attributes":
+                record.update(json.loads(value))
+            else:
+                record[column] = value
+
+        obj = self.__objects[key] = model(**record)
+        return obj
+
+    def __stored(self, name, ids) -> set:
+        """
+        Returns the ids among ids that are in the table of a class.
+
+        Args:
+            name (str): The name of the class.
+            ids (list): The ids.
+
+        Returns:
+            set: The ids found.
+        """
+        stored = set()
+        conn = self.__connection()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            stored.update(row[0] for row in conn.execute(
+                'SELECT id FROM "{}" WHERE id IN ({})'.format(
+                    name, ", ".join("?" * len(chunk))), chunk))
+        return stored
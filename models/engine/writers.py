@@ -0,0 +1,678 @@
+#!/usr/bin/python3
+"""
+Module that defines how FileStorage writes its files: whole,
+record by record, or in a writer thread, following an fsync policy
+"""
+
+import os
+import queue
+import threading
+import time
+from models.engine import serializers
+from models.engine.loaders import unpack
+
+
+class Durability:
+    """
+    The fsync policy of the writes: files are synced to disk
+    always, never, or once per interval, the files written since
+    the last sync being synced with the next one that is due.
+
+    Attributes:
+        policy (str): "always", "never", or a number of milliseconds.
+        synced_at (float): The time of the last sync.
+        unsynced (set): The paths of the files not synced yet.
+        lock (RLock): Guards the files not synced yet and the time
+        of the last sync, changed by the writer thread too.
+
+    Methods:
+        due(self, path) -> bool:
+            Tells if a file being written must be synced.
+
+        sync(self) -> None:
+            Syncs the files not synced yet.
+    """
+
+    def __init__(self, policy="always"):
+        """
+        Initializes the policy, with no file to sync.
+
+        Args:
+            policy (str): "always", "never", or a number of milliseconds.
+        """
+        self.policy = policy
+        self.synced_at = float("-inf")
+        self.unsynced = set()
+        self.lock = threading.RLock()
+
+    def due(self, path) -> bool:
+        """
+        Tells if a file being written must be synced to disk.
+        With an interval, the files written since the last
+        sync are synced too when it is due.
+
+        Args:
+            path (str): The path of the file being written.
+
+        Returns:
+            bool: True if the file must be synced.
+        """
+        policy = self.policy
+        if policy == "always":
+            return True
+
+        with self.lock:
+            if policy != "never":
+                now = time.monotonic()
+                if (now - self.synced_at) * 1000 >= float(policy):
+                    self.unsynced.discard(path)
+                    self.sync()
+                    return True
+
+            self.unsynced.add(path)
+            return False
+
+    def sync(self) -> None:
+        """
+        Waits for the files written without waiting for them to be
+        on disk to be on disk.
+        """
+        with self.lock:
+            for path in list(self.unsynced):
+                serializers.sync(path)
+                self.unsynced.discard(path)
+            self.synced_at = time.monotonic()
+
+
+class WriterThread:
+    """
+    The thread running the writes of background mode, in order.
+
+    The thread never asks for the lock of the thread safe mode of
+    FileStorage, only for the lock of the fsync policy, so settle()
+    can wait while holding the former, but not while holding the
+    latter.
+
+    Attributes:
+        thread (Thread): The thread, started by the first write.
+        tasks (Queue): The writes waiting for the thread.
+        queued (dict): The number of the last queued write of each
+        file, so the thread skips the writes of a file queued again
+        after them.
+        error (Exception): The first error of the thread
+        not raised by check() yet.
+
+    Methods:
+        submit(self, task, *args) -> None:
+            Queues a write, starting the thread the first time.
+
+        enqueue(self, path) -> int:
+            Numbers a write of a file.
+
+        latest(self, path, number) -> bool:
+            Tells if a write of a file is the last one queued.
+
+        settle(self) -> None:
+            Waits for the queued writes.
+
+        check(self) -> None:
+            Raises the error of a failed write.
+
+        stop(self) -> None:
+            Stops the thread once the queued writes are done.
+    """
+
+    def __init__(self):
+        """
+        Initializes the writes, without starting the thread.
+        """
+        self.thread = None
+        self.tasks = None
+        self.queued = {}
+        self.error = None
+
+    def submit(self, task, *args) -> None:
+        """
+        Queues a write, starting the thread the first time.
+
+        Args:
+            task: The function writing the files.
+            *args: The arguments of the function, which must not be
+            changed by the caller once the write is queued.
+        """
+        if self.thread is None:
+            self.tasks = queue.Queue()
+            self.thread = threading.Thread(
+                target=self.__run, args=(self.tasks,),
+                name="FileStorage writer", daemon=True)
+            self.thread.start()
+
+        self.tasks.put((task, args))
+
+    def __run(self, tasks) -> None:
+        """
+        Runs the queued writes, in order, until stop() queues None.
+
+        A failed write does not stop the thread, its
+        error is raised by the next check().
+
+        Args:
+            tasks (Queue): The queue of the writes.
+        """
+        while True:
+            item = tasks.get()
+            try:
+                if item is None:
+                    return
+                task, args = item
+                task(*args)
+            except Exception as error:
+                if self.error is None:
+                    self.error = error
+            finally:
+                tasks.task_done()
+
+    def enqueue(self, path) -> int:
+        """
+        Numbers a write of a file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            int: The number of the write.
+        """
+        number = self.queued[path] = self.queued.get(path, 0) + 1
+        return number
+
+    def latest(self, path, number) -> bool:
+        """
+        Tells if a write of a file is the last one queued.
+
+        Args:
+            path (str): The path of the file.
+            number (int): The number of the write.
+
+        Returns:
+            bool: True if the file was not queued again since.
+        """
+        return self.queued[path] == number
+
+    def settle(self) -> None:
+        """
+        Waits for the thread to run the queued writes.
+        """
+        if self.thread is not None:
+            self.tasks.join()
+
+    def check(self) -> None:
+        """
+        Raises the first error of the thread since the last call.
+
+        Raises:
+            OSError: If a write failed.
+        """
+        error = self.error
+        if error is not None:
+            self.error = None
+            raise error
+
+    def stop(self) -> None:
+        """
+        Stops the thread once the queued writes are done.
+        """
+        thread = self.thread
+        if thread is not None:
+            self.tasks.put(None)
+            thread.join()
+            self.thread = None
+
+
+class Writer:
+    """
+    Rewrites each segment file whole, from the objects encoded at
+    once, or in incremental mode from the cached encoding of the
+    objects that did not change and the new encoding of the others.
+
+    The writers do not own the objects: they are given the layout
+    and the dictionaries of the storage and only read them, but for
+    the cache of the encoded objects.
+
+    Attributes:
+        layout (SingleFile): The layout of the segments.
+        serializer: The format of the files, the one of the layout.
+        incremental (bool): Reuse the cached encoding of the objects.
+        buffering (int): The size of the write buffer of the files
+        written record by record, 0 for the default one.
+        durability (Durability): The fsync policy.
+        _objects (dict): The objects built, by key.
+        _raw (dict): The records not built yet, by key.
+        _dirty (dict): The keys changed since the last save.
+        _cache (dict): The encoded objects that did not
+        change since they were last written.
+
+    Methods:
+        begin(self) -> None:
+            Prepares the writes of a save.
+
+        write(self, segment) -> None:
+            Writes a segment file.
+
+        finish(self) -> None:
+            Ends the writes of a save.
+
+        reset(self) -> None:
+            Forgets what was written.
+
+        append(self, path, lines) -> None:
+            Appends lines to the journal file.
+
+        remove(self, path) -> None:
+            Removes a file.
+
+        fragments(self, keys):
+            Encodes objects one by one.
+    """
+
+    def __init__(self, layout, objects, raw, dirty, cache, durability,
+                 incremental=False, buffering=0):
+        """
+        Initializes the writer.
+
+        Args:
+            layout (SingleFile): The layout of the segments.
+            objects (dict): The objects built, by key.
+            raw (dict): The records not built yet, by key.
+            dirty (dict): The keys changed since the last save.
+            cache (dict): The encoded objects by key.
+            durability (Durability): The fsync policy.
+            incremental (bool): Reuse the cached encoding of the objects.
+            buffering (int): The size of the write buffer, 0 for
+            the default one.
+        """
+        self.layout = layout
+        self.serializer = layout.serializer
+        self.incremental = incremental
+        self.buffering = buffering
+        self.durability = durability
+        self._objects = objects
+        self._raw = raw
+        self._dirty = dirty
+        self._cache = cache
+
+    def begin(self) -> None:
+        """
+        Drops the cached encoding of the changed objects.
+        """
+        if self.incremental:
+            for k in self._dirty:
+                self._cache.pop(k, None)
+
+    def write(self, segment) -> None:
+        """
+        Rewrites a segment file.
+
+        Args:
+            segment: The segment.
+        """
+        path = self.layout.path(segment)
+        keys = self.layout.members(segment)
+        serializer = self.serializer
+        if self.incremental:
+            data = serializer.join(keys, list(self.fragments(keys)))
+        else:
+            data = serializer.dumps({k: self.record(k) for k in keys})
+
+        serializers.write(path, serializer, data,
+                          fsync=self.durability.due(path))
+
+    def finish(self) -> None:
+        """
+        Drops the cached encoding of the objects no longer in storage.
+        """
+        if not self.incremental:
+            return
+
+        cache = self._cache
+        objects, raw = self._objects, self._raw
+        if len(cache) > len(objects) + len(raw):
+            for k in [k for k in cache if k not in objects and k not in raw]:
+                del cache[k]
+
+    def reset(self) -> None:
+        """
+        Forgets what was written, when the objects in memory were
+        read again from disk, which this writer does not need.
+        """
+
+    def append(self, path, lines) -> None:
+        """
+        Appends lines to the journal file.
+
+        Args:
+            path (str): The path of the journal file.
+            lines (list): The encoded journal records.
+        """
+        self._run(self._append, path, lines)
+
+    def remove(self, path) -> None:
+        """
+        Removes a file, the journal or a segment file no longer
+        used, if there is one.
+
+        Args:
+            path (str): The path of the file.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def record(self, key) -> dict:
+        """
+        Returns the record of an object, built or not.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            The record, as encoded by the serializer.
+        """
+        v = self._objects.get(key)
+        if v is None:
+            return unpack(self._raw[key])
+        return self.serializer.record(v)
+
+    def fragments(self, keys):
+        """
+        Encodes objects one by one. In incremental mode, the
+        cached encoding of every object that did not change is reused.
+
+        Joined by the serializer, the fragments are
+        the same its dumps() returns for the objects.
+
+        Args:
+            keys: The keys of the objects to encode.
+
+        Yields:
+            The encoded objects, JSON text or binary records.
+        """
+        cache = self._cache if self.incremental else None
+        serializer = self.serializer
+
+        for k in keys:
+            fragment = None if cache is None else cache.get(k)
+            if fragment is None:
+                fragment = serializer.fragment(k, self.record(k))
+                if cache is not None:
+                    cache[k] = fragment
+            yield fragment
+
+    def _run(self, task, *args) -> None:
+        """
+        Runs a write, at once.
+
+        Args:
+            task: The function writing the files.
+            *args: The arguments of the function.
+        """
+        task(*args)
+
+    def _append(self, path, lines) -> None:
+        """
+        Appends lines to the journal file, see append().
+        """
+        with open(path, mode='a', encoding="utf-8") as f:
+            f.writelines(lines)
+            if self.durability.due(path):
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _dump(self, path, keys, fragments) -> None:
+        """
+        Writes a segment file fragment by fragment.
+
+        Args:
+            path (str): The path of the segment file.
+            keys (list): The keys of the objects.
+            fragments: The encoded objects, in the order of the keys.
+        """
+        serializers.dump(path, self.serializer, keys, fragments,
+                         fsync=self.durability.due(path),
+                         buffering=self.buffering)
+
+
+class StreamWriter(Writer):
+    """
+    Writes each segment file record by record, each object being
+    encoded after the previous one is written, so the encoding of
+    a whole file is never held in memory.
+    """
+
+    def write(self, segment) -> None:
+        """
+        Rewrites a segment file record by record.
+
+        Args:
+            segment: The segment.
+        """
+        keys = self.layout.members(segment)
+        self._dump(self.layout.path(segment), keys, self.fragments(keys))
+
+
+class BackgroundWriter(StreamWriter):
+    """
+    Encodes the changed objects and queues the writes, which the
+    writer thread runs, so a save takes the same time whatever the
+    size of the store. The encoding of every object is cached.
+
+    The thread keeps the encoded objects of each file it wrote, its
+    image. The first write of a file hands it every object of the
+    segment, and the next ones only the objects changed since, which
+    it merges into the image before writing it, so a save only does
+    work for the changed objects. The objects changed by the saves
+    appended to the journal are written by the next compaction, which
+    writes every segment. After reset(), the next write of each file
+    hands it every object again.
+
+    A file queued again before the thread gets to it is only
+    written by the last write queued, and so is a file removed,
+    so the journal is only removed once the segments of the last
+    compaction are written.
+
+    Attributes:
+        thread (WriterThread): The writer thread.
+        imaged (set): The paths of the files whose image was handed
+        to the thread since the last reset().
+        journaled (set): The keys of the objects changed by the saves
+        appended to the journal since the last compaction.
+        images (dict): The image of each file, by path, only used by
+        the thread.
+    """
+
+    def __init__(self, layout, objects, raw, dirty, cache, durability,
+                 thread, buffering=0):
+        """
+        Initializes the writer.
+
+        Args:
+            layout (SingleFile): The layout of the segments.
+            objects (dict): The objects built, by key.
+            raw (dict): The records not built yet, by key.
+            dirty (dict): The keys changed since the last save.
+            cache (dict): The encoded objects by key.
+            durability (Durability): The fsync policy.
+            thread (WriterThread): The writer thread.
+            buffering (int): The size of the write buffer, 0 for
+            the default one.
+        """
+        super().__init__(layout, objects, raw, dirty, cache,
+                         durability, True, buffering)
+        self.thread = thread
+        self.imaged = set()
+        self.journaled = set()
+        self.images = {}
+
+    def write(self, segment) -> None:
+        """
+        Queues the write of a segment file with its objects, or the
+        objects changed since its last write, encoded as they are now.
+
+        Args:
+            segment: The segment.
+        """
+        path = self.layout.path(segment)
+        whole = path not in self.imaged
+        self.imaged.add(path)
+        self._run(self._dump_queued, self.thread.enqueue(path), path,
+                  self.changes(segment, whole), whole)
+
+    def finish(self) -> None:
+        """
+        Drops the cached encoding of the objects no longer in storage,
+        and the objects changed by the journal, which a compaction
+        just wrote with every segment.
+        """
+        super().finish()
+        self.journaled.clear()
+
+    def reset(self) -> None:
+        """
+        Makes the next write of each file hand the thread every
+        object, when the objects in memory were read again from disk.
+        """
+        self.imaged.clear()
+        self.journaled.clear()
+
+    def append(self, path, lines) -> None:
+        """
+        Queues lines to append to the journal file, keeping
+        the keys of the objects they change for the next
+        compaction.
+
+        Args:
+            path (str): The path of the journal file.
+            lines (list): The encoded journal records.
+        """
+        self.journaled.update(self._dirty)
+        super().append(path, lines)
+
+    def remove(self, path) -> None:
+        """
+        Queues the removal of a file.
+
+        Args:
+            path (str): The path of the file.
+        """
+        self.imaged.discard(path)
+        self._run(self._remove_queued, self.thread.enqueue(path), path)
+
+    def changes(self, segment, whole) -> dict:
+        """
+        Returns the encoded objects of a segment, or the ones
+        changed since the segment was last written.
+
+        Args:
+            segment: The segment.
+            whole (bool): Return every object of the segment.
+
+        Returns:
+            dict: The encoded objects by key, None for the
+            objects removed from the segment.
+        """
+        layout = self.layout
+        if whole:
+            keys = layout.members(segment)
+            return dict(zip(keys, self.fragments(keys)))
+
+        objects, raw = self._objects, self._raw
+        keys, gone = [], []
+        for k in set(self._dirty).union(self.journaled):
+            if layout.segment_of(k) == segment:
+                (keys if k in objects or k in raw else gone).append(k)
+
+        changes = dict(zip(keys, self.fragments(keys)))
+        changes.update(dict.fromkeys(gone))
+        return changes
+
+    def _run(self, task, *args) -> None:
+        """
+        Queues a write for the writer thread.
+
+        Args:
+            task: The function writing the files.
+            *args: The arguments of the function, which must not be
+            changed by the caller once the write is queued.
+        """
+        self.thread.submit(task, *args)
+
+    def _dump_queued(self, number, path, changes, whole) -> None:
+        """
+        Merges the changes of a queued segment file into its image,
+        and writes it unless it was queued again since.
+
+        Args:
+            number (int): The number of the write in the queue
+            of the file.
+            path (str): The path of the segment file.
+            changes (dict): The encoded objects by key, None for
+            the objects removed.
+            whole (bool): The changes hold every object of the file.
+        """
+        if whole:
+            image = self.images[path] = changes
+        else:
+            image = self.images[path]
+            for k, fragment in changes.items():
+                if fragment is None:
+                    image.pop(k, None)
+                else:
+                    image[k] = fragment
+
+        if self.thread.latest(path, number):
+            self._dump(path, list(image), image.values())
+
+    def _remove_queued(self, number, path) -> None:
+        """
+        Removes a file, unless it was queued again since.
+
+        Args:
+            number (int): The number of the removal in the queue.
+            path (str): The path of the file.
+        """
+        self.images.pop(path, None)
+        if self.thread.latest(path, number):
+            super().remove(path)
+
+
+def create(layout, objects, raw, dirty, cache, durability, thread,
+           incremental=False, stream=False, background=False, buffering=0):
+    """
+    Returns the writer of the given storage options.
+
+    Args:
+        layout (SingleFile): The layout of the segments.
+        objects (dict): The objects built, by key.
+        raw (dict): The records not built yet, by key.
+        dirty (dict): The keys changed since the last save.
+        cache (dict): The encoded objects by key.
+        durability (Durability): The fsync policy.
+        thread (WriterThread): The writer thread of background mode.
+        incremental (bool): Reuse the cached encoding of the objects.
+        stream (bool): Write the files record by record.
+        background (bool): Write the files in the writer thread.
+        buffering (int): The size of the write buffer, 0 for
+        the default one.
+
+    Returns:
+        Writer: The writer.
+    """
+    if background:
+        return BackgroundWriter(layout, objects, raw, dirty, cache,
+                                durability, thread, buffering)
+    if stream:
+        return StreamWriter(layout, objects, raw, dirty, cache,
+                            durability, incremental, buffering)
+
+    return Writer(layout, objects, raw, dirty, cache, durability,
+                  incremental, buffering)
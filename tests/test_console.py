@@ -6,7 +6,6 @@ import unittest
 from unittest.mock import patch
 from io import StringIO
 import pep8
-import os
 import json
 import console
 from models.base_model import BaseModel
@@ -17,6 +16,7 @@ from models.amenity import Amenity
 from models.place import Place
 from models.review import Review
 from models.engine.file_storage import FileStorage
+from models.engine.memory_storage import MemoryStorage
 
 
 class TestConsole(unittest.TestCase):
@@ -31,7 +31,9 @@ class TestConsole(unittest.TestCase):
         the test cases in the TestConsole class.
 
         This method creates an instance of the HBNBCommand
-        class and removes the "file.json" file if it exists.
+        class, which stores the objects in a MemoryStorage
+        without snapshot whatever HBNB_TYPE_STORAGE selects,
+        so the tests never touch the disk.
 
         Inputs:
         - None
@@ -41,8 +43,12 @@ class TestConsole(unittest.TestCase):
         """
 
         self.command = console.HBNBCommand()
-        if os.path.exists("file.json"):
-            os.remove("file.json")
+        self.storage = MemoryStorage()
+        self.objects = dict(self.storage.all())
+        self.patchers = [patch("console.storage", self.storage),
+                         patch("models.base_model.storage", self.storage)]
+        for patcher in self.patchers:
+            patcher.start()
 
     @classmethod
     def tearDownClass(self):
@@ -50,8 +56,9 @@ class TestConsole(unittest.TestCase):
         Clean up the environment after running all
         the test cases in the TestConsole class.
 
-        This method checks if the file "file.json"
-        exists and removes it if it does.
+        This method gives the console and the models
+        their storage back and forgets the objects
+        created by the tests.
 
         Inputs:
         - None
@@ -60,8 +67,11 @@ class TestConsole(unittest.TestCase):
         - None
         """
 
-        if os.path.exists("file.json"):
-            os.remove("file.json")
+        for patcher in self.patchers:
+            patcher.stop()
+        self.storage.clear()
+        for obj in self.objects.values():
+            self.storage.new(obj)
 
     def test_documentation_console(self):
         """
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Module defining the base class of the tests saving
+models to a FileStorage in a temporary directory
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from models.engine.file_storage import FileStorage
+
+
+class FileStorageCase(unittest.TestCase):
+    """
+    Base class of the tests saving models with FileStorage
+    and reading them back.
+
+    The storage file is in a temporary directory, and BaseModel
+    saves to that FileStorage whatever the engine selected by
+    HBNB_TYPE_STORAGE, so the tests run on every engine and
+    never change the file.json of the repository. The tests
+    that do not read back what was saved use MemoryStorageCase.
+
+    Attributes:
+        tmp (str): The temporary directory.
+        path (str): The path of the storage file.
+        storage (FileStorage): The storage the models are saved to.
+        objects (dict): The objects of the storage before the test.
+        file_path (str): The path of the storage file before the test.
+        options (dict): The storage options before the test,
+        e.g. set by HBNB_FS_* variables.
+    """
+
+    def setUp(self):
+        """
+        Point the storage at a temporary directory with the
+        default options, start from an empty store and make
+        the models save to it.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "file.json")
+        self.storage = FileStorage()
+        self.objects = dict(self.storage.all())
+        self.file_path = FileStorage._FileStorage__file_path
+        self.options = self.storage.options()
+        self.storage.clear()
+        self.storage.configure(file_path=self.path,
+                               **FileStorage.defaults())
+        patcher = mock.patch("models.base_model.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """
+        Restore the storage options, path and objects.
+        """
+        self.storage.clear()
+        for obj in self.objects.values():
+            self.storage.new(obj)
+        self.storage.configure(file_path=self.file_path, **self.options)
+        shutil.rmtree(self.tmp)
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Module defining the base class of the tests keeping
+models in a MemoryStorage, without touching the disk
+"""
+
+import unittest
+from unittest import mock
+from models.engine.memory_storage import MemoryStorage
+
+
+class MemoryStorageCase(unittest.TestCase):
+    """
+    Base class of the model tests that do not check
+    what is written to disk.
+
+    BaseModel saves to a MemoryStorage whatever the engine selected
+    by HBNB_TYPE_STORAGE, and opening a file fails the test, so the
+    tests do no file I/O. The tests reading back saved objects use
+    FileStorageCase instead.
+
+    Attributes:
+        storage (MemoryStorage): The storage the models are saved to.
+        objects (dict): The objects of the storage before the test.
+    """
+
+    def setUp(self):
+        """
+        Start from an empty MemoryStorage, make the
+        models save to it and forbid opening files.
+        """
+        self.storage = MemoryStorage()
+        self.objects = dict(self.storage.all())
+        self.storage.clear()
+        for patcher in (mock.patch("models.base_model.storage", self.storage),
+                        mock.patch("builtins.open",
+                                   side_effect=AssertionError("file I/O"))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """
+        Restore the objects of the storage.
+        """
+        self.storage.clear()
+        for obj in self.objects.values():
+            self.storage.new(obj)
@@ -6,44 +6,16 @@ Module for testing the Amenity class
 import os
 import unittest
 from datetime import datetime
-from models import storage
 from models.engine.file_storage import FileStorage
 from models.amenity import Amenity
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
 
-class TestAmenity(unittest.TestCase):
+class TestAmenity(MemoryStorageCase):
     """
     Defines the test methods to test Amenity class
     """
-    def set_up(self):
-        """
-        Set up the test environment before running
-        ach test case in the TestAmenity class.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the file "file.json" exists.
-        2. If the file exists, remove it.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tear_down(self):
-        """
-        Clean up the test environment after running
-        each test case in the TestAmenity class.
-
-        :param self: The TestAmenity instance.
-        :return: None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_amenity_created(self):
         """
         Test if an instance of the Amenity
@@ -243,6 +215,34 @@ class TestAmenity(unittest.TestCase):
         amenity_dict = amenity.to_dict()
         self.assertIn("name", amenity_dict)
 
+    def test_amenity_str_(self):
+        """
+        Test the __str__ method of the Amenity class.
+
+        This method checks if the __str__ method of
+        the Amenity class returns the expected string
+        representation of an instance of the class.
+
+        Example Usage:
+        amenity = Amenity()
+        expected_str = "[Amenity] ({}) {}".format(amenity.id, amenity.__dict__)
+        self.assertEqual(str(amenity), expected_str)
+
+        Inputs: None
+        Outputs: None
+        """
+
+        amenity = Amenity()
+        expected_str = "[Amenity] ({}) {}".format(amenity.id, amenity.__dict__)
+        self.assertEqual(str(amenity), expected_str)
+
+
+class TestAmenityStorage(FileStorageCase):
+    """
+    Defines the test methods saving an Amenity to a FileStorage
+    and reading it back
+    """
+
     def test_amenity_save_to_file(self):
         """
         Test the functionality of saving an
@@ -251,7 +251,7 @@ class TestAmenity(unittest.TestCase):
         Example Usage:
         amenity = Amenity()
         amenity.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
         Inputs: None
         Outputs: None
@@ -259,7 +259,7 @@ class TestAmenity(unittest.TestCase):
 
         amenity = Amenity()
         amenity.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
     def test_amenity_reload_from_file(self):
         """
@@ -289,27 +289,6 @@ class TestAmenity(unittest.TestCase):
 
         self.assertIn("Amenity." + amenity_id, objs.keys())
 
-    def test_amenity_str_(self):
-        """
-        Test the __str__ method of the Amenity class.
-
-        This method checks if the __str__ method of
-        the Amenity class returns the expected string
-        representation of an instance of the class.
-
-        Example Usage:
-        amenity = Amenity()
-        expected_str = "[Amenity] ({}) {}".format(amenity.id, amenity.__dict__)
-        self.assertEqual(str(amenity), expected_str)
-
-        Inputs: None
-        Outputs: None
-        """
-
-        amenity = Amenity()
-        expected_str = "[Amenity] ({}) {}".format(amenity.id, amenity.__dict__)
-        self.assertEqual(str(amenity), expected_str)
-
     def test_amenity_update_attributes(self):
         """
         Test the functionality of updating
@@ -342,7 +321,7 @@ class TestAmenity(unittest.TestCase):
         Example Usage:
         amenity = Amenity()
         amenity_id = amenity.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_amenity = new_storage.all()['Amenity.{}'.format(amenity_id)]
@@ -351,7 +330,7 @@ class TestAmenity(unittest.TestCase):
 
         amenity = Amenity()
         amenity_id = amenity.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
 
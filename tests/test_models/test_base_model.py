@@ -6,57 +6,17 @@ import json
 import unittest
 import models
 import os
-from models import storage
 from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
 from datetime import datetime
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
-class TestBaseModel(unittest.TestCase):
+class TestBaseModel(MemoryStorageCase):
     """
     Test class for BaseModel class module
     """
 
-    def setUp(self):
-        """
-        Set up the necessary environment for each
-        test case in the TestBaseModel class.
-
-        This method checks if a file named "file.json"
-        exists and removes it if it does.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the file "file.json" exists.
-        2. If the file exists, remove it.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tearDown(self):
-        """
-        Clean up after each test case in the TestBaseModel class.
-
-        This method checks if a file named "file.json"
-        exists and removes it if it does.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the file "file.json" exists.
-        2. If the file exists, remove it.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_obj_created(self):
         """
         Test if an instance of the BaseModel class can be created successfully.
@@ -234,6 +194,56 @@ class TestBaseModel(unittest.TestCase):
         self.assertIn("created_at", base_dict)
         self.assertIn("updated_at", base_dict)
 
+    def test_kwargs_timestamps(self):
+        """
+        Test that the timestamps written by to_dict() are read back,
+        including those isoformat() writes without microseconds.
+
+        Inputs: None
+        Outputs: None
+        """
+        base = BaseModel()
+        base.created_at = base.created_at.replace(microsecond=0)
+        copy = BaseModel(**base.to_dict())
+        self.assertEqual(copy.created_at, base.created_at)
+        self.assertEqual(copy.updated_at, base.updated_at)
+
+        copy = BaseModel(id="1", created_at="2023-10-15T06:04:32.7",
+                         updated_at=base.updated_at)
+        self.assertEqual(copy.created_at,
+                         datetime(2023, 10, 15, 6, 4, 32, 700000))
+        self.assertIs(copy.updated_at, base.updated_at)
+
+    def test_base_str_(self):
+        """
+        Test the __str__ method of the BaseModel class.
+
+        This method checks if the __str__ method of the BaseModel class
+        returns the expected string representation of the object.
+
+        Example Usage:
+        base = BaseModel()
+        expected_str = "[BaseModel] ({}) {}".format(base.id, base.__dict__)
+        assert str(base) == expected_str
+
+        Inputs:
+        - self: an instance of the TestBaseModel class
+
+        Outputs:
+        - None
+        """
+
+        base = BaseModel()
+        expected_str = "[BaseModel] ({}) {}".format(base.id, base.__dict__)
+        self.assertEqual(str(base), expected_str)
+
+
+class TestBaseModelStorage(FileStorageCase):
+    """
+    Defines the test methods saving a BaseModel to a FileStorage
+    and reading it back
+    """
+
     def test_base_save_to_file(self):
         """
         Test whether the save method of the BaseModel class
@@ -242,19 +252,40 @@ class TestBaseModel(unittest.TestCase):
         Example Usage:
         base = BaseModel()
         base.save()
-        assert os.path.exists("file.json") == True
+        assert os.path.exists(self.path) == True
 
         Inputs: None
         Flow:
         1. Create an instance of the BaseModel class called base.
         2. Call the save method on the base object.
-        3. Check if the file "file.json" exists.
+        3. Check if the storage file exists.
+
+        Outputs: None
+        """
+        base = BaseModel()
+        base.save()
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_save_after_delete(self):
+        """
+        Test that saving a deleted object does not add it back.
+
+        Example Usage:
+        base = BaseModel()
+        self.storage.delete(base)
+        self.storage.save()
+        base.save()
+        assert self.storage.get(BaseModel, base.id) is None
 
         Outputs: None
         """
         base = BaseModel()
+        count = self.storage.count()
+        self.storage.delete(base)
+        self.storage.save()
         base.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertIsNone(self.storage.get(BaseModel, base.id))
+        self.assertEqual(self.storage.count(), count - 1)
 
     def test_base_reload_from_file(self):
         """
@@ -264,7 +295,7 @@ class TestBaseModel(unittest.TestCase):
         Example Usage:
         base = BaseModel()
         base_model_id = base.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_base_model = new_storage.all()['BaseModel.{}'
@@ -273,36 +304,13 @@ class TestBaseModel(unittest.TestCase):
         """
         base = BaseModel()
         base_model_id = base.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_base_model = new_storage.all()['BaseModel.{}'
                                               .format(base_model_id)]
         self.assertIsInstance(loaded_base_model, BaseModel)
 
-    def test_base_str_(self):
-        """
-        Test the __str__ method of the BaseModel class.
-
-        This method checks if the __str__ method of the BaseModel class
-        returns the expected string representation of the object.
-
-        Example Usage:
-        base = BaseModel()
-        expected_str = "[BaseModel] ({}) {}".format(base.id, base.__dict__)
-        assert str(base) == expected_str
-
-        Inputs:
-        - self: an instance of the TestBaseModel class
-
-        Outputs:
-        - None
-        """
-
-        base = BaseModel()
-        expected_str = "[BaseModel] ({}) {}".format(base.id, base.__dict__)
-        self.assertEqual(str(base), expected_str)
-
 
 if __name__ == "__main__":
     unittest.main()
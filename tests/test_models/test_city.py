@@ -5,48 +5,18 @@ Module for testing the City class
 import json
 import os
 import unittest
-from models import storage
 from datetime import datetime
 from models.engine.file_storage import FileStorage
 from models.city import City
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
 
-class testCity(unittest.TestCase):
+class testCity(MemoryStorageCase):
     """
     Defines the test methods to test the City class
     """
 
-    def setUp(self):
-        """
-        Set up the necessary environment for each
-        test case in the testCity class.
-        Removes the "file.json" file if it exists before each test.
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tearDown(self):
-        """
-        Clean up the environment after each
-        test case in the testCity class.
-
-        This method removes the "file.json"
-        file if it exists.
-
-        Example Usage:
-        test_city = testCity()
-        test_city.tearDown()
-
-        Inputs: None
-        Flow:
-        1. Check if the "file.json" file exists.
-        2. If the file exists, remove it.
-
-        Outputs: None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_city_created(self):
         """
         Test if a City object is successfully created.
@@ -222,6 +192,33 @@ class testCity(unittest.TestCase):
         city_dict = city.to_dict()
         self.assertIn("name", city_dict)
 
+    def test_city_str_(self):
+        """
+        Test the __str__ method of the City class.
+
+        This method creates an instance of the City class and
+        tests if the string representation of the object is correct.
+
+        Example Usage:
+        city = City()
+        expected_str = "[City] ({}) {}".format(city.id, city.__dict__)
+        assert str(city) == expected_str
+
+        Inputs: None
+        Outputs: None
+        """
+
+        city = City()
+        expected_str = "[City] ({}) {}".format(city.id, city.__dict__)
+        self.assertEqual(str(city), expected_str)
+
+
+class testCityStorage(FileStorageCase):
+    """
+    Defines the test methods saving a City to a FileStorage
+    and reading it back
+    """
+
     def test_city_save_to_file(self):
         """
         Test whether the save method of the City class
@@ -230,20 +227,20 @@ class testCity(unittest.TestCase):
         Example Usage:
         city = City()
         city.save()
-        assert os.path.exists("file.json") == True
+        assert os.path.exists(self.path) == True
 
         Inputs: None
         Flow:
         1. Create an instance of the City class named city.
         2. Call the save method on the city object.
-        3. Check if the file "file.json" exists.
+        3. Check if the storage file exists.
 
         Outputs: None
         """
 
         city = City()
         city.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
     def test_city_reload_from_file(self):
         """
@@ -261,26 +258,6 @@ class testCity(unittest.TestCase):
 
         self.assertIn("City." + city_id, objs.keys())
 
-    def test_city_str_(self):
-        """
-        Test the __str__ method of the City class.
-
-        This method creates an instance of the City class and
-        tests if the string representation of the object is correct.
-
-        Example Usage:
-        city = City()
-        expected_str = "[City] ({}) {}".format(city.id, city.__dict__)
-        assert str(city) == expected_str
-
-        Inputs: None
-        Outputs: None
-        """
-
-        city = City()
-        expected_str = "[City] ({}) {}".format(city.id, city.__dict__)
-        self.assertEqual(str(city), expected_str)
-
     def test_city_update_attributes(self):
         """
         Test whether the 'name' attribute of a 'City' object can be
@@ -319,7 +296,7 @@ class testCity(unittest.TestCase):
 
         city = City()
         city_id = city.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_city = new_storage.all()['City.{}'.format(city_id)]
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+Defines tests for the compact representation of model instances
+"""
+import pickle
+import unittest
+from datetime import datetime
+from models import compact
+from models.place import Place
+from models.user import User
+
+
+class TestCompact(unittest.TestCase):
+    """
+    Test the compact classes and build()
+    """
+
+    def setUp(self):
+        """
+        Build the record of a place.
+        """
+        self.place = Place()
+        self.place.name = "Cozy"
+        self.place.city_id = "city"
+        self.record = self.place.to_dict()
+
+    def test_compact_class(self):
+        """
+        Compact classes are created once and look like the model class.
+        """
+        cls = compact.compact_class(Place)
+        self.assertIs(compact.compact_class(Place), cls)
+        self.assertTrue(issubclass(cls, Place))
+        self.assertEqual(cls.__name__, "Place")
+        self.assertIn("price_by_night", cls.__slots__)
+        self.assertIn("id", compact.compact_class(User).__slots__)
+
+    def test_same_behavior(self):
+        """
+        A compact instance reads, prints and serializes
+        like an instance of the model class.
+        """
+        obj = compact.compact_class(Place)(**self.record)
+        copy = Place(**self.record)
+
+        self.assertEqual(obj.to_dict(), self.record)
+        self.assertEqual(obj.attributes(), copy.__dict__)
+        self.assertEqual(str(obj), "[Place] ({}) {}".format(
+            obj.id, obj.attributes()))
+        self.assertEqual(obj.max_guest, 0)
+        self.assertEqual(obj.amenity_ids, [])
+        self.assertIsInstance(obj.created_at, datetime)
+        self.assertFalse(hasattr(obj, "nickname"))
+
+    def test_dynamic_attributes(self):
+        """
+        Attributes that are not slots can be set and deleted.
+        """
+        obj = compact.compact_class(Place)(**self.record)
+        obj.nickname = "home"
+        obj.max_guest = "4"
+
+        self.assertEqual(obj.nickname, "home")
+        self.assertEqual(obj.to_dict()["nickname"], "home")
+        self.assertEqual(obj.to_dict()["max_guest"], "4")
+        self.assertIn("'nickname': 'home'", str(obj))
+        del obj.nickname
+        del obj.max_guest
+        self.assertFalse(hasattr(obj, "nickname"))
+        self.assertEqual(obj.max_guest, 0)
+
+    def test_pickle(self):
+        """
+        Compact instances can be pickled.
+        """
+        obj = compact.compact_class(Place)(**self.record)
+        obj.nickname = "home"
+        copy = pickle.loads(pickle.dumps(obj))
+
+        self.assertIs(type(copy), type(obj))
+        self.assertEqual(copy.to_dict(), obj.to_dict())
+
+    def test_build_shares_values(self):
+        """
+        build() interns foreign keys and shares equal timestamps.
+        """
+        self.record["updated_at"] = self.record["created_at"]
+        first = compact.build(Place, self.record)
+        second = compact.build(Place, dict(self.record,
+                                           city_id="".join("city")))
+
+        self.assertIs(first.city_id, second.city_id)
+        self.assertIs(first.updated_at, first.created_at)
+        self.assertIsInstance(first, Place)
+        self.assertEqual(first.to_dict(), self.record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Module testing the ColumnStore used by FileStorage
+"""
+
+import unittest
+from models.engine.columnar import ColumnStore
+
+
+class TestColumnStore(unittest.TestCase):
+    """
+    Test the ColumnStore class
+    """
+
+    def setUp(self):
+        """
+        Fill a store with a few places.
+        """
+        self.store = ColumnStore(["price_by_night"], ["city_id"])
+        self.store.add("a", {"price_by_night": 50, "city_id": "paris"})
+        self.store.add("b", {"price_by_night": "90", "city_id": "lyon"})
+        self.store.add("c", {"price_by_night": 100, "city_id": "paris"})
+        self.store.add("d", {"price_by_night": "n/a", "city_id": "lyon"})
+
+    def test_columns(self):
+        """
+        Numbers are stored as floats, foreign keys by code.
+        """
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.store.column("id"), ["a", "b", "c", "d"])
+        self.assertEqual(self.store.column("price_by_night")[:3].tolist(),
+                         [50.0, 90.0, 100.0])
+        self.assertEqual(self.store.column("city_id"),
+                         ["paris", "lyon", "paris", "lyon"])
+        self.assertEqual(self.store.values["city_id"], ["paris", "lyon"])
+        self.assertEqual(self.store.codes["city_id"].tolist(), [0, 1, 0, 1])
+
+    def test_aggregations(self):
+        """
+        Values that are not numbers are left out.
+        """
+        self.assertEqual(self.store.sum("price_by_night"), 240.0)
+        self.assertEqual(self.store.mean("price_by_night"), 80.0)
+        self.assertEqual(self.store.min("price_by_night"), 50.0)
+        self.assertEqual(self.store.max("price_by_night"), 100.0)
+
+    def test_group_by(self):
+        """
+        Counts, sums and means by foreign key value.
+        """
+        self.assertEqual(self.store.count_by("city_id"),
+                         {"paris": 2, "lyon": 2})
+        self.assertEqual(self.store.sum_by("price_by_night", "city_id"),
+                         {"paris": 150.0, "lyon": 90.0})
+        self.assertEqual(self.store.mean_by("price_by_night", "city_id"),
+                         {"paris": 75.0, "lyon": 90.0})
+
+    def test_empty(self):
+        """
+        An empty store has no mean, minimum or maximum.
+        """
+        store = ColumnStore(["price_by_night"], ["city_id"])
+        self.assertEqual(store.sum("price_by_night"), 0.0)
+        self.assertIsNone(store.mean("price_by_night"))
+        self.assertIsNone(store.min("price_by_night"))
+        self.assertEqual(store.count_by("city_id"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,375 @@
+#!/usr/bin/python3
+"""
+Module testing that every registered storage engine honours the
+Engine interface, and does so fast enough
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import datetime
+from models.engine import registry
+from models.engine.engine import Engine
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.user import User
+
+
+def make(cls, **attrs):
+    """
+    Returns a new object of a class, without adding it to any storage.
+    """
+    now = datetime.now().isoformat()
+    return cls(id=str(uuid.uuid4()), created_at=now, updated_at=now,
+               **attrs)
+
+
+class DictEngine(Engine):
+    """
+    An engine keeping the objects in a dictionary, with only the
+    methods Engine leaves to the engines, to test its defaults.
+    """
+
+    name = "dict"
+    persistent = False
+
+    def __init__(self):
+        """
+        Start without objects.
+        """
+        self.objects = {}
+
+    def configure(self, **options):
+        """
+        Accepts and ignores the options.
+        """
+
+    def get(self, cls, id):
+        """
+        Returns the object with the given class and id, or None.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.objects.get(name + "." + id)
+
+    def new(self, obj):
+        """
+        Adds or replaces an object.
+        """
+        self.objects[obj.__class__.__name__ + "." + obj.id] = obj
+
+    def delete(self, obj=None):
+        """
+        Removes an object, if any.
+        """
+        if obj is not None:
+            self.objects.pop(obj.__class__.__name__ + "." + obj.id, None)
+
+    def all(self, cls=None):
+        """
+        Returns the objects, or the objects of a class, by key.
+        """
+        if cls is None:
+            return self.objects
+        name = cls if isinstance(cls, str) else cls.__name__
+        return {key: obj for key, obj in self.objects.items()
+                if key.startswith(name + ".")}
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects, or of objects of a class.
+        """
+        return len(self.all(cls))
+
+    def save(self):
+        """
+        Does nothing, the objects are only kept in memory.
+        """
+
+    def reload(self):
+        """
+        Does nothing, nothing is written.
+        """
+
+    def clear(self):
+        """
+        Forgets the objects.
+        """
+        self.objects.clear()
+
+
+class EngineConformance:
+    """
+    The tests every engine must pass, run by a TestCase
+    subclass per registered engine, see engine_name.
+    """
+
+    engine_name = None
+    # Seconds allowed for the performance test
+    BUDGET = 10.0
+    OBJECTS = 2000
+
+    def setUp(self):
+        """
+        Create the engine on files in a temporary directory.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "store")
+        self.engine = self.create()
+        if isinstance(self.engine, FileStorage):
+            self.objects = dict(self.engine.all())
+            self.engine.clear()
+        self.engine.configure(file_path=self.path)
+        self.engine.reload()
+
+    def tearDown(self):
+        """
+        Close the engine, forget its objects and restore its defaults.
+        """
+        self.engine.close()
+        self.engine.clear()
+        if isinstance(self.engine, FileStorage):
+            for obj in self.objects.values():
+                self.engine.new(obj)
+            self.engine.configure(file_path="file.json",
+                                  **FileStorage.defaults())
+        else:
+            self.create()
+        shutil.rmtree(self.tmp)
+
+    def create(self):
+        """
+        Returns a new engine of the kind tested.
+        """
+        return registry.create(self.engine_name)
+
+    def restarted(self):
+        """
+        Returns a new engine of the same kind on the same files,
+        once the current one is closed and its memory dropped.
+        """
+        self.engine.close()
+        self.engine.clear()
+        engine = self.create()
+        engine.configure(file_path=self.path)
+        engine.reload()
+        return engine
+
+    def test_put_get(self):
+        """
+        An object put can be got back by class or class name.
+        """
+        user = make(User, email="a@b.c")
+        self.engine.put(user)
+        self.assertIs(self.engine.get(User, user.id), user)
+        self.assertIs(self.engine.get("User", user.id), user)
+        self.assertIsNone(self.engine.get(User, "missing"))
+        self.assertIsNone(self.engine.get(City, user.id))
+
+    def test_delete(self):
+        """
+        A deleted object is gone, before and after a flush.
+        """
+        user = make(User)
+        self.engine.put(user)
+        self.engine.flush()
+        self.engine.delete(user)
+        self.engine.delete(None)
+        self.assertIsNone(self.engine.get(User, user.id))
+        self.engine.flush()
+        self.assertIsNone(self.engine.get(User, user.id))
+        self.assertEqual(self.engine.count(User), 0)
+
+    def test_touch(self):
+        """
+        touch() marks a stored object as changed,
+        and does not add back a deleted one.
+        """
+        user = make(User)
+        gone = make(User)
+        for obj in (user, gone):
+            self.engine.put(obj)
+        self.engine.flush()
+        self.engine.delete(gone)
+        self.engine.flush()
+
+        user.first_name = "Betty"
+        self.engine.touch(user)
+        self.engine.touch(gone)
+        self.engine.flush()
+        self.assertIsNone(self.engine.get(User, gone.id))
+        self.assertEqual(self.engine.count(User), 1)
+        if self.engine.persistent:
+            engine = self.restarted()
+            self.assertEqual(engine.get(User, user.id).first_name, "Betty")
+            self.assertIsNone(engine.get(User, gone.id))
+            self.engine = engine
+
+    def test_scan_count(self):
+        """
+        scan() and count() see every object, or those of a class.
+        """
+        users = [make(User) for i in range(3)]
+        city = make(City, name="Paris")
+        for obj in users + [city]:
+            self.engine.put(obj)
+
+        self.assertEqual({u.id for u in self.engine.scan(User)},
+                         {u.id for u in users})
+        self.assertEqual([c.id for c in self.engine.scan("City")], [city.id])
+        self.assertEqual(len(list(self.engine.scan())), 4)
+        self.assertEqual(self.engine.count(User), 3)
+        self.assertEqual(self.engine.count(), 4)
+        self.assertEqual(self.engine.all(City), {"City." + city.id: city})
+
+    def test_find(self):
+        """
+        find() returns the objects of a class with the given
+        attribute values, following the objects put, changed
+        and deleted, and after a restart.
+        """
+        paris = make(City, name="Paris", state_id="fr")
+        lyon = make(City, name="Lyon", state_id="fr")
+        austin = make(City, name="Austin", state_id="tx")
+        user = make(User, first_name="Paris")
+        for obj in (paris, lyon, austin, user):
+            self.engine.put(obj)
+
+        self.assertEqual(set(self.engine.find(City, state_id="fr")),
+                         {"City." + paris.id, "City." + lyon.id})
+        self.assertEqual(self.engine.find("City", state_id="fr",
+                                          name="Lyon"),
+                         {"City." + lyon.id: lyon})
+        self.assertEqual(self.engine.find(City, name="Nowhere"), {})
+        self.assertEqual(self.engine.find(City, first_name="Paris"), {})
+
+        self.engine.flush()
+        self.engine.delete(lyon)
+        austin.state_id = "fr"
+        self.engine.put(austin)
+        self.engine.flush()
+        expected = {"City." + paris.id, "City." + austin.id}
+        self.assertEqual(set(self.engine.find(City, state_id="fr")),
+                         expected)
+        if self.engine.persistent:
+            engine = self.restarted()
+            self.assertEqual(set(engine.find(City, state_id="fr")),
+                             expected)
+            self.engine = engine
+
+    def test_add_index(self):
+        """
+        add_index() accepts the indexes the models declare, before
+        and after objects are stored and more than once, and find()
+        gives the same objects with them.
+        """
+        cities = [make(City, state_id=str(i % 3)) for i in range(9)]
+        place = make(Place, price_by_night=80, latitude=1.5,
+                     longitude=2.5)
+        self.engine.put(cities[0])
+        self.engine.add_index(City, "state_id")
+        self.engine.add_index("City", "state_id")
+        self.engine.add_index(Place, "price_by_night", "sorted")
+        self.engine.add_index(Place, ("latitude", "longitude"), "grid")
+        for obj in cities[1:] + [place]:
+            self.engine.put(obj)
+
+        self.assertEqual(set(self.engine.find(City, state_id="0")),
+                         {"City." + c.id for c in cities[::3]})
+        self.assertEqual(self.engine.find(Place, price_by_night=80),
+                         {"Place." + place.id: place})
+        self.assertEqual(self.engine.find(Place, latitude=1.5),
+                         {"Place." + place.id: place})
+
+    def test_flush_reload(self):
+        """
+        Flushed objects are read back after a restart,
+        with the same attributes, by a persistent engine.
+        """
+        if not self.engine.persistent:
+            self.skipTest("not a persistent engine")
+
+        place = make(Place, name="Loft", price_by_night=80,
+                     amenity_ids=["a"], rating=4.5)
+        gone = make(User)
+        for obj in (place, gone):
+            self.engine.put(obj)
+        self.engine.flush()
+        self.engine.delete(gone)
+        self.engine.flush()
+
+        engine = self.restarted()
+        got = engine.get(Place, place.id)
+        self.assertEqual(got.to_dict(), place.to_dict())
+        self.assertIsNone(engine.get(User, gone.id))
+        self.assertEqual(engine.count(), 1)
+        self.engine = engine
+
+    def test_performance(self):
+        """
+        Putting, flushing, getting, scanning and counting
+        a few thousand objects takes less than BUDGET seconds.
+        """
+        objs = [make(User, email=str(i)) for i in range(self.OBJECTS)]
+        start = time.perf_counter()
+        for obj in objs:
+            self.engine.put(obj)
+        self.engine.flush()
+        for obj in objs:
+            self.engine.get(User, obj.id)
+        self.assertEqual(len(list(self.engine.scan(User))), self.OBJECTS)
+        self.assertEqual(self.engine.count(User), self.OBJECTS)
+        for obj in objs[:100]:
+            obj.first_name = "Betty"
+            self.engine.put(obj)
+            self.engine.flush()
+        self.assertLess(time.perf_counter() - start, self.BUDGET)
+
+
+for _name in registry.names():
+    _test = type("Test{}Engine".format(_name.capitalize()),
+                 (EngineConformance, unittest.TestCase),
+                 {"engine_name": _name,
+                  "__doc__": "Test the {} engine".format(_name)})
+    globals()[_test.__name__] = _test
+del _name, _test
+
+
+class TestEngineDefaults(EngineConformance, unittest.TestCase):
+    """
+    Test the methods written in Engine, on an engine
+    with only the methods it leaves to the engines
+    """
+
+    def create(self):
+        """
+        Returns a new DictEngine.
+        """
+        return DictEngine()
+
+    def test_abstract(self):
+        """
+        Engine and engines missing one of its
+        abstract methods cannot be created.
+        """
+        partial = type("PartialEngine", (Engine,),
+                       {k: v for k, v in vars(DictEngine).items()
+                        if k != "count"})
+        for cls in (Engine, partial):
+            with self.assertRaises(TypeError):
+                cls()
+
+    def test_helpers(self):
+        """
+        _name() and _classes() are shared by the engines.
+        """
+        self.assertEqual(Engine._name(User), "User")
+        self.assertEqual(Engine._name("User"), "User")
+        self.assertIs(DictEngine()._classes(), registry.classes())
+
+
+if __name__ == "__main__":
+    unittest.main()
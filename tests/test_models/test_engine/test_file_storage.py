@@ -4,10 +4,17 @@ Module testing serialization and deserialization module
 & File_storage_class
 """
 
+import itertools
 import json
 import os
+import subprocess
+import sys
+import threading
 import unittest
+import zlib
+from unittest import mock
 from models.base_model import BaseModel
+from models.engine import registry, serializers
 from models.engine.file_storage import FileStorage
 from models.user import User
 from models.state import State
@@ -15,49 +22,14 @@ from models.city import City
 from models.amenity import Amenity
 from models.place import Place
 from models.review import Review
+from ..file_storage_case import FileStorageCase
 
 
-class TestFileStorage(unittest.TestCase):
+class TestFileStorage(FileStorageCase):
     """
     Test file storage Module
     """
 
-    def set_up(self):
-        """
-        Remove the "file.json" file if it exists before running each test case.
-
-        Example Usage:
-        test_obj = TestFileStorage()
-        test_obj.set_up()
-
-        Inputs: None
-
-        Flow:
-        1. Check if the "file.json" file exists.
-        2. If it exists, remove the file using the `os.remove()` function.
-
-        Outputs: None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tear_down(self):
-        """
-        Remove the "file.json" file if it exists before running each test case.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the "file.json" file exists.
-        2. If it exists, remove the file using the `os.remove()` function.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_private_attr(self):
         """
         Check the presence of private attributes in the FileStorage class.
@@ -250,9 +222,9 @@ class TestFileStorage(unittest.TestCase):
         file_obj.new(obj)
         file_obj.save()
 
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
-        with open("file.json", "r") as f:
+        with open(self.path, "r") as f:
             dict_objects = json.load(f)
 
             self.assertIsInstance(dict_objects, dict)
@@ -269,12 +241,12 @@ class TestFileStorage(unittest.TestCase):
         Example Usage:
         file_obj = FileStorage()
         try:
-            os.remove("file.json")
+            os.remove(self.path)
         except Exception:
             pass
-        with open("file.json", "w") as f:
+        with open(self.path, "w") as f:
             f.write("{}")
-        with open("file.json", "r") as r:
+        with open(self.path, "r") as r:
             for line in r:
                 assert line == "{}"
         assert file_obj.reload() == None
@@ -294,16 +266,1914 @@ class TestFileStorage(unittest.TestCase):
         """
         file_obj = FileStorage()
         try:
-            os.remove("file.json")
+            os.remove(self.path)
         except Exception:
             pass
-        with open("file.json", "w") as f:
+        with open(self.path, "w") as f:
             f.write("{}")
-        with open("file.json", "r") as r:
+        with open(self.path, "r") as r:
             for line in r:
                 self.assertEqual(line, "{}")
         self.assertIs(file_obj.reload(), None)
 
 
+class FileStorageTestCase(FileStorageCase):
+    """
+    Base class of the tests using a temporary storage file
+    """
+
+    def setUp(self):
+        """
+        Point the storage at a temporary directory,
+        enable the journal and start from an empty store.
+        """
+        super().setUp()
+        self.storage.configure(journal=True, compact_after=1000)
+
+    def reloaded(self):
+        """
+        Returns the objects found on disk after a fresh reload.
+        """
+        self.storage.clear()
+        self.storage.reload()
+        return self.storage.all()
+
+
+class TestFileStorageJournal(FileStorageTestCase):
+    """
+    Test the journal mode of FileStorage
+    """
+
+    def test_save_appends_to_journal(self):
+        """
+        Saving in journal mode appends one record per
+        changed object and leaves the JSON file alone.
+        """
+        obj = BaseModel()
+        obj.save()
+        user = User()
+        user.save()
+
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".journal", "r") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        objs = self.reloaded()
+        self.assertIn("BaseModel." + obj.id, objs)
+        self.assertIn("User." + user.id, objs)
+
+    def test_compaction(self):
+        """
+        The journal is folded into the JSON file once
+        it holds compact_after records.
+        """
+        self.storage.configure(compact_after=3)
+        for i in range(3):
+            BaseModel().save()
+
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        with open(self.path, "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+        self.assertEqual(len(self.reloaded()), 3)
+
+    def test_torn_journal_line(self):
+        """
+        A partially written last journal line is ignored.
+        """
+        obj = BaseModel()
+        obj.save()
+        with open(self.path + ".journal", "a") as f:
+            f.write('{"op": "put", "key": "BaseModel.x", "ob')
+
+        objs = self.reloaded()
+        self.assertEqual(list(objs), ["BaseModel." + obj.id])
+
+    def test_unknown_option(self):
+        """
+        configure() rejects unknown options.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.configure(no_such_option=True)
+
+
+class StorageBehaviour:
+    """
+    The behaviour FileStorage keeps whatever the layout of its
+    segments, the way it reads them and the way it writes them,
+    run on every supported combination of options by the
+    TestFileStorage<Layout><Load><Write>[Journal] classes below
+
+    Attributes:
+        options (dict): The options of the combination.
+    """
+
+    options = {}
+
+    def setUp(self):
+        """
+        Same as FileStorageTestCase, with the options of the combination.
+        """
+        super().setUp()
+        self.storage.configure(**self.options)
+
+    def tearDown(self):
+        """
+        Stop the writer thread and the worker processes.
+        """
+        self.storage.close()
+        super().tearDown()
+
+    def on_disk(self):
+        """
+        Returns the records in the storage files once written,
+        whatever their layout, without the journal.
+        """
+        self.storage.wait_durable()
+        serializer = serializers.FORMATS[self.storage.options()["format"]]
+        records = {}
+        for name in os.listdir(self.tmp):
+            if not name.endswith((".journal", ".lock")):
+                records.update(serializers.read(
+                    os.path.join(self.tmp, name), serializer))
+        return records
+
+    def test_save_and_reload(self):
+        """
+        Objects of several classes are read back unchanged.
+        """
+        user = User()
+        user.first_name = "Betty"
+        place = Place()
+        place.price_by_night = 90
+        place.amenity_ids = ["a", "b"]
+        state = State()
+        user.save()
+
+        objs = self.reloaded()
+        self.assertEqual(len(objs), 3)
+        for obj in (user, place, state):
+            got = objs["{}.{}".format(type(obj).__name__, obj.id)]
+            self.assertIs(type(got), type(obj))
+            self.assertEqual(got.to_dict(), obj.to_dict())
+
+    def test_update_and_delete(self):
+        """
+        Updates and deletes of objects read from disk are saved.
+        """
+        kept = User()
+        gone = User()
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        got = self.storage.get(User, kept.id)
+        got.first_name = "changed"
+        got.save()
+        self.storage.delete(self.storage.get(User, gone.id))
+        self.storage.save()
+
+        objs = self.reloaded()
+        self.assertEqual(objs["User." + kept.id].first_name, "changed")
+        self.assertNotIn("User." + gone.id, objs)
+
+    def test_compact(self):
+        """
+        compact() writes every object to the segment
+        files and removes the journal.
+        """
+        objs = [BaseModel() for i in range(8)]
+        for obj in objs:
+            obj.save()
+        self.storage.delete(objs.pop())
+        self.storage.compact()
+
+        self.assertEqual(set(self.on_disk()),
+                         {"BaseModel." + o.id for o in objs})
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        self.assertEqual(len(self.reloaded()), 7)
+
+    def test_changed_object_kept(self):
+        """
+        An object changed in memory before its segment
+        is read is kept, and saved.
+        """
+        user = User()
+        user.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        changed = User(**user.to_dict())
+        changed.first_name = "Betty"
+        self.storage.new(changed)
+        self.assertIs(self.storage.get(User, user.id), changed)
+        self.assertEqual(self.storage.count(User), 1)
+        changed.save()
+        self.assertEqual(self.reloaded()["User." + user.id].first_name,
+                         "Betty")
+
+    def test_queries(self):
+        """
+        count(), all(cls) and find() see the objects read from disk.
+        """
+        self.storage.add_index(City, "state_id")
+        cities = []
+        for state_id in ("ca", "ca", "ny"):
+            city = City()
+            city.state_id = state_id
+            cities.append(city)
+        User().save()
+        self.storage.clear()
+        self.storage.reload()
+
+        self.assertEqual(self.storage.count(City), 3)
+        self.assertEqual(set(self.storage.find(City, state_id="ca")),
+                         {"City." + c.id for c in cities[:2]})
+        self.assertEqual(len(self.storage.all(City)), 3)
+        self.assertEqual(self.storage.count(), 4)
+
+
+# The options of each layout, load path and write path tested
+# together. Worker processes are only used with several segments.
+LAYOUTS = {"Single": {}, "Partitioned": {"partitioned": True},
+           "Sharded": {"shards": 4}}
+LOADS = {"Eager": {}, "Lazy": {"lazy": True},
+         "Mmap": {"format": "binary", "mmap": True},
+         "Workers": {"workers": 2}}
+WRITES = {"Sync": {}, "Incremental": {"incremental": True},
+          "Stream": {"stream": True}, "Background": {"background": True}}
+JOURNALS = {"": {"journal": False},
+            "Journal": {"journal": True, "compact_after": 5}}
+
+for _layout, _load, _write, _journal in itertools.product(
+        LAYOUTS, LOADS, WRITES, JOURNALS):
+    if _load == "Workers" and _layout == "Single":
+        continue
+    _test = type("TestFileStorage" + _layout + _load + _write + _journal,
+                 (StorageBehaviour, FileStorageTestCase),
+                 {"options": dict(LAYOUTS[_layout], **LOADS[_load],
+                                  **WRITES[_write], **JOURNALS[_journal]),
+                  "__doc__": "Test FileStorage with the {} layout, {} "
+                  "load and {} write{}".format(
+                      _layout.lower(), _load.lower(), _write.lower(),
+                      ", with the journal" if _journal else "")})
+    globals()[_test.__name__] = _test
+del _layout, _load, _write, _journal, _test
+
+
+class TestFileStorageIncremental(FileStorageTestCase):
+    """
+    Test the incremental flush of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Turn incremental encoding on.
+        """
+        super().setUp()
+        self.storage.configure(incremental=True)
+
+    def test_same_output_as_json_dump(self):
+        """
+        The incremental encoding writes the same text as json.dump().
+        """
+        self.storage.configure(journal=False)
+        objs = [BaseModel(), User(), Place()]
+        objs[0].save()
+        with open(self.path, "r") as f:
+            text = f.read()
+        self.assertEqual(text, json.dumps(
+            {"{}.{}".format(type(o).__name__, o.id): o.to_dict()
+             for o in objs}))
+
+    def test_only_dirty_objects_encoded(self):
+        """
+        Clean objects are written from the cache
+        and changed ones are encoded again.
+        """
+        self.storage.configure(journal=False)
+        clean = BaseModel()
+        changed = BaseModel()
+        changed.save()
+
+        clean.name = "not saved"
+        changed.name = "saved"
+        changed.save()
+
+        objs = self.reloaded()
+        self.assertFalse(hasattr(objs["BaseModel." + clean.id], "name"))
+        self.assertEqual(objs["BaseModel." + changed.id].name, "saved")
+
+    def test_deleted_object_dropped(self):
+        """
+        Deleted objects leave the cache and the file.
+        """
+        self.storage.configure(journal=False)
+        obj = BaseModel()
+        obj.save()
+        self.storage.delete(obj)
+        self.storage.save()
+        self.assertEqual(self.reloaded(), {})
+
+
+class TestFileStorageLazy(FileStorageTestCase):
+    """
+    Test the lazy mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Turn lazy loading on.
+        """
+        super().setUp()
+        self.storage.configure(lazy=True)
+
+    def test_get_builds_one_object(self):
+        """
+        get() only builds the requested object.
+        """
+        self.storage.configure(journal=False)
+        user = User()
+        place = Place()
+        user.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        raw = FileStorage._FileStorage__raw
+        self.assertEqual(len(raw), 2)
+        found = self.storage.get(User, user.id)
+        self.assertIsInstance(found, User)
+        self.assertEqual(found.id, user.id)
+        self.assertIs(self.storage.get("User", user.id), found)
+        self.assertIn("Place." + place.id, raw)
+        self.assertIsNone(self.storage.get("User", "missing"))
+
+    def test_save_keeps_unbuilt_records(self):
+        """
+        Records that were never built are written back as they are.
+        """
+        self.storage.configure(journal=False)
+        user = User()
+        place = Place()
+        place.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        self.storage.get(User, user.id).save()
+        objs = self.reloaded()
+        self.assertIsInstance(objs["Place." + place.id], Place)
+        self.assertIsInstance(objs["User." + user.id], User)
+
+    def test_indexed_on_use(self):
+        """
+        reload() only keeps the records, which are indexed the
+        first time an index of their class is used, unbuilt.
+        """
+        self.storage.configure(journal=False)
+        self.storage.add_index(City, "state_id")
+        cities = [City() for i in range(4)]
+        for i, city in enumerate(cities):
+            city.state_id = "s{}".format(i % 2)
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        self.assertIn("City", FileStorage._FileStorage__unindexed)
+        self.assertEqual(len(self.storage.find(City, state_id="s0")), 2)
+        self.assertNotIn("City", FileStorage._FileStorage__unindexed)
+        self.assertEqual(len(FileStorage._FileStorage__raw), 2)
+        self.assertIn("City." + cities[1].id,
+                      self.storage.find(City, state_id="s1"))
+
+
+class TestFileStoragePartitioned(FileStorageTestCase):
+    """
+    Test the partitioned mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Store each class in its own file.
+        """
+        super().setUp()
+        self.storage.configure(partitioned=True)
+
+    def partition(self, name):
+        """
+        Returns the path of the file of a class.
+        """
+        return os.path.join(self.tmp, "file.{}.json".format(name))
+
+    def test_compaction(self):
+        """
+        The journal is folded into the class files once
+        it holds compact_after records.
+        """
+        self.storage.configure(compact_after=3)
+        for i in range(3):
+            BaseModel().save()
+
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        with open(self.partition("BaseModel"), "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+        self.assertEqual(len(self.reloaded()), 3)
+
+    def test_save_writes_changed_class_only(self):
+        """
+        Saving only rewrites the files of the changed classes.
+        """
+        self.storage.configure(journal=False)
+        user = User()
+        user.save()
+        self.assertTrue(os.path.exists(self.partition("User")))
+        self.assertFalse(os.path.exists(self.partition("Place")))
+
+        Place().save()
+        with open(self.partition("User"), "r") as f:
+            self.assertEqual(list(json.load(f)), ["User." + user.id])
+        with open(self.partition("Place"), "r") as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+    def test_class_file_read_on_demand(self):
+        """
+        all(cls) only reads the file of that class.
+        """
+        self.storage.configure(journal=False)
+        user = User()
+        place = Place()
+        user.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        users = self.storage.all(User)
+        self.assertEqual(list(users), ["User." + user.id])
+        self.assertNotIn("Place." + place.id, self.storage.all("User"))
+        self.assertEqual(FileStorage._FileStorage__loaded, {"User"})
+        self.assertIsNotNone(self.storage.get(Place, place.id))
+
+    def test_new_object_kept_on_late_read(self):
+        """
+        An object created before its class file is read is kept
+        and the objects already in the file are not lost.
+        """
+        self.storage.configure(journal=False)
+        first = User()
+        first.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        second = User()
+        second.save()
+        objs = self.reloaded()
+        self.assertIn("User." + first.id, objs)
+        self.assertIn("User." + second.id, objs)
+
+
+class TestFileStorageSharded(FileStorageTestCase):
+    """
+    Test the sharded mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Store the objects in four shard files.
+        """
+        super().setUp()
+        self.storage.configure(shards=4)
+
+    def shard(self, obj):
+        """
+        Returns the number of the shard of an object.
+        """
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        return zlib.crc32(key.encode()) % 4
+
+    def shard_path(self, shard):
+        """
+        Returns the path of the file of a shard.
+        """
+        return os.path.join(self.tmp, "file.{}.json".format(shard))
+
+    def read_shard(self, shard):
+        """
+        Returns the keys in the file of a shard.
+        """
+        with open(self.shard_path(shard), "r") as f:
+            return set(json.load(f))
+
+    def test_compaction(self):
+        """
+        The journal is folded into the shard files once
+        it holds compact_after records.
+        """
+        self.storage.configure(compact_after=3)
+        objs = []
+        for i in range(3):
+            obj = BaseModel()
+            obj.save()
+            objs.append(obj)
+
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        for obj in objs:
+            self.assertIn("BaseModel." + obj.id,
+                          self.read_shard(self.shard(obj)))
+        self.assertEqual(len(self.reloaded()), 3)
+
+    def test_save_writes_changed_shard_only(self):
+        """
+        Saving only rewrites the shards of the changed objects.
+        """
+        self.storage.configure(journal=False)
+        reviews = [Review() for i in range(40)]
+        self.storage.save()
+        stamps = {n: os.stat(self.shard_path(n)).st_mtime_ns
+                  for n in range(4)}
+
+        review = reviews[0]
+        review.text = "changed"
+        with mock.patch.object(serializers, "write",
+                               wraps=serializers.write) as write:
+            review.save()
+        self.assertEqual([c.args[0] for c in write.call_args_list],
+                         [self.shard_path(self.shard(review))])
+        for n in range(4):
+            if n != self.shard(review):
+                self.assertEqual(os.stat(self.shard_path(n)).st_mtime_ns,
+                                 stamps[n])
+        self.assertEqual(
+            sum(len(self.read_shard(n)) for n in range(4)), 40)
+
+    def test_get_reads_one_shard(self):
+        """
+        get() only reads the shard of the object, all(cls)
+        and count() read every shard.
+        """
+        self.storage.configure(journal=False)
+        users = [User() for i in range(10)]
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        user = users[0]
+        self.assertEqual(self.storage.get(User, user.id).id, user.id)
+        self.assertEqual(FileStorage._FileStorage__loaded,
+                         {self.shard(user)})
+        self.assertEqual(len(self.storage.all(User)), 10)
+        self.assertEqual(FileStorage._FileStorage__loaded, {0, 1, 2, 3})
+        self.assertEqual(self.storage.count(), 10)
+
+    def test_delete_rewrites_shard(self):
+        """
+        A deleted object is removed from the file of its shard.
+        """
+        self.storage.configure(journal=False)
+        gone = User()
+        kept = User()
+        self.storage.save()
+        self.storage.delete(gone)
+        self.storage.save()
+
+        self.assertNotIn("User." + gone.id, self.read_shard(self.shard(gone)))
+        objs = self.reloaded()
+        self.assertNotIn("User." + gone.id, objs)
+        self.assertIn("User." + kept.id, objs)
+
+    def test_reshard(self):
+        """
+        reshard() moves every object stored to the files of the
+        new layout, fewer or more shards, one file per class or
+        the single file, and removes the files no longer used.
+        """
+        self.storage.configure(journal=False)
+        keys = {"User." + User().id for i in range(50)}
+        keys |= {"Place." + Place().id for i in range(10)}
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        classes = registry.classes()
+
+        for layout, files in (
+                ({"shards": 2}, ["file.0.json", "file.1.json"]),
+                ({"shards": 8}, ["file.{}.json".format(n)
+                                 for n in range(8)]),
+                ({"partitioned": True}, ["file.{}.json".format(name)
+                                         for name in sorted(classes)]),
+                ({}, ["file.json"]),
+                ({"shards": 4}, ["file.{}.json".format(n)
+                                 for n in range(4)])):
+            with self.subTest(**layout):
+                self.storage.reshard(**layout)
+                self.assertEqual(sorted(os.listdir(self.tmp)), files)
+                self.storage.clear()
+                self.storage.reload()
+                self.assertEqual(set(self.storage.all()), keys)
+                self.assertEqual(self.storage.options()["shards"],
+                                 layout.get("shards", 0))
+                self.storage.clear()
+
+        with self.assertRaises(ValueError):
+            self.storage.reshard(partitioned=True, shards=2)
+
+    def test_invalid_shards(self):
+        """
+        configure() rejects negative shards, and
+        shards in partitioned mode.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.configure(shards=-1)
+        with self.assertRaises(ValueError):
+            self.storage.configure(partitioned=True)
+
+
+class TestFileStorageWorkers(FileStorageTestCase):
+    """
+    Test the worker processes building the objects of several segments
+    """
+
+    def setUp(self):
+        """
+        Four shards without the journal, read by two worker processes.
+        """
+        super().setUp()
+        self.storage.configure(journal=False, shards=4, workers=2)
+
+    def saved(self):
+        """
+        Saves a state with cities and users, and forgets them.
+        """
+        state = State()
+        state.name = "California"
+        cities = []
+        for i in range(10):
+            city = City()
+            city.name = "City {}".format(i)
+            city.state_id = state.id
+            cities.append(city)
+        users = [User() for i in range(10)]
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        return state, cities, users
+
+    def test_objects_built_by_workers(self):
+        """
+        The objects built by the workers are the ones saved.
+        """
+        state, cities, users = self.saved()
+        objs = self.storage.all()
+        self.assertEqual(len(objs), 21)
+        self.assertTrue(FileStorage._FileStorage__loader.pool)
+        for obj in [state] + cities + users:
+            got = objs["{}.{}".format(type(obj).__name__, obj.id)]
+            self.assertIs(type(got), type(obj))
+            self.assertEqual(got.to_dict(), obj.to_dict())
+
+    def test_indexed_on_use(self):
+        """
+        The objects are indexed the first time an index is used.
+        """
+        self.storage.add_index(City, "state_id")
+        state, cities, users = self.saved()
+        self.assertEqual(self.storage.count(City), 10)
+        self.assertIn("City", FileStorage._FileStorage__unindexed)
+        found = self.storage.find(City, state_id=state.id)
+        self.assertEqual(set(found), {"City." + c.id for c in cities})
+        self.assertNotIn("City", FileStorage._FileStorage__unindexed)
+
+    def test_changed_object_kept(self):
+        """
+        An object changed before the files are read is kept.
+        """
+        state, cities, users = self.saved()
+        record = users[0].to_dict()
+        record["first_name"] = "Betty"
+        user = User(**record)
+        self.storage.new(user)
+        self.storage.all()
+        self.assertIs(self.storage.get(User, user.id), user)
+        self.assertEqual(self.storage.count(User), 10)
+
+    def test_partitioned_compact(self):
+        """
+        The workers read the class files in partitioned mode, and
+        build compact objects with the compact option.
+        """
+        self.storage.configure(shards=0, partitioned=True, compact=True)
+        state, cities, users = self.saved()
+        got = self.storage.all(City)["City." + cities[0].id]
+        self.assertIsInstance(got, City)
+        self.assertEqual(got.to_dict(), cities[0].to_dict())
+        self.assertEqual(self.storage.count(), 21)
+
+    def test_close_stops_workers(self):
+        """
+        close() stops the worker processes, and a negative number
+        of workers, or workers without the fork start method,
+        are rejected.
+        """
+        self.saved()
+        self.storage.all()
+        self.storage.close()
+        self.assertIsNone(FileStorage._FileStorage__loader.pool)
+        with self.assertRaises(ValueError):
+            self.storage.configure(workers=-1)
+        with mock.patch("multiprocessing.get_all_start_methods",
+                        return_value=["spawn"]):
+            with self.assertRaises(ValueError):
+                self.storage.configure(workers=4)
+
+    def test_import_with_workers(self):
+        """
+        Importing models with workers and a full load at startup
+        does not wait forever for the worker processes, which
+        then build the objects read after a clear().
+        """
+        self.storage.configure(shards=8, journal=True)
+        self.saved()
+        self.storage.compact()
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, HBNB_TYPE_STORAGE="file", HBNB_FS_SHARDS="8",
+                   HBNB_FS_WORKERS="2", HBNB_FS_JOURNAL="1",
+                   PYTHONPATH=root)
+        script = ("from models import storage\n"
+                  "print(storage.count())\n"
+                  "storage.clear()\n"
+                  "print(storage.count())\n"
+                  "storage.close()\n")
+        out = subprocess.run([sys.executable, "-c", script], cwd=self.tmp,
+                             env=env, capture_output=True, text=True,
+                             timeout=60)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.split(), ["21", "21"])
+
+
+class TestFileStorageClassIndex(FileStorageTestCase):
+    """
+    Test the per-class index behind all(cls) and count(cls)
+    """
+
+    def test_all_and_count_by_class(self):
+        """
+        all(cls) and count(cls) only see the objects of that class.
+        """
+        users = [User() for i in range(3)]
+        place = Place()
+
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(User), 3)
+        self.assertEqual(self.storage.count("Place"), 1)
+        self.assertEqual(self.storage.count("Review"), 0)
+        self.assertEqual(set(self.storage.all(User).values()), set(users))
+        self.assertEqual(self.storage.all("Place"),
+                         {"Place." + place.id: place})
+
+    def test_index_follows_delete_and_reload(self):
+        """
+        The index is updated on delete and on reload.
+        """
+        self.storage.configure(journal=False)
+        user = User()
+        gone = User()
+        user.save()
+        self.storage.delete(gone)
+        self.assertEqual(self.storage.count(User), 1)
+
+        self.storage.save()
+        self.storage.clear()
+        self.assertEqual(FileStorage._FileStorage__by_class, {})
+        self.storage.reload()
+        self.assertEqual(list(self.storage.all(User)), ["User." + user.id])
+
+    def test_count_does_not_build_lazy_records(self):
+        """
+        count() does not build objects in lazy mode.
+        """
+        self.storage.configure(journal=False, lazy=True)
+        User().save()
+        self.storage.clear()
+        self.storage.reload()
+
+        self.assertEqual(self.storage.count(User), 1)
+        self.assertEqual(len(FileStorage._FileStorage__raw), 1)
+        self.assertEqual(len(self.storage.all(User)), 1)
+        self.assertEqual(len(FileStorage._FileStorage__raw), 0)
+
+
+class TestFileStorageFind(FileStorageTestCase):
+    """
+    Test the attribute indexes behind find()
+    """
+
+    def test_find_indexed(self):
+        """
+        find() returns the objects with the indexed value.
+        """
+        state = State()
+        cities = [City(state_id=state.id, id=str(i)) for i in range(3)]
+        for city in cities:
+            self.storage.new(city)
+        City(state_id="other", id="x").save()
+
+        found = self.storage.find(City, state_id=state.id)
+        self.assertEqual(set(found.values()), set(cities))
+        self.assertEqual(self.storage.find("City", state_id="none"), {})
+
+    def test_find_follows_updates(self):
+        """
+        The index follows saved updates and deletes.
+        """
+        place = Place()
+        review = Review(id="r", place_id=place.id)
+        self.storage.new(review)
+        review.place_id = "elsewhere"
+        review.save()
+
+        self.assertEqual(self.storage.find(Review, place_id=place.id), {})
+        self.assertEqual(list(self.storage.find(Review,
+                                                place_id="elsewhere")),
+                         ["Review.r"])
+        self.storage.delete(review)
+        self.assertEqual(self.storage.find(Review, place_id="elsewhere"),
+                         {})
+
+    def test_find_mixed_attributes(self):
+        """
+        Attributes without an index are checked on the
+        objects found through the index.
+        """
+        for i in range(4):
+            self.storage.new(Review(id=str(i), place_id="p",
+                                    user_id="u", text=str(i % 2)))
+
+        found = self.storage.find(Review, place_id="p", text="1")
+        self.assertEqual(sorted(found), ["Review.1", "Review.3"])
+        found = self.storage.find(Review, text="0")
+        self.assertEqual(sorted(found), ["Review.0", "Review.2"])
+
+    def test_find_lazy_reload(self):
+        """
+        Lazy records are indexed without being built.
+        """
+        self.storage.configure(journal=False, lazy=True)
+        city = City()
+        city.state_id = "s"
+        city.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        self.assertEqual(len(FileStorage._FileStorage__raw), 1)
+        found = self.storage.find(City, state_id="s")
+        self.assertEqual(list(found), ["City." + city.id])
+
+
+class TestFileStorageSearch(FileStorageTestCase):
+    """
+    Test the range queries of search()
+    """
+
+    def setUp(self):
+        """
+        Store a few places with different prices and sizes.
+        """
+        super().setUp()
+        self.places = {}
+        for name, price, guests in (("a", 50, 2), ("b", 90, 4),
+                                    ("c", 150, 6), ("d", "75", 5)):
+            place = Place(id=name, price_by_night=price, max_guest=guests)
+            self.storage.new(place)
+            self.places[name] = place
+
+    def names(self, places):
+        """
+        Returns the ids of a list of places.
+        """
+        return [place.id for place in places]
+
+    def test_search_with_indexes(self):
+        """
+        Ranges and ordering are served by the sorted indexes.
+        """
+        self.assertEqual(self.names(self.storage.search(
+            Place, price_by_night=(None, 100), max_guest=(4, None),
+            order_by="price_by_night")), ["d", "b"])
+        self.assertEqual(self.names(self.storage.search(
+            Place, order_by="price_by_night", limit=2)), ["a", "d"])
+        self.assertEqual(self.names(self.storage.search(
+            Place, order_by="max_guest", reverse=True, limit=1)), ["c"])
+
+    def test_search_without_indexes(self):
+        """
+        Attributes without a sorted index are checked on every object.
+        """
+        self.storage.new(Place(id="e", number_rooms=3))
+        self.assertEqual(self.names(self.storage.search(
+            Place, latitude=(1, None))), [])
+        self.assertEqual(self.names(self.storage.search(
+            Place, number_rooms=(2, 3))), ["e"])
+        self.assertEqual(sorted(self.names(self.storage.search(
+            Place, price_by_night=(60, None)))), ["b", "c", "d"])
+
+    def test_search_follows_updates(self):
+        """
+        Saved updates move objects in the sorted indexes.
+        """
+        place = self.places["c"]
+        place.price_by_night = "10"
+        place.save()
+        self.assertEqual(self.names(self.storage.search(
+            Place, order_by="price_by_night", limit=1)), ["c"])
+        self.storage.delete(place)
+        self.assertEqual(self.names(self.storage.search(
+            Place, order_by="price_by_night", limit=1)), ["a"])
+
+    def test_unknown_index_kind(self):
+        """
+        add_index() rejects unknown kinds of index.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.add_index(Place, "latitude", "btree")
+
+
+class TestFileStorageGeo(FileStorageTestCase):
+    """
+    Test the geospatial queries of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Store a few places, with and without a grid index.
+        """
+        super().setUp()
+        for id, lat, lon in (("paris", 48.8566, 2.3522),
+                             ("versailles", "48.8049", "2.1204"),
+                             ("london", 51.5074, -0.1278)):
+            self.storage.new(Place(id=id, latitude=lat, longitude=lon))
+            self.storage.new(Review(id=id, latitude=lat, longitude=lon))
+
+    def test_within_radius(self):
+        """
+        within_radius() returns the objects nearest first,
+        with or without a grid index.
+        """
+        for cls in (Place, Review):
+            found = self.storage.within_radius(cls, 48.85, 2.35, 30)
+            self.assertEqual([o.id for o in found], ["paris", "versailles"])
+            self.assertIsInstance(found[0], cls)
+
+    def test_within_box(self):
+        """
+        within_box() returns the objects in the box.
+        """
+        for cls in (Place, Review):
+            found = self.storage.within_box(cls, 50, -1, 52, 0)
+            self.assertEqual([o.id for o in found], ["london"])
+
+    def test_moved_place(self):
+        """
+        Saved positions move objects in the grid.
+        """
+        place = self.storage.get(Place, "london")
+        place.latitude, place.longitude = 48.86, 2.35
+        place.save()
+        found = self.storage.within_radius(Place, 48.85, 2.35, 5)
+        self.assertEqual([o.id for o in found], ["paris", "london"])
+
+
+class TestFileStorageCompact(FileStorageTestCase):
+    """
+    Test the compact mode of FileStorage
+    """
+
+    def test_reload_compact(self):
+        """
+        Objects read in compact mode keep their attributes.
+        """
+        self.storage.configure(journal=False, compact=True)
+        place = Place()
+        place.name = "Cozy"
+        place.city_id = "city"
+        place.save()
+        objs = self.reloaded()
+
+        copy = objs["Place." + place.id]
+        self.assertIsInstance(copy, Place)
+        self.assertEqual(copy.to_dict(), place.to_dict())
+        copy.nickname = "home"
+        copy.save()
+        self.assertEqual(self.reloaded()["Place." + place.id].nickname,
+                         "home")
+
+
+class TestFileStorageColumns(FileStorageTestCase):
+    """
+    Test the columns of a class returned by columns()
+    """
+
+    def setUp(self):
+        """
+        Store a few places in two cities.
+        """
+        super().setUp()
+        for name, price, city in (("a", 50, "paris"), ("b", 90, "lyon"),
+                                  ("c", 100, "paris")):
+            place = Place(id=name, price_by_night=price)
+            place.city_id = city
+            self.storage.new(place)
+
+    def test_columns(self):
+        """
+        The numeric attributes and foreign keys of the class are columns.
+        """
+        places = self.storage.columns(Place)
+        self.assertEqual(len(places), 3)
+        self.assertIn("latitude", places.numbers)
+        self.assertIn("user_id", places.codes)
+        self.assertNotIn("name", places.numbers)
+        self.assertEqual(places.mean("price_by_night"), 80.0)
+        self.assertEqual(places.count_by("city_id"), {"paris": 2, "lyon": 1})
+        self.assertEqual(places.mean_by("price_by_night", "city_id"),
+                         {"paris": 75.0, "lyon": 90.0})
+
+    def test_columns_cached(self):
+        """
+        The columns are reused until a place changes.
+        """
+        places = self.storage.columns("Place")
+        self.assertIs(self.storage.columns(Place), places)
+
+        place = self.storage.get(Place, "b")
+        place.price_by_night = 110
+        place.save()
+        self.assertIsNot(self.storage.columns(Place), places)
+        self.assertEqual(self.storage.columns(Place).mean("price_by_night"),
+                         self.storage.columns(Place).sum("price_by_night") / 3)
+
+        self.storage.delete(place)
+        self.assertEqual(len(self.storage.columns(Place)), 2)
+
+    def test_columns_lazy(self):
+        """
+        In lazy mode the columns are read without building the places.
+        """
+        self.storage.configure(journal=False, lazy=True)
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        places = self.storage.columns(Place)
+        self.assertEqual(places.sum("price_by_night"), 240.0)
+        self.assertEqual(places.count_by("user_id"), {"": 3})
+        self.assertEqual(len(FileStorage._FileStorage__raw), 3)
+
+
+class TestFileStorageBinary(FileStorageTestCase):
+    """
+    Test the binary format of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Write binary snapshots, without the journal.
+        """
+        super().setUp()
+        self.storage.configure(journal=False, format="binary")
+        self.snapshot = os.path.join(self.tmp, "file.bin")
+
+    def test_save_and_reload(self):
+        """
+        Objects are written to file.bin and read back unchanged.
+        """
+        place = Place()
+        place.price_by_night = 90
+        place.amenity_ids = ["a", "b"]
+        user = User()
+        user.save()
+
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.snapshot, "rb") as f:
+            self.assertEqual(f.read(9), b"HBNBSNAP\x01")
+
+        objs = self.reloaded()
+        self.assertEqual(objs["Place." + place.id].to_dict(),
+                         place.to_dict())
+        self.assertEqual(objs["User." + user.id].created_at,
+                         user.created_at)
+
+    def test_incremental_and_partitioned(self):
+        """
+        Incremental encoding and class files work with snapshots.
+        """
+        self.storage.configure(incremental=True, partitioned=True)
+        place = Place()
+        place.save()
+        User().save()
+        place.name = "Loft"
+        place.save()
+
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tmp, "file.Place.bin")))
+        self.assertEqual(self.reloaded()["Place." + place.id].name, "Loft")
+
+    def test_lazy_records_to_json(self):
+        """
+        Records read lazily or mapped from a snapshot
+        can be written as JSON.
+        """
+        obj = BaseModel()
+        for mmap in (False, True):
+            with self.subTest(mmap=mmap):
+                self.storage.configure(format="binary", mmap=mmap)
+                obj.save()
+                self.storage.configure(lazy=True)
+                self.storage.clear()
+                self.storage.reload()
+                self.storage.configure(format="json")
+                self.storage.compact()
+
+                with open(self.path, "r") as f:
+                    self.assertEqual(json.load(f), {"BaseModel." + obj.id:
+                                                    obj.to_dict()})
+                self.storage.configure(lazy=False)
+                os.remove(self.path)
+
+    def test_unknown_format(self):
+        """
+        configure() rejects unknown formats.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.configure(format="xml")
+
+
+class TestFileStorageMmap(FileStorageTestCase):
+    """
+    Test the mmap mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Write binary snapshots, without the journal, and map them.
+        """
+        super().setUp()
+        self.storage.configure(journal=False, format="binary", mmap=True)
+
+    def test_records_decoded_on_access(self):
+        """
+        Reloading only reads the index, get() decodes one record.
+        """
+        users = [User() for i in range(3)]
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        raw = FileStorage._FileStorage__raw
+        self.assertEqual(len(raw), 3)
+        self.assertTrue(all(isinstance(r, tuple) for r in raw.values()))
+        self.assertEqual(self.storage.count(User), 3)
+
+        found = self.storage.get(User, users[1].id)
+        self.assertEqual(found.to_dict(), users[1].to_dict())
+        self.assertEqual(len(raw), 2)
+
+    def test_indexes_built_on_use(self):
+        """
+        Mapped records are indexed the first time an index is used.
+        """
+        self.storage.add_index(City, "state_id")
+        city = City()
+        city.state_id = "ca"
+        City().save()
+        self.storage.clear()
+        self.storage.reload()
+
+        self.assertIn("City", FileStorage._FileStorage__unindexed)
+        self.assertEqual(list(self.storage.find(City, state_id="ca")),
+                         ["City." + city.id])
+        self.assertNotIn("City", FileStorage._FileStorage__unindexed)
+
+    def test_save_keeps_mapped_records(self):
+        """
+        Saving rewrites the snapshot while records are still mapped.
+        """
+        users = [User() for i in range(3)]
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+
+        changed = self.storage.get(User, users[0].id)
+        changed.first_name = "Betty"
+        changed.save()
+        changed.save()
+        self.assertEqual(self.storage.get(User, users[2].id).to_dict(),
+                         users[2].to_dict())
+
+        objs = self.reloaded()
+        self.assertEqual(len(objs), 3)
+        self.assertEqual(objs["User." + users[0].id].first_name, "Betty")
+
+
+class TestFileStorageStream(FileStorageTestCase):
+    """
+    Test the stream mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Read and write the files record by record.
+        """
+        super().setUp()
+        self.storage.configure(stream=True)
+
+    def test_reload_indented_file(self):
+        """
+        Files written by hand or by other tools are read too.
+        """
+        user = User()
+        with open(self.path, "w") as f:
+            json.dump({"User." + user.id: user.to_dict()}, f, indent=4)
+
+        objs = self.reloaded()
+        self.assertEqual(objs["User." + user.id].to_dict(), user.to_dict())
+
+    def test_write_same_output(self):
+        """
+        Files are written one object at a time, with the same
+        contents as json.dump(), whatever the buffer size.
+        """
+        self.storage.configure(journal=False)
+        objs = [BaseModel(), User(), Place()]
+
+        for options in ({}, {"write_buffer": 1 << 20},
+                        {"incremental": True}):
+            self.storage.configure(**options)
+            objs[0].save()
+            with open(self.path, "r") as f:
+                self.assertEqual(f.read(), json.dumps(
+                    {"{}.{}".format(type(o).__name__, o.id): o.to_dict()
+                     for o in objs}))
+
+    def test_write_binary(self):
+        """
+        Binary snapshots are written one object at a time too.
+        """
+        self.storage.configure(journal=False, format="binary")
+        User().save()
+        snapshot = os.path.join(self.tmp, "file.bin")
+        with open(snapshot, "rb") as f:
+            streamed = f.read()
+
+        self.storage.configure(stream=False)
+        self.storage.save()
+        with open(snapshot, "rb") as f:
+            self.assertEqual(f.read(), streamed)
+
+    def test_reload_binary(self):
+        """
+        Binary snapshots are read record by record too.
+        """
+        self.storage.configure(journal=False, format="binary")
+        users = [User(), User()]
+        users[0].save()
+
+        objs = self.reloaded()
+        self.assertEqual(len(objs), 2)
+        self.assertEqual(objs["User." + users[1].id].to_dict(),
+                         users[1].to_dict())
+
+
+class TestFileStorageDurability(FileStorageTestCase):
+    """
+    Test the atomic saves and the fsync policies of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Save without the journal.
+        """
+        super().setUp()
+        self.storage.configure(journal=False)
+
+    def test_failed_save_keeps_file(self):
+        """
+        A save failing halfway leaves the previous file as it was.
+        """
+        User().save()
+        with open(self.path, "r") as f:
+            before = f.read()
+
+        for stream in (False, True):
+            self.storage.configure(stream=stream)
+            broken = BaseModel()
+            broken.callback = object()
+            with self.assertRaises(TypeError):
+                broken.save()
+            self.storage.delete(broken)
+
+            with open(self.path, "r") as f:
+                self.assertEqual(f.read(), before)
+            self.assertEqual(os.listdir(self.tmp), ["file.json"])
+
+    def test_fsync_policies(self):
+        """
+        Saves wait for the disk always, never, or once per interval.
+        """
+        obj = BaseModel()
+        with mock.patch("os.fsync") as fsync:
+            obj.save()
+            self.assertTrue(fsync.called)
+
+            fsync.reset_mock()
+            self.storage.configure(fsync="never")
+            obj.save()
+            self.assertFalse(fsync.called)
+
+            FileStorage._FileStorage__durability.synced_at = float("-inf")
+            self.storage.configure(fsync=60000)
+            obj.save()
+            self.assertTrue(fsync.called)
+            fsync.reset_mock()
+            obj.save()
+            self.assertFalse(fsync.called)
+
+            self.storage.sync()
+            self.assertTrue(fsync.called)
+
+    def test_fsync_journal(self):
+        """
+        Journal appends follow the fsync policy too.
+        """
+        self.storage.configure(journal=True)
+        with mock.patch("os.fsync") as fsync:
+            BaseModel().save()
+            self.assertTrue(fsync.called)
+
+    def test_unknown_fsync_policy(self):
+        """
+        configure() rejects unknown fsync policies.
+        """
+        with self.assertRaises(ValueError):
+            self.storage.configure(fsync="sometimes")
+
+
+class TestFileStorageGroupCommit(FileStorageTestCase):
+    """
+    Test the batches and the commit window of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Save without the journal, counting the writes.
+        """
+        super().setUp()
+        self.storage.configure(journal=False)
+        patcher = mock.patch.object(serializers, "write",
+                                    wraps=serializers.write)
+        self.write = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch(self):
+        """
+        The saves of a batch are written once, at its end.
+        """
+        with self.storage.batch():
+            users = [User() for i in range(10)]
+            for user in users:
+                user.save()
+            with self.storage.batch():
+                BaseModel().save()
+            self.assertFalse(self.write.called)
+            self.assertFalse(os.path.exists(self.path))
+
+        self.assertEqual(self.write.call_count, 1)
+        self.assertEqual(len(self.reloaded()), 11)
+
+    def test_batch_flush(self):
+        """
+        flush() writes at once inside a batch too.
+        """
+        with self.storage.batch():
+            User().save()
+            self.storage.flush()
+            self.assertEqual(len(self.reloaded()), 1)
+
+    def test_commit_window(self):
+        """
+        Saves within the window after a write are written together.
+        """
+        self.storage.configure(commit_window=60000)
+        FileStorage._FileStorage__written_at = float("-inf")
+        User().save()
+        for i in range(5):
+            User().save()
+        self.assertEqual(self.write.call_count, 1)
+
+        self.storage.flush()
+        self.assertEqual(self.write.call_count, 2)
+        self.assertEqual(len(self.reloaded()), 6)
+
+        FileStorage._FileStorage__written_at = float("-inf")
+        User().save()
+        self.assertEqual(self.write.call_count, 3)
+
+
+class TestFileStorageBackground(FileStorageTestCase):
+    """
+    Test the writer thread of the background mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Save without the journal, in the writer thread.
+        """
+        super().setUp()
+        self.storage.configure(journal=False, background=True)
+
+    def tearDown(self):
+        """
+        Stop the writer thread.
+        """
+        self.storage.close()
+        super().tearDown()
+
+    def blocked(self):
+        """
+        Returns an event holding the writer thread
+        before each file it writes until it is set.
+        """
+        release = threading.Event()
+        dump = serializers.dump
+
+        def wait_then_dump(*args, **kwargs):
+            release.wait(10)
+            return dump(*args, **kwargs)
+
+        patcher = mock.patch.object(serializers, "dump",
+                                    side_effect=wait_then_dump)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(release.set)
+        return release
+
+    def test_partitioned_segments(self):
+        """
+        Each class file written by the writer thread holds the
+        objects of its class only, in partitioned and sharded modes.
+        """
+        for options in ({"partitioned": True}, {"shards": 4}):
+            with self.subTest(**options):
+                self.storage.close()
+                self.storage.clear()
+                self.storage.configure(background=False, **options)
+                users = [User(), User()]
+                city = City()
+                self.storage.save()
+                self.storage.clear()
+                self.storage.reload()
+
+                self.storage.configure(background=True)
+                got = self.storage.get(City, city.id)
+                got.name = "Paris"
+                got.save()
+                got = self.storage.get(User, users[0].id)
+                got.first_name = "Betty"
+                got.save()
+                self.storage.wait_durable()
+
+                objs = self.reloaded()
+                self.assertEqual(set(objs), {"User." + users[0].id,
+                                             "User." + users[1].id,
+                                             "City." + city.id})
+                self.assertEqual(objs["City." + city.id].name, "Paris")
+                if "partitioned" in options:
+                    with open(os.path.join(self.tmp, "file.User.json")) as f:
+                        self.assertEqual(set(json.load(f)),
+                                         {"User." + u.id for u in users})
+                self.storage.configure(partitioned=False, shards=0)
+                for name in os.listdir(self.tmp):
+                    os.remove(os.path.join(self.tmp, name))
+
+    def test_save_does_not_wait(self):
+        """
+        save() returns before the file is written,
+        wait_durable() once it is.
+        """
+        release = self.blocked()
+        user = User()
+        user.save()
+        self.assertFalse(os.path.exists(self.path))
+
+        release.set()
+        self.storage.wait_durable()
+        self.assertIn("User." + user.id, self.reloaded())
+
+    def test_saved_state(self):
+        """
+        The objects are written as they were when saved,
+        not as they are when the writer thread gets to them.
+        """
+        release = self.blocked()
+        user = User()
+        user.first_name = "saved"
+        user.save()
+        user.first_name = "not saved"
+
+        release.set()
+        self.storage.wait_durable()
+        with open(self.path, "r") as f:
+            record = json.load(f)["User." + user.id]
+        self.assertEqual(record["first_name"], "saved")
+
+    def test_saves_in_order(self):
+        """
+        The last save wins, journal records are appended in order
+        and the journal is removed after the compaction.
+        """
+        user = User()
+        for i in range(5):
+            user.first_name = str(i)
+            user.save()
+        self.storage.wait_durable()
+        self.assertEqual(self.reloaded()["User." + user.id].first_name, "4")
+
+        self.storage.configure(journal=True, compact_after=4)
+        for i in range(3):
+            BaseModel().save()
+        self.storage.delete(self.storage.get(User, user.id))
+        self.storage.save()
+        self.storage.wait_durable()
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        objs = self.reloaded()
+        self.assertEqual(len(objs), 3)
+        self.assertNotIn("User." + user.id, objs)
+
+    def test_changed_objects_only(self):
+        """
+        Once a file is written, the next saves only encode the
+        objects changed since and the thread writes them with the
+        objects it already has.
+        """
+        users = [User() for i in range(5)]
+        self.storage.save()
+        writer = FileStorage._FileStorage__writer
+        layout = FileStorage._FileStorage__layout
+        with mock.patch.object(writer, "fragments",
+                               wraps=writer.fragments) as fragments, \
+                mock.patch.object(layout, "members",
+                                  wraps=layout.members) as members:
+            users[0].first_name = "Betty"
+            users[0].save()
+            self.storage.delete(users[1])
+            self.storage.save()
+        self.storage.wait_durable()
+
+        self.assertFalse(members.called)
+        self.assertEqual([list(c.args[0]) for c in fragments.call_args_list],
+                         [["User." + users[0].id], []])
+        objs = self.reloaded()
+        self.assertEqual(set(objs), {"User." + u.id for u in users[:1] +
+                                     users[2:]})
+        self.assertEqual(objs["User." + users[0].id].first_name, "Betty")
+
+    def test_journaled_changes_compacted(self):
+        """
+        The objects changed by the saves appended to the
+        journal are written by the next compaction.
+        """
+        self.storage.configure(journal=True, compact_after=3)
+        user = User()
+        self.storage.compact()
+        for i in range(3):
+            user.first_name = str(i)
+            user.save()
+        self.storage.wait_durable()
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        with open(self.path, "r") as f:
+            record = json.load(f)["User." + user.id]
+        self.assertEqual(record["first_name"], "2")
+
+    def test_written_after_reload(self):
+        """
+        The saves after a reload keep the objects read
+        from disk that the writer thread did not write.
+        """
+        user = User()
+        self.storage.save()
+        self.storage.wait_durable()
+        with open(self.path, "r") as f:
+            records = json.load(f)
+        record = dict(records["User." + user.id], __class__="State", id="s")
+        records["State.s"] = record
+        with open(self.path, "w") as f:
+            json.dump(records, f)
+
+        self.storage.reload()
+        user.first_name = "Betty"
+        user.save()
+        self.storage.wait_durable()
+        objs = self.reloaded()
+        self.assertIn("State.s", objs)
+        self.assertEqual(objs["User." + user.id].first_name, "Betty")
+
+    def test_superseded_writes(self):
+        """
+        A file queued again before the writer thread gets to
+        it is only written once more, at most twice in all.
+        """
+        release = self.blocked()
+        user = User()
+        for i in range(5):
+            user.first_name = str(i)
+            user.save()
+
+        release.set()
+        self.storage.wait_durable()
+        self.assertLessEqual(serializers.dump.call_count, 2)
+        self.assertEqual(self.reloaded()["User." + user.id].first_name, "4")
+
+    def test_write_error(self):
+        """
+        The error of a failed write is raised by the next
+        wait_durable() and does not stop the writer thread.
+        """
+        with mock.patch.object(serializers, "dump",
+                               side_effect=OSError("disk full")):
+            User().save()
+            with self.assertRaises(OSError):
+                self.storage.wait_durable()
+        self.storage.wait_durable()
+
+        User().save()
+        self.storage.wait_durable()
+        self.assertEqual(len(self.reloaded()), 2)
+
+    def test_close(self):
+        """
+        close() writes the queued saves and stops the writer thread.
+        """
+        release = self.blocked()
+        users = [User() for i in range(3)]
+        for user in users:
+            user.save()
+        writer = FileStorage._FileStorage__thread.thread
+        self.assertTrue(writer.is_alive())
+
+        release.set()
+        self.storage.close()
+        self.assertFalse(writer.is_alive())
+        self.assertIsNone(FileStorage._FileStorage__thread.thread)
+        self.assertEqual(len(self.reloaded()), 3)
+
+
+class TestFileStorageThreadSafe(FileStorageTestCase):
+    """
+    Test the thread safe mode of FileStorage
+    """
+
+    def setUp(self):
+        """
+        Enable the lock.
+        """
+        super().setUp()
+        self.storage.configure(thread_safe=True)
+
+    def run_threads(self, *targets):
+        """
+        Runs each target in its own thread and
+        returns the exceptions they raised.
+        """
+        errors = []
+
+        def run(target):
+            try:
+                target()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(t,)) for t in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        return errors
+
+    def test_background_fsync_interval(self):
+        """
+        The writer thread syncing files by the fsync interval
+        does not wait for a thread holding the lock while it
+        waits for the writer thread.
+        """
+        self.storage.configure(journal=False, background=True, fsync="1")
+        self.addCleanup(self.storage.close)
+
+        def save_and_reload():
+            for i in range(20):
+                User().save()
+            self.storage.reload()
+
+        thread = threading.Thread(target=save_and_reload, daemon=True)
+        thread.start()
+        thread.join(30)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.storage.count(User), 20)
+
+    def test_all_copy(self):
+        """
+        all() returns a copy of the objects.
+        """
+        user = User()
+        objs = self.storage.all()
+        BaseModel()
+        self.assertEqual(list(objs), ["User." + user.id])
+
+    def test_stress(self):
+        """
+        Threads create, save and delete objects while
+        others read them, without any error or lost change.
+        """
+        done = threading.Event()
+
+        def write(n):
+            for i in range(100):
+                user = User()
+                user.email = "{}-{}".format(n, i)
+                user.save()
+                if i % 5 == 0:
+                    self.storage.delete(user)
+                    self.storage.save()
+
+        def read():
+            while not done.is_set():
+                for obj in self.storage.all().values():
+                    obj.id
+                self.storage.count(User)
+                self.storage.find(User, email="0-1")
+                self.storage.all(User)
+
+        writers = [lambda n=n: write(n) for n in range(4)]
+        readers = [read for n in range(4)]
+
+        def stop():
+            self.assertEqual(self.run_threads(*writers), [])
+            done.set()
+
+        self.assertEqual(self.run_threads(stop, *readers), [])
+        self.assertEqual(self.storage.count(User), 320)
+        self.assertEqual(len(self.reloaded()), 320)
+
+    def test_lazy_reads(self):
+        """
+        Threads reading a lazily loaded store build each object once.
+        """
+        users = [User() for i in range(50)]
+        self.storage.save()
+        self.storage.configure(lazy=True)
+        self.storage.clear()
+        self.storage.reload()
+        found = []
+
+        def read():
+            for user in users:
+                found.append(self.storage.get(User, user.id))
+
+        self.assertEqual(self.run_threads(*[read] * 4), [])
+        self.assertEqual(len(found), 200)
+        self.assertEqual(len({id(obj) for obj in found}), 50)
+
+
+@unittest.skipIf(os.name != "posix", "shared mode needs fcntl")
+class TestFileStorageShared(FileStorageTestCase):
+    """
+    Test the shared mode of FileStorage, with other
+    processes changing the same files
+    """
+
+    def setUp(self):
+        """
+        Share the files, without the journal.
+        """
+        super().setUp()
+        self.storage.configure(shared=True, journal=False)
+
+    def start(self, code, *args):
+        """
+        Starts another process running code with the same files,
+        the storage, User and the arguments as args. The process
+        uses FileStorage whatever the engine of this one.
+        """
+        script = (
+            "import sys\n"
+            "from models import storage\n"
+            "from models.user import User\n"
+            "storage.clear()\n"
+            "storage.configure(file_path=sys.argv[1], **{})\n"
+            "storage.reload()\n"
+            "args = sys.argv[2:]\n"
+        ).format(self.storage.options()) + code
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, HBNB_TYPE_STORAGE="file")
+        return subprocess.Popen([sys.executable, "-c", script, self.path] +
+                                list(args), cwd=root, env=env)
+
+    def other(self, code, *args):
+        """
+        Runs code in another process, see start().
+        """
+        self.assertEqual(self.start(code, *args).wait(60), 0)
+
+    def saved_user(self, name):
+        """
+        Creates and saves a user.
+        """
+        user = User()
+        user.first_name = name
+        user.save()
+        return user
+
+    def test_merge(self):
+        """
+        The objects saved by another process are kept
+        and read when this process saves.
+        """
+        mine = self.saved_user("mine")
+        self.other("u = User()\nu.first_name = 'theirs'\nu.save()\n")
+        also_mine = self.saved_user("also mine")
+
+        names = {o.first_name for o in self.reloaded().values()}
+        self.assertEqual(names, {"mine", "theirs", "also mine"})
+        self.assertIn("User." + mine.id, self.storage.all())
+        self.assertIn("User." + also_mine.id, self.storage.all())
+
+    def test_local_changes_win(self):
+        """
+        An object changed here since the last save keeps
+        the change, the others take the change on disk.
+        """
+        mine = self.saved_user("a")
+        theirs = self.saved_user("b")
+        self.other("for id in args:\n"
+                   "    u = storage.get(User, id)\n"
+                   "    u.first_name = 'changed'\n"
+                   "    u.save()\n", mine.id, theirs.id)
+
+        mine.first_name = "mine"
+        mine.save()
+        self.assertEqual(self.storage.get(User, theirs.id).first_name,
+                         "changed")
+        objs = self.reloaded()
+        self.assertEqual(objs["User." + mine.id].first_name, "mine")
+        self.assertEqual(objs["User." + theirs.id].first_name, "changed")
+
+    def test_deleted_elsewhere(self):
+        """
+        An object deleted by another process is gone here
+        after a save, unless it changed here.
+        """
+        gone = self.saved_user("gone")
+        kept = self.saved_user("kept")
+        self.other("for id in args:\n"
+                   "    storage.delete(storage.get(User, id))\n"
+                   "storage.save()\n", gone.id, kept.id)
+
+        kept.save()
+        self.assertIsNone(self.storage.get(User, gone.id))
+        objs = self.reloaded()
+        self.assertNotIn("User." + gone.id, objs)
+        self.assertIn("User." + kept.id, objs)
+
+    def test_refresh(self):
+        """
+        refresh() reads the files changed by other processes.
+        """
+        self.saved_user("mine")
+        self.other("User().save()")
+        self.assertEqual(self.storage.count(User), 1)
+        self.storage.refresh()
+        self.assertEqual(self.storage.count(User), 2)
+
+    def test_concurrent_saves(self):
+        """
+        No save is lost when processes save at the same time.
+        """
+        procs = [self.start("for i in range(20):\n"
+                            "    User().save()\n") for i in range(4)]
+        for proc in procs:
+            self.assertEqual(proc.wait(60), 0)
+
+        self.assertEqual(len(self.reloaded()), 80)
+
+
+class TestFileStorageSharedJournal(TestFileStorageShared):
+    """
+    Test the shared mode of FileStorage with the journal
+    """
+
+    def setUp(self):
+        """
+        Share the files, with the journal.
+        """
+        super().setUp()
+        self.storage.configure(journal=True, compact_after=5)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""
+Module testing the secondary indexes used by FileStorage
+"""
+
+import unittest
+from models.engine.indexes import GridIndex, HashIndex, SortedIndex, haversine
+
+
+class TestHashIndex(unittest.TestCase):
+    """
+    Test the HashIndex class
+    """
+
+    def test_add_and_lookup(self):
+        """
+        Objects are found by the value they were indexed with.
+        """
+        index = HashIndex("state_id")
+        index.add("a", "s1")
+        index.add("b", "s1")
+        index.add("c", "s2")
+
+        self.assertEqual(index.lookup("s1"), {"a", "b"})
+        self.assertEqual(index.lookup("s2"), {"c"})
+        self.assertEqual(index.lookup("s3"), set())
+        self.assertEqual(len(index), 3)
+
+    def test_add_replaces_value(self):
+        """
+        Adding an object again moves it to its new value.
+        """
+        index = HashIndex("state_id")
+        index.add("a", "s1")
+        index.add("a", "s2")
+
+        self.assertEqual(index.lookup("s1"), set())
+        self.assertEqual(index.lookup("s2"), {"a"})
+
+    def test_remove(self):
+        """
+        Removed objects are no longer found.
+        """
+        index = HashIndex("state_id")
+        index.add("a", "s1")
+        index.remove("a")
+        index.remove("missing")
+
+        self.assertEqual(index.lookup("s1"), set())
+        self.assertEqual(len(index), 0)
+
+    def test_unhashable_values(self):
+        """
+        Unhashable values are not indexed.
+        """
+        index = HashIndex("amenity_ids")
+        index.add("a", ["x"])
+
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.lookup(["x"]), set())
+
+
+class TestSortedIndex(unittest.TestCase):
+    """
+    Test the SortedIndex class
+    """
+
+    def setUp(self):
+        """
+        Index a few prices, one of them given as a string.
+        """
+        self.index = SortedIndex("price_by_night")
+        for id, price in (("a", 50), ("b", 120), ("c", "80"), ("d", 80)):
+            self.index.add(id, price)
+
+    def test_range(self):
+        """
+        range() yields the ids within the bounds, in order.
+        """
+        self.assertEqual(list(self.index.range()), ["a", "c", "d", "b"])
+        self.assertEqual(list(self.index.range(60, 100)), ["c", "d"])
+        self.assertEqual(list(self.index.range(80, 80)), ["c", "d"])
+        self.assertEqual(list(self.index.range(high=80, reverse=True)),
+                         ["d", "c", "a"])
+        self.assertEqual(list(self.index.range(low=200)), [])
+
+    def test_add_replaces_value(self):
+        """
+        Adding an object again moves it to its new value.
+        """
+        self.index.add("a", 500)
+        self.assertEqual(list(self.index.range()), ["c", "d", "b", "a"])
+        self.assertEqual(self.index.value("a"), 500.0)
+
+    def test_remove_and_lookup(self):
+        """
+        Removed objects are no longer found.
+        """
+        self.index.remove("c")
+        self.assertEqual(self.index.lookup(80), {"d"})
+        self.assertEqual(self.index.lookup("not a number"), set())
+        self.assertEqual(len(self.index), 3)
+
+    def test_added_after_query(self):
+        """
+        Objects added after a query are sorted into the others,
+        and can be removed before the next query.
+        """
+        self.assertEqual(list(self.index.range(60, 100)), ["c", "d"])
+        for id, price in (("e", 10), ("f", 90), ("g", 200)):
+            self.index.add(id, price)
+        self.index.remove("f")
+        self.index.add("h", 95)
+        self.assertEqual(list(self.index.range()),
+                         ["e", "a", "c", "d", "h", "b", "g"])
+        self.assertEqual(self.index.lookup(95), {"h"})
+
+    def test_non_numeric_values(self):
+        """
+        Values that are not numbers are not indexed.
+        """
+        self.index.add("e", "cheap")
+        self.index.add("f", None)
+        self.index.add("g", float("nan"))
+        self.assertEqual(len(self.index), 4)
+
+
+class TestGridIndex(unittest.TestCase):
+    """
+    Test the GridIndex class
+    """
+
+    def setUp(self):
+        """
+        Index a few cities, one of them on each side
+        of the 180th meridian.
+        """
+        self.index = GridIndex(cell=1.0)
+        self.points = {
+            "paris": (48.8566, 2.3522),
+            "versailles": (48.8049, 2.1204),
+            "london": (51.5074, -0.1278),
+            "suva": (-18.1416, 178.4419),
+            "apia": (-13.8333, -171.7500),
+        }
+        for id, point in self.points.items():
+            self.index.add(id, point)
+
+    def test_haversine(self):
+        """
+        haversine() returns the distance in kilometers.
+        """
+        self.assertAlmostEqual(haversine(*self.points["paris"],
+                                         *self.points["london"]), 343.5,
+                               delta=1)
+        self.assertEqual(haversine(1, 2, 1, 2), 0)
+
+    def test_within_radius(self):
+        """
+        within_radius() returns the points in range, nearest first.
+        """
+        found = self.index.within_radius(48.85, 2.35, 30)
+        self.assertEqual([id for _, id in found], ["paris", "versailles"])
+        found = self.index.within_radius(48.85, 2.35, 400)
+        self.assertEqual([id for _, id in found],
+                         ["paris", "versailles", "london"])
+
+    def test_within_radius_across_meridian(self):
+        """
+        Circles crossing the 180th meridian find points on both sides.
+        """
+        found = self.index.within_radius(-16, 179.9, 1200)
+        self.assertEqual(sorted(id for _, id in found), ["apia", "suva"])
+
+    def test_within_box(self):
+        """
+        within_box() returns the points in the box, edges included.
+        """
+        self.assertEqual(sorted(self.index.within_box(48, 0, 52, 3)),
+                         ["paris", "versailles"])
+        self.assertEqual(sorted(self.index.within_box(48, -1, 52, 3)),
+                         ["london", "paris", "versailles"])
+        self.assertEqual(sorted(self.index.within_box(-20, 170, -10, -170)),
+                         ["apia", "suva"])
+
+    def test_matches_brute_force(self):
+        """
+        The index finds the same points as checking every point.
+        """
+        import random
+        rand = random.Random(0)
+        index = GridIndex(cell=0.5)
+        points = {}
+        for i in range(2000):
+            points[str(i)] = (rand.uniform(40, 50), rand.uniform(-5, 5))
+            index.add(str(i), points[str(i)])
+
+        found = {id for _, id in index.within_radius(45, 0, 100)}
+        expected = {id for id, p in points.items()
+                    if haversine(45, 0, *p) <= 100}
+        self.assertEqual(found, expected)
+
+    def test_remove_and_invalid(self):
+        """
+        Removed and invalid positions are not found.
+        """
+        self.index.remove("paris")
+        self.index.add("nowhere", (91, 0))
+        self.index.add("nothing", ("a", "b"))
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual([id for _, id in
+                          self.index.within_radius(48.85, 2.35, 30)],
+                         ["versailles"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Module testing the RWLock used by FileStorage
+"""
+
+import threading
+import unittest
+from models.engine.locks import RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """
+    Test the RWLock class
+    """
+
+    def setUp(self):
+        """
+        Create a released lock.
+        """
+        self.lock = RWLock()
+
+    def start(self, target):
+        """
+        Starts a thread running target.
+        """
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def test_readers_together(self):
+        """
+        Several threads hold the lock to read at once.
+        """
+        inside = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read():
+                inside.wait()
+
+        threads = [self.start(read) for i in range(2)]
+        with self.lock.read():
+            inside.wait()
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+    def test_writer_alone(self):
+        """
+        A writer waits for the readers, and the readers for the writer.
+        """
+        events = []
+        wrote = threading.Event()
+
+        def write():
+            with self.lock.write():
+                events.append("write")
+            wrote.set()
+
+        with self.lock.read():
+            self.start(write)
+            self.assertFalse(wrote.wait(0.1))
+            events.append("read")
+        self.assertTrue(wrote.wait(5))
+        self.assertEqual(events, ["read", "write"])
+
+        read = threading.Event()
+
+        def read_once():
+            with self.lock.read():
+                read.set()
+
+        with self.lock.write():
+            self.start(read_once)
+            self.assertFalse(read.wait(0.1))
+        self.assertTrue(read.wait(5))
+
+    def test_waiting_writer_first(self):
+        """
+        A new reader waits behind a waiting writer.
+        """
+        events = []
+        waiting = threading.Event()
+
+        def write():
+            waiting.set()
+            with self.lock.write():
+                events.append("write")
+
+        def read():
+            with self.lock.read():
+                events.append("read")
+
+        with self.lock.read():
+            writer = self.start(write)
+            waiting.wait(5)
+            while writer.is_alive() and not self.lock._RWLock__waiting:
+                writer.join(0.01)
+            reader = self.start(read)
+            reader.join(0.1)
+            self.assertEqual(events, [])
+        writer.join(5)
+        reader.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        """
+        Holds nest, and a writer can read, but a reader cannot write.
+        """
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+        with self.lock.read():
+            with self.lock.read():
+                with self.assertRaises(RuntimeError):
+                    self.lock.acquire_write()
+
+        with self.lock.write():
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""
+Module testing the MemoryStorage class
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime
+from unittest import mock
+from models.engine import registry
+from models.engine.memory_storage import MemoryStorage
+from models.city import City
+from models.user import User
+
+
+def make(cls, **attrs):
+    """
+    Returns a new object of a class, without adding it to
+    the storage of the models.
+    """
+    now = datetime.now().isoformat()
+    return cls(id=str(uuid.uuid4()), created_at=now, updated_at=now,
+               **attrs)
+
+
+class TestMemoryStorage(unittest.TestCase):
+    """
+    Test the MemoryStorage class
+    """
+
+    def setUp(self):
+        """
+        Start from an empty storage without snapshot.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "snapshot.json")
+        self.storage = MemoryStorage()
+        self.storage.clear()
+        self.storage.configure(file_path="")
+
+    def tearDown(self):
+        """
+        Forget the objects and the snapshot path.
+        """
+        self.storage.clear()
+        self.storage.configure(file_path="")
+        shutil.rmtree(self.tmp)
+
+    def test_no_file_io(self):
+        """
+        Without a snapshot nothing is ever opened.
+        """
+        user = make(User)
+        with mock.patch("builtins.open", side_effect=AssertionError):
+            self.storage.new(user)
+            self.storage.save()
+            self.storage.reload()
+            self.storage.close()
+        self.assertFalse(self.storage.persistent)
+        self.assertIs(self.storage.get(User, user.id), user)
+
+    def test_find(self):
+        """
+        find() returns the objects of a class with the given values.
+        """
+        paris = make(City, name="Paris", state_id="fr")
+        lyon = make(City, name="Lyon", state_id="fr")
+        self.storage.new(paris)
+        self.storage.new(lyon)
+        self.storage.new(make(User, first_name="Paris"))
+
+        self.assertEqual(set(self.storage.find(City, state_id="fr")),
+                         {"City." + paris.id, "City." + lyon.id})
+        self.assertEqual(self.storage.find("City", name="Paris"),
+                         {"City." + paris.id: paris})
+        self.assertEqual(self.storage.find(City, name="Nice"), {})
+        with self.assertRaises(ValueError):
+            self.storage.add_index(City, "name", "btree")
+
+    def test_snapshot(self):
+        """
+        close() writes a snapshot in the format of file.json,
+        read back by reload(), and only when objects changed.
+        """
+        self.storage.configure(file_path=self.path)
+        self.assertTrue(self.storage.persistent)
+        user = make(User, email="a@b.c")
+        self.storage.new(user)
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.path))
+
+        self.storage.close()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"User." + user.id:
+                                            user.to_dict()})
+
+        self.storage.clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(User, user.id).to_dict(),
+                         user.to_dict())
+
+        stamp = os.stat(self.path).st_mtime_ns
+        self.storage.close()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, stamp)
+
+    def test_registry(self):
+        """
+        HBNB_TYPE_STORAGE=memory selects the engine, with the
+        snapshot path from HBNB_MEMORY_SNAPSHOT.
+        """
+        env = {"HBNB_TYPE_STORAGE": "memory",
+               "HBNB_MEMORY_SNAPSHOT": self.path}
+        with mock.patch.dict(os.environ, env):
+            engine = registry.create()
+        self.assertIsInstance(engine, MemoryStorage)
+        self.assertEqual(engine.name, "memory")
+        self.assertTrue(engine.persistent)
+
+
+if __name__ == "__main__":
+    unittest.main()
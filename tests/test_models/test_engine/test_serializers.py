@@ -0,0 +1,231 @@
+#!/usr/bin/python3
+"""
+Module testing the storage file formats
+"""
+
+import io
+import json
+import marshal
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from datetime import datetime
+from models.engine.serializers import (BinarySerializer, FORMATS,
+                                       JSONSerializer, convert, detect)
+
+
+class TestSerializers(unittest.TestCase):
+    """
+    Test the JSON and binary serializers
+    """
+
+    def setUp(self):
+        """
+        A few records, as returned by to_dict().
+        """
+        self.records = {
+            "User.1": {"__class__": "User", "id": "1",
+                       "created_at": "2017-09-28T21:03:54.052298",
+                       "updated_at": "2017-09-28T21:03:54.052302",
+                       "email": "a@b.c"},
+            "Place.2": {"__class__": "Place", "id": "2",
+                        "created_at": "2017-09-28T21:03:54.000001",
+                        "updated_at": "2017-09-28T21:03:54.000001",
+                        "price_by_night": 90, "latitude": 48.85,
+                        "amenity_ids": ["a", "b"], "description": None},
+        }
+
+    def test_json_fragments(self):
+        """
+        Joined JSON fragments are the text of json.dumps().
+        """
+        serializer = JSONSerializer()
+        text = serializer.join(list(self.records), [
+            serializer.fragment(k, v) for k, v in self.records.items()])
+        self.assertEqual(text, json.dumps(self.records))
+        self.assertEqual(serializer.loads(text), self.records)
+
+    def test_json_dump(self):
+        """
+        Fragments are written one by one as the text of json.dumps().
+        """
+        serializer = JSONSerializer()
+        f = io.StringIO()
+        serializer.dump(f, list(self.records), (
+            serializer.fragment(k, v) for k, v in self.records.items()))
+        self.assertEqual(f.getvalue(), json.dumps(self.records))
+
+        f = io.StringIO()
+        serializer.dump(f, [], iter(()))
+        self.assertEqual(f.getvalue(), "{}")
+
+    def test_json_datetimes(self):
+        """
+        Datetimes read from a snapshot are written in ISO format.
+        """
+        record = {"created_at": datetime(2017, 9, 28, 21, 3, 54, 52298)}
+        self.assertEqual(JSONSerializer().dumps(record),
+                         '{"created_at": "2017-09-28T21:03:54.052298"}')
+
+    def test_json_records(self):
+        """
+        Records are read one by one, whatever the chunk size.
+        """
+        serializer = JSONSerializer()
+        for text in (json.dumps(self.records),
+                     json.dumps(self.records, indent=4), "{}", " { } "):
+            for size in (1, 3, 64, 1 << 16):
+                records = serializer.records(io.StringIO(text), size)
+                self.assertEqual(dict(records), json.loads(text))
+
+    def test_json_records_invalid(self):
+        """
+        Text that is not a JSON object of records is rejected.
+        """
+        serializer = JSONSerializer()
+        for text in ("", "[]", '{"a" 1}', '{"a": 1', '{1: 2}', '{"a": 1,}'):
+            with self.assertRaises(ValueError):
+                list(serializer.records(io.StringIO(text), 3))
+
+    def test_binary_round_trip(self):
+        """
+        Fields keep their type and timestamps come back as datetimes.
+        """
+        serializer = BinarySerializer()
+        data = serializer.dumps(self.records)
+        self.assertTrue(data.startswith(BinarySerializer.MAGIC))
+        self.assertEqual(data, serializer.join(list(self.records), [
+            serializer.fragment(k, v) for k, v in self.records.items()]))
+
+        records = serializer.loads(data)
+        self.assertEqual(list(records), list(self.records))
+        place = records["Place.2"]
+        self.assertEqual(place["created_at"],
+                         datetime(2017, 9, 28, 21, 3, 54, 1))
+        self.assertEqual(place["amenity_ids"], ["a", "b"])
+        self.assertEqual(place["price_by_night"], 90)
+        self.assertIsNone(place["description"])
+        self.assertEqual(records["User.1"]["updated_at"].isoformat(),
+                         self.records["User.1"]["updated_at"])
+
+    def test_binary_index(self):
+        """
+        The index gives the position of every record.
+        """
+        serializer = BinarySerializer()
+        data = serializer.dumps(self.records)
+        keys, positions = serializer.index(data)
+        self.assertEqual(keys, list(self.records))
+
+        for key, pos in zip(keys, positions):
+            length = serializer.LENGTH.unpack_from(data, pos)[0]
+            record = serializer.decode(data[pos + 4:pos + 4 + length])
+            self.assertEqual(record[0], key)
+
+    def test_binary_records(self):
+        """
+        Snapshot records are read one by one, up to the index.
+        """
+        serializer = BinarySerializer()
+        data = serializer.dumps(self.records)
+        self.assertEqual(dict(serializer.records(io.BytesIO(data))),
+                         serializer.loads(data))
+
+    def test_binary_timestamps(self):
+        """
+        Timestamps are stored in the STAMP layout and read back
+        with their microseconds, whatever their fold.
+        """
+        serializer = BinarySerializer()
+        stamps = [datetime(2017, 9, 28, 21, 3, 54, 999999),
+                  datetime(2017, 9, 28, 21, 3, 54, 65536),
+                  datetime(1, 1, 1), datetime(9999, 12, 31, 23, 59, 59),
+                  datetime(2017, 10, 29, 2, 30, fold=1)]
+        for stamp in stamps:
+            record = {"created_at": stamp}
+            key, fields = marshal.loads(serializer.fragment("k", record)[4:])
+            self.assertEqual(fields["created_at"], BinarySerializer.STAMP.pack(
+                stamp.year, stamp.month, stamp.day, stamp.hour, stamp.minute,
+                stamp.second, stamp.microsecond >> 16,
+                stamp.microsecond & 0xFFFF))
+            loaded = serializer.loads(serializer.dumps({"k": record}))
+            self.assertEqual(loaded["k"]["created_at"], stamp)
+            self.assertEqual(loaded["k"]["created_at"].fold, 0)
+
+        # Decoded with the fields of the date and time, not with the
+        # pickle state constructor of CPython
+        data = marshal.dumps(("k", {"updated_at": bytes(
+            [7, 225, 9, 28, 21, 3, 54, 0x0F, 0x42, 0x3F])}), 4)
+        def fields_only(*args):
+            return datetime(*map(int, args))
+
+        with mock.patch("models.engine.serializers.datetime", fields_only):
+            self.assertEqual(serializer.decode(data)[1]["updated_at"],
+                             datetime(2017, 9, 28, 21, 3, 54, 999999))
+
+    def test_binary_aware_timestamp(self):
+        """
+        Timestamps with a time zone are kept as strings.
+        """
+        serializer = BinarySerializer()
+        record = {"created_at": "2017-09-28T21:03:54+02:00"}
+        self.assertEqual(serializer.loads(serializer.dumps({"k": record})),
+                         {"k": record})
+
+    def test_binary_truncated(self):
+        """
+        A last record cut short is ignored, other data is rejected.
+        """
+        serializer = BinarySerializer()
+        first = serializer.fragment("User.1", self.records["User.1"])
+        data = serializer.dumps(self.records)
+        cut = data[:len(serializer.MAGIC) + len(first) + 10]
+        self.assertEqual(list(serializer.loads(cut)), ["User.1"])
+        self.assertEqual(serializer.index(cut)[0], ["User.1"])
+        with self.assertRaises(ValueError):
+            serializer.loads(b"{}")
+
+
+class TestConvert(unittest.TestCase):
+    """
+    Test the conversion of storage files
+    """
+
+    def setUp(self):
+        """
+        Write a JSON storage file in a temporary directory.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "file.json")
+        self.records = {"BaseModel.1": {
+            "__class__": "BaseModel", "id": "1",
+            "created_at": "2017-09-28T21:03:54.052298",
+            "updated_at": "2017-09-28T21:03:54.052298"}}
+        with open(self.path, "w") as f:
+            json.dump(self.records, f)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip(self):
+        """
+        JSON converts to a snapshot and back to the same JSON.
+        """
+        snapshot = os.path.join(self.tmp, "file.bin")
+        copy = os.path.join(self.tmp, "copy.json")
+
+        self.assertEqual(convert(self.path, snapshot), 1)
+        self.assertIs(detect(snapshot), FORMATS["binary"])
+        self.assertEqual(convert(snapshot, copy), 1)
+        self.assertIs(detect(copy), FORMATS["json"])
+        with open(copy, "r") as f:
+            self.assertEqual(json.load(f), self.records)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+"""
+Module testing the SQLiteStorage class
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from datetime import datetime
+from models.engine.sqlite_storage import SQLiteStorage
+from models.user import User
+from models.city import City
+from models.place import Place
+
+
+def make(cls, **attrs):
+    """
+    Returns a new object of a class, without adding it to
+    the storage of the models.
+    """
+    now = datetime.now().isoformat()
+    return cls(id=str(uuid.uuid4()), created_at=now, updated_at=now,
+               **attrs)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """
+    Test the SQLiteStorage class
+    """
+
+    def setUp(self):
+        """
+        Open a database in a temporary directory.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "file.db")
+        self.storage = SQLiteStorage()
+        self.storage.configure(file_path=self.path)
+        self.storage.reload()
+
+    def tearDown(self):
+        """
+        Close the database and forget its objects.
+        """
+        self.storage.close()
+        self.storage.configure(file_path="file.db")
+        SQLiteStorage._SQLiteStorage__objects.clear()
+        SQLiteStorage._SQLiteStorage__dirty.clear()
+        shutil.rmtree(self.tmp)
+
+    def added(self, cls, **attrs):
+        """
+        Returns a new object added to the storage.
+        """
+        obj = make(cls, **attrs)
+        self.storage.new(obj)
+        return obj
+
+    def reopened(self):
+        """
+        Closes the database and reads it again from scratch.
+        """
+        self.storage.close()
+        self.storage.reload()
+        return self.storage
+
+    def test_save_and_reload(self):
+        """
+        Saved objects are read back with the same attributes.
+        """
+        user = self.added(User, email="a@b.c", first_name="Betty")
+        place = self.added(Place, name="Loft", price_by_night=80,
+                           latitude=1.5, amenity_ids=["a", "b"],
+                           description=None, rating="[1]")
+        self.storage.save()
+
+        storage = self.reopened()
+        got = storage.get(User, user.id)
+        self.assertIsNot(got, user)
+        self.assertEqual(got.to_dict(), user.to_dict())
+        self.assertEqual(storage.get("Place", place.id).to_dict(),
+                         place.to_dict())
+        self.assertIsNone(storage.get(User, "missing"))
+
+    def test_identity(self):
+        """
+        Reading an object twice returns the same instance.
+        """
+        user = self.added(User)
+        self.storage.save()
+        storage = self.reopened()
+        self.assertIs(storage.get(User, user.id),
+                      storage.all(User)["User." + user.id])
+
+    def test_all_and_count(self):
+        """
+        all() and count() see the objects added and
+        deleted since the last save.
+        """
+        users = [self.added(User) for i in range(3)]
+        self.added(City, name="Paris")
+        self.storage.save()
+        self.storage.delete(users[0])
+        extra = self.added(User)
+
+        self.assertEqual(set(self.storage.all(User)),
+                         {"User." + u.id for u in users[1:] + [extra]})
+        self.assertEqual(len(self.storage.all()), 4)
+        self.assertEqual(self.storage.count(User), 3)
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count("Nope"), 0)
+
+        self.storage.save()
+        storage = self.reopened()
+        self.assertEqual(storage.count(User), 3)
+        self.assertIsNone(storage.get(User, users[0].id))
+
+    def test_find(self):
+        """
+        find() matches columns, defaults and other attributes.
+        """
+        paris = self.added(City, state_id="fr", name="Paris")
+        self.added(City, state_id="fr", name="Lyon")
+        self.added(City, state_id="us", name="Paris")
+        nowhere = self.added(City, name="Nowhere")
+        self.storage.save()
+        storage = self.reopened()
+
+        self.assertEqual(len(storage.find(City, state_id="fr")), 2)
+        self.assertEqual(list(storage.find(City, state_id="fr",
+                                           name="Paris")),
+                         ["City." + paris.id])
+        self.assertEqual(list(storage.find(City, state_id="")),
+                         ["City." + nowhere.id])
+        self.assertEqual(storage.find("Nope", name="x"), {})
+
+    def test_schema(self):
+        """
+        Each class has its table, in WAL mode, with its foreign
+        keys indexed, and add_index() adds indexes.
+        """
+        self.storage.add_index(Place, "price_by_night", "sorted")
+        self.storage.add_index(Place, "no_such_column")
+        conn = sqlite3.connect(self.path)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0],
+                         "wal")
+        columns = [row[1] for row in conn.execute(
+            'PRAGMA table_info("Place")')]
+        self.assertEqual(columns[:3], ["id", "created_at", "updated_at"])
+        self.assertIn("city_id", columns)
+        indexes = {row[1] for row in conn.execute(
+            'PRAGMA index_list("Place")')}
+        self.assertIn("Place_city_id", indexes)
+        self.assertIn("Place_user_id", indexes)
+        self.assertIn("Place_price_by_night", indexes)
+        plan = " ".join(str(row) for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM "City" WHERE "state_id" IS ?',
+            ("x",)))
+        self.assertIn("City_state_id", plan)
+
+    def test_statements(self):
+        """
+        The statements of each table are built once per
+        connection, and are the ones run.
+        """
+        statements = SQLiteStorage._SQLiteStorage__statements["User"]
+        run = []
+        self.storage._SQLiteStorage__conn.set_trace_callback(run.append)
+        self.storage.get(User, "missing")
+        self.storage.count(User)
+        self.storage.all(User)
+        self.assertEqual(run, [statements["get"].replace("?", "'missing'"),
+                               statements["count"], statements["all"]])
+
+        self.reopened()
+        self.assertIsNot(SQLiteStorage._SQLiteStorage__statements["User"],
+                         statements)
+
+
+if __name__ == "__main__":
+    unittest.main()
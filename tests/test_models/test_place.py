@@ -6,49 +6,18 @@ Module for testing the Place class
 import json
 import os
 import unittest
-from models import storage
 from datetime import datetime
 from models.engine.file_storage import FileStorage
 from models.place import Place
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
 
-class testPlace(unittest.TestCase):
+class testPlace(MemoryStorageCase):
     """
     Defines the test methods to test the Place class
     """
 
-    def setUp(self):
-        """
-        Set up the necessary environment for each
-        test case in the testPlace class.
-
-        This method removes the "file.json"
-        file if it exists before each test.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the "file.json" file exists.
-        2. If it exists, remove the "file.json" file.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tearDown(self):
-        """
-        Clean up the environment after each
-        test case in the testPlace class.
-
-        This method removes the "file.json"
-        file if it exists.
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_place_created(self):
         """
         Test whether a Place object is successfully created.
@@ -295,6 +264,37 @@ class testPlace(unittest.TestCase):
         place_dict = place.to_dict()
         self.assertIn("name", place_dict)
 
+    def test_place_str_(self):
+        """
+        Test the __str__ method of the Place class.
+
+        This method creates an instance of the Place class and
+        tests if the __str__ method returns the expected string
+        representation of the object.
+
+        Example Usage:
+        place = Place()
+        expected_str = "[Place] ({}) {}".format(place.id, place.__dict__)
+        assert str(place) == expected_str
+
+        Inputs:
+        - None
+
+        Outputs:
+        - None
+        """
+
+        place = Place()
+        expected_str = "[Place] ({}) {}".format(place.id, place.__dict__)
+        self.assertEqual(str(place), expected_str)
+
+
+class testPlaceStorage(FileStorageCase):
+    """
+    Defines the test methods saving a Place to a FileStorage
+    and reading it back
+    """
+
     def test_place_save_to_file(self):
         """
         Test whether the save method of the Place class
@@ -303,21 +303,21 @@ class testPlace(unittest.TestCase):
         Example Usage:
         place = Place()
         place.save()
-        assert os.path.exists("file.json") == True
+        assert os.path.exists(self.path) == True
 
         Inputs: None
         Flow:
         1. Create an instance of the Place class.
         2. Call the save method on the place object.
         3. Use the os.path.exists function to check if
-        the "file.json" file exists.
+        the storage file exists.
 
         Outputs: None
         """
 
         place = Place()
         place.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
     def test_place_reload_from_file(self):
         """
@@ -335,34 +335,10 @@ class testPlace(unittest.TestCase):
 
         self.assertIn("Place." + place_id, objs.keys())
 
-    def test_place_str_(self):
-        """
-        Test the __str__ method of the Place class.
-
-        This method creates an instance of the Place class and
-        tests if the __str__ method returns the expected string
-        representation of the object.
-
-        Example Usage:
-        place = Place()
-        expected_str = "[Place] ({}) {}".format(place.id, place.__dict__)
-        assert str(place) == expected_str
-
-        Inputs:
-        - None
-
-        Outputs:
-        - None
-        """
-
-        place = Place()
-        expected_str = "[Place] ({}) {}".format(place.id, place.__dict__)
-        self.assertEqual(str(place), expected_str)
-
     def test_place_update_attributes(self):
         """
         Test whether the 'name' attribute of a 'Place' object can be
-        successfully updated and saved to the file storage.
+        successfully updated and saved to the file self.storage.
 
         Example Usage:
         place = Place()
@@ -396,7 +372,7 @@ class testPlace(unittest.TestCase):
 
         place = Place()
         place_id = place.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_place = new_storage.all()['Place.{}'.format(place_id)]
@@ -6,33 +6,16 @@ import json
 import os
 import unittest
 from datetime import datetime
-from models import storage
 from models.engine.file_storage import FileStorage
 from models.review import Review
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
 
-class testReview(unittest.TestCase):
+class testReview(MemoryStorageCase):
     """
     Define methods testing the Review class
     """
-    def set_up(self):
-        """
-        Removes the "file.json" file if it exists.
-
-        :return: None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tear_down(self):
-        """
-        Remove the "file.json" file if it exists.
-
-        :return: None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_review_created(self):
         """
         Test whether a Review object is successfully created.
@@ -221,6 +204,34 @@ class testReview(unittest.TestCase):
         review_dict = review.to_dict()
         self.assertIn("text", review_dict)
 
+    def test_review_str_(self):
+        """
+        Test the __str__ method of the Review class.
+
+        This method creates a new instance of the
+        Review class and tests the __str__ method,
+        which returns a string representation of the Review object.
+
+        Example Usage:
+        review = Review()
+        expected_str = "[Review] ({}) {}".format(review.id, review.__dict__)
+        assert str(review) == expected_str
+
+        Inputs: None
+        Outputs: None
+        """
+
+        review = Review()
+        expected_str = "[Review] ({}) {}".format(review.id, review.__dict__)
+        self.assertEqual(str(review), expected_str)
+
+
+class testReviewStorage(FileStorageCase):
+    """
+    Defines the test methods saving a Review to a FileStorage
+    and reading it back
+    """
+
     def test_review_save_to_file(self):
         """
         Test whether the save method of the Review
@@ -229,7 +240,7 @@ class testReview(unittest.TestCase):
         Example Usage:
         review = Review()
         review.save()
-        assert os.path.exists("file.json") == True
+        assert os.path.exists(self.path) == True
 
         Inputs: None
         Outputs: None
@@ -237,7 +248,7 @@ class testReview(unittest.TestCase):
 
         review = Review()
         review.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
     def test_review_reload_from_file(self):
         """
@@ -255,31 +266,10 @@ class testReview(unittest.TestCase):
 
         self.assertIn("Review." + review_id, objs.keys())
 
-    def test_review_str_(self):
-        """
-        Test the __str__ method of the Review class.
-
-        This method creates a new instance of the
-        Review class and tests the __str__ method,
-        which returns a string representation of the Review object.
-
-        Example Usage:
-        review = Review()
-        expected_str = "[Review] ({}) {}".format(review.id, review.__dict__)
-        assert str(review) == expected_str
-
-        Inputs: None
-        Outputs: None
-        """
-
-        review = Review()
-        expected_str = "[Review] ({}) {}".format(review.id, review.__dict__)
-        self.assertEqual(str(review), expected_str)
-
     def test_review_update_attributes(self):
         """
         Test whether the 'text' attribute of a 'Review'
-        object is successfully updated and saved to the file storage.
+        object is successfully updated and saved to the file self.storage.
 
         Example Usage:
         review = Review()
@@ -306,7 +296,7 @@ class testReview(unittest.TestCase):
         Example Usage:
         review = Review()
         review_id = review.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_review = new_storage.all()['Review.{}'.format(review_id)]
@@ -314,7 +304,7 @@ class testReview(unittest.TestCase):
         """
         review = Review()
         review_id = review.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_review = new_storage.all()['Review.{}'.format(review_id)]
@@ -5,58 +5,18 @@ Module for testing the State class
 import json
 import os
 import unittest
-from models import storage
 from datetime import datetime
 from models.engine.file_storage import FileStorage
 from models.state import State
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
 
-class testState(unittest.TestCase):
+class testState(MemoryStorageCase):
     """
     Defines the test methods to test the State class
     """
 
-    def setUp(self):
-        """
-        Set up the necessary environment for each test
-        case in the testState class.
-
-        This method removes the "file.json" file if it
-        exists before running each test.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the "file.json" file exists.
-        2. If it exists, remove the file.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tearDown(self):
-        """
-        Clean up the environment after each test case.
-
-        This method checks if the "file.json" file
-        exists and removes it if it does.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Check if the "file.json" file exists.
-        2. If it exists, remove the file.
-
-        Outputs:
-        - None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_state_created(self):
         """
         Test if a State object is successfully created.
@@ -267,6 +227,34 @@ class testState(unittest.TestCase):
         state_dict = state.to_dict()
         self.assertIn("name", state_dict)
 
+    def test_state_str_(self):
+        """
+        Test the behavior of the __str__ method of the State class.
+
+        This method creates a State object and compares
+        the string representation of the object
+        with an expected string.
+
+        Example Usage:
+        state = State()
+        expected_str = "[State] ({}) {}".format(state.id, state.__dict__)
+        assert str(state) == expected_str
+
+        Inputs: None
+        Outputs: None
+        """
+
+        state = State()
+        expected_str = "[State] ({}) {}".format(state.id, state.__dict__)
+        self.assertEqual(str(state), expected_str)
+
+
+class testStateStorage(FileStorageCase):
+    """
+    Defines the test methods saving a State to a FileStorage
+    and reading it back
+    """
+
     def test_state_save_to_file(self):
         """
         Test whether the save method of the State class
@@ -278,7 +266,7 @@ class testState(unittest.TestCase):
         Flow:
         1. Create a State object.
         2. Call the save method of the State object.
-        3. Check if the file "file.json" exists.
+        3. Check if the storage file exists.
         4. Assert that the file exists.
 
         Outputs:
@@ -286,7 +274,7 @@ class testState(unittest.TestCase):
         """
         state = State()
         state.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
     def test_state_reload_from_file(self):
         """
@@ -304,27 +292,6 @@ class testState(unittest.TestCase):
 
         self.assertIn("State." + state_id, objs.keys())
 
-    def test_state_str_(self):
-        """
-        Test the behavior of the __str__ method of the State class.
-
-        This method creates a State object and compares
-        the string representation of the object
-        with an expected string.
-
-        Example Usage:
-        state = State()
-        expected_str = "[State] ({}) {}".format(state.id, state.__dict__)
-        assert str(state) == expected_str
-
-        Inputs: None
-        Outputs: None
-        """
-
-        state = State()
-        expected_str = "[State] ({}) {}".format(state.id, state.__dict__)
-        self.assertEqual(str(state), expected_str)
-
     def test_state_update_attributes(self):
         """
         Test whether the 'name' attribute of a 'State'
@@ -375,7 +342,7 @@ class testState(unittest.TestCase):
         """
         state = State()
         state_id = state.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_state = new_storage.all()['State.{}'.format(state_id)]
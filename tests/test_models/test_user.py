@@ -5,47 +5,18 @@ Module for testing the User class
 import json
 import os
 import unittest
-from models import storage
 from datetime import datetime
 from models.engine.file_storage import FileStorage
 from models.user import User
+from .file_storage_case import FileStorageCase
+from .memory_storage_case import MemoryStorageCase
 
 
-class testUser(unittest.TestCase):
+class testUser(MemoryStorageCase):
     """
     Defines the test methods to test the User class
     """
 
-    def setUp(self):
-        """
-        Set up the necessary environment for each
-        test case in the testUser class.
-
-        This method removes the "file.json" file
-        if it exists before each test.
-
-        Inputs: None
-
-        Outputs: None
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
-    def tearDown(self):
-        """
-        Clean up the environment after each test case
-        in the testUser class.
-
-        This method checks if the file "file.json"
-        exists and removes it if it does.
-
-        Example Usage:
-        test_user = testUser()
-        test_user.tearDown()
-        """
-        if os.path.exists("file.json"):
-            os.remove("file.json")
-
     def test_user_created(self):
         """
         Test if a User object is successfully created.
@@ -231,6 +202,100 @@ class testUser(unittest.TestCase):
         user_dict = user.to_dict()
         self.assertIn("name", user_dict)
 
+    def test_user_str_(self):
+        """
+        Test the __str__ method of the User class.
+
+        This method creates a User object and compares
+        its string representation with the expected
+        string representation.
+
+        Inputs:
+        - None
+
+        Outputs:
+        - None
+        """
+
+        user = User()
+        expected_str = "[User] ({}) {}".format(user.id, user.__dict__)
+        self.assertEqual(str(user), expected_str)
+
+    def test_first_name(self):
+        """
+        Test if the first_name attribute of a User object
+        is of type string and has an initial value of an
+        empty string.
+
+        Inputs:
+        - None
+
+        Outputs:
+        - None
+        """
+        user = User()
+        self.assertIsInstance(user.first_name, str)
+        self.assertEqual(user.first_name, "")
+
+    def test_last_name(self):
+        """
+        Test if the last_name attribute of a User object
+        is of type string and has an initial value of an
+        empty string.
+
+        Inputs:
+        - None
+
+        Outputs:
+        - None
+        """
+        user = User()
+        self.assertIsInstance(user.last_name, str)
+        self.assertEqual(user.last_name, "")
+
+    def test_email(self):
+        """
+        Test if the email attribute of a User object is
+        of type string and has an initial value of an empty string.
+
+        Inputs:
+        - None
+
+        Flow:
+        1. Create an instance of the User class and
+        assign it to the variable user.
+        2. Use the assertIsInstance assertion to
+        check if the email attribute of user is of type string.
+        3. Use the assertEqual assertion to check if the
+        email attribute of user is equal to an empty string.
+
+        Outputs:
+        - None
+        """
+        user = User()
+        self.assertIsInstance(user.email, str)
+        self.assertEqual(user.email, "")
+
+    def test_password(self):
+        """
+        Test if the password attribute of a User object
+        is of type string and has an initial value of an empty string.
+
+        Inputs: None
+
+        Outputs: None
+        """
+        user = User()
+        self.assertIsInstance(user.password, str)
+        self.assertEqual(user.password, "")
+
+
+class testUserStorage(FileStorageCase):
+    """
+    Defines the test methods saving an User to a FileStorage
+    and reading it back
+    """
+
     def test_user_save_to_file(self):
         """
         Test if the save method of the User class successfully
@@ -245,7 +310,7 @@ class testUser(unittest.TestCase):
 
         user = User()
         user.save()
-        self.assertTrue(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists(self.path))
 
     def test_user_reload_from_file(self):
         """
@@ -274,25 +339,6 @@ class testUser(unittest.TestCase):
 
         self.assertIn("User." + user_id, objs.keys())
 
-    def test_user_str_(self):
-        """
-        Test the __str__ method of the User class.
-
-        This method creates a User object and compares
-        its string representation with the expected
-        string representation.
-
-        Inputs:
-        - None
-
-        Outputs:
-        - None
-        """
-
-        user = User()
-        expected_str = "[User] ({}) {}".format(user.id, user.__dict__)
-        self.assertEqual(str(user), expected_str)
-
     def test_user_update_attributes(self):
         """
         Test if the email attribute of a User object
@@ -343,80 +389,12 @@ class testUser(unittest.TestCase):
 
         user = User()
         user_id = user.id
-        storage.save()
+        self.storage.save()
         new_storage = FileStorage()
         new_storage.reload()
         loaded_user = new_storage.all()['User.{}'.format(user_id)]
         self.assertIsInstance(loaded_user, User)
 
-    def test_first_name(self):
-        """
-        Test if the first_name attribute of a User object
-        is of type string and has an initial value of an
-        empty string.
-
-        Inputs:
-        - None
-
-        Outputs:
-        - None
-        """
-        user = User()
-        self.assertIsInstance(user.first_name, str)
-        self.assertEqual(user.first_name, "")
-
-    def test_last_name(self):
-        """
-        Test if the last_name attribute of a User object
-        is of type string and has an initial value of an
-        empty string.
-
-        Inputs:
-        - None
-
-        Outputs:
-        - None
-        """
-        user = User()
-        self.assertIsInstance(user.last_name, str)
-        self.assertEqual(user.last_name, "")
-
-    def test_email(self):
-        """
-        Test if the email attribute of a User object is
-        of type string and has an initial value of an empty string.
-
-        Inputs:
-        - None
-
-        Flow:
-        1. Create an instance of the User class and
-        assign it to the variable user.
-        2. Use the assertIsInstance assertion to
-        check if the email attribute of user is of type string.
-        3. Use the assertEqual assertion to check if the
-        email attribute of user is equal to an empty string.
-
-        Outputs:
-        - None
-        """
-        user = User()
-        self.assertIsInstance(user.email, str)
-        self.assertEqual(user.email, "")
-
-    def test_password(self):
-        """
-        Test if the password attribute of a User object
-        is of type string and has an initial value of an empty string.
-
-        Inputs: None
-
-        Outputs: None
-        """
-        user = User()
-        self.assertIsInstance(user.password, str)
-        self.assertEqual(user.password, "")
-
 
 if __name__ == "__main__":
     unittest.main()